@@ -0,0 +1,135 @@
+# File: agenda.py
+import bisect                     # Import bisect to jump to the first item of a date range
+import csv                        # Import csv to read bookings.csv
+import heapq                      # Import heapq for the k-way merge of the sources
+import os                         # Import os for file and path handling
+import threading                  # Import threading to guard the bookings cache
+from datetime import datetime     # Import datetime to read booking times ("8:00 AM")
+from event_store import user_occurrences, to_minutes  # Import merged personal + course events
+from reminder_repository import get_repository  # Import cached reminder store
+from room_booking.helpers import user_in_booking  # Import the booking owner/member check
+
+BOOKINGS_FILE = os.path.join("data", "bookings.csv")  # Same file the room booking pages use
+SOURCES = ("event", "appointment", "booking", "reminder")
+
+
+def _item(source, date, start, end, title, detail, ref):
+    """One agenda row; every source is turned into this shape"""
+    return {
+        "source": source,
+        "date": date,
+        "minute": start,          # Minutes since midnight (sort key within a day)
+        "start": f"{start // 60:02d}:{start % 60:02d}",
+        "end": f"{end // 60:02d}:{end % 60:02d}" if end is not None else "",
+        "title": title,
+        "detail": detail,
+        "ref": ref,               # The original event / reminder / booking
+    }
+
+
+def _key(item):
+    return (item["date"], item["minute"])
+
+
+# ---------------- Sources (each yields in (date, start) order) ----------------
+def _events(user, first, last, sources):
+    for e in user_occurrences(user, first, last):      # Already merged and sorted
+        source = "appointment" if e.get("category") == "appointment" else "event"
+        if source not in sources:
+            continue
+        try:
+            start, end = to_minutes(e["start_time"]), to_minutes(e["end_time"])
+        except ValueError:
+            continue
+        detail = e.get("calendar") or e.get("category", "")
+        yield _item(source, e["date"], start, end, e["title"], detail, e)
+
+
+def _reminders(user, first, last):
+    for r in get_repository(user).all():                # Cached, sorted by due
+        if r["due"][:10] < first:
+            continue
+        if r["due"][:10] > last:
+            break
+        yield _item("reminder", r["due"][:10], to_minutes(r["due"][11:16]), None, r["task"], r["status"], r)
+
+
+class BookingIndex:
+    """bookings.csv parsed once, as per-user lists sorted by (date, start)
+
+    The file is only re-read when its mtime/size changes; a user's list is
+    built the first time their agenda asks for bookings.
+    """
+
+    def __init__(self, path=BOOKINGS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._signature = None    # (mtime_ns, size) of the file we last read
+        self._rows = []           # Parsed bookings in (date, start) order
+        self._by_user = {}        # {user: ([keys], [items])}
+
+    def _refresh(self):
+        try:
+            st = os.stat(self.path)
+            sig = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            sig = None
+        if self._loaded and sig == self._signature:
+            return
+        rows = []
+        if sig is not None:
+            with open(self.path, newline="", encoding="utf-8") as f:
+                for b in csv.DictReader(f):
+                    try:
+                        start = datetime.strptime(b["start"].strip(), "%I:%M %p")
+                        end = datetime.strptime(b["end"].strip(), "%I:%M %p")
+                    except (KeyError, ValueError, AttributeError):
+                        continue
+                    detail = f"{b.get('venue', '')} · {b.get('pax', '')} pax"
+                    rows.append(_item("booking", b.get("date", ""), start.hour * 60 + start.minute,
+                                      end.hour * 60 + end.minute, b.get("room", "Room booking"), detail, b))
+        rows.sort(key=_key)
+        self._rows, self._by_user, self._signature, self._loaded = rows, {}, sig, True
+
+    def between(self, user, first, last):
+        """A user's bookings (as owner or member) between two dates"""
+        with self._lock:
+            self._refresh()
+            if user not in self._by_user:
+                items = [r for r in self._rows if user_in_booking(r["ref"], user)]
+                self._by_user[user] = ([_key(r) for r in items], items)
+            keys, items = self._by_user[user]
+        i = bisect.bisect_left(keys, (first, -1))
+        j = bisect.bisect_right(keys, (last, 24 * 60))
+        return iter(items[i:j])
+
+
+_bookings = BookingIndex()
+
+
+def _booking_items(user, first, last):
+    yield from _bookings.between(user, first, last)  # bookings.csv is only touched on first pull
+
+
+# ---------------- Agenda ----------------
+def agenda(user, first, last, sources=SOURCES):
+    """Generator over everything on a user's calendar between two dates, by (date, start)
+
+    Each source is a pre-sorted iterator started only when the merge first
+    pulls from it, and every store behind them is cached, so re-opening a day
+    costs a few index look-ups.
+    """
+    streams = []
+    if "event" in sources or "appointment" in sources:
+        streams.append(_events(user, first, last, sources))
+    if "booking" in sources:
+        streams.append(_booking_items(user, first, last))
+    if "reminder" in sources:
+        streams.append(_reminders(user, first, last))
+    return heapq.merge(*streams, key=_key)
+
+
+def agenda_day(user, date, sources=SOURCES):
+    """Everything on one date, as a list"""
+    return list(agenda(user, date, date, sources))
@@ -0,0 +1,141 @@
+# File: alarm_sound.py
+import io                         # Import io to build the WAV tone in memory
+import math                       # Import math for the sine wave
+import os                         # Import os for file and path handling
+import platform                   # Import platform to pick a backend per OS
+import shutil                     # Import shutil to find a command-line audio player
+import struct                     # Import struct to pack 16-bit samples
+import subprocess                 # Import subprocess to run the audio player
+import sys                        # Import sys for the terminal bell fallback
+import threading                  # Import threading so playback never blocks Tk
+import wave                       # Import wave to write the tone as a WAV file
+
+TONE_FREQ = 1000                  # Beep pitch in Hz (same as the old winsound.Beep)
+TONE_MS = 700                     # Beep length in milliseconds
+GAP_MS = 300                      # Silence between beeps
+SAMPLE_RATE = 22050               # Samples per second for the rendered tone
+CACHE_DIR = os.path.join("data", "cache")  # Where the rendered tone is kept between runs
+
+_tone_cache = {}                  # {(freq, ms): wav bytes}
+
+
+def render_tone(freq=TONE_FREQ, ms=TONE_MS):
+    """Return a mono 16-bit WAV sine tone (rendered once per process)"""
+    key = (freq, ms)
+    if key not in _tone_cache:
+        frames = int(SAMPLE_RATE * ms / 1000)
+        fade = min(frames // 10, SAMPLE_RATE // 100)   # Short fade in/out avoids clicks
+        samples = bytearray()
+        for i in range(frames):
+            amp = min(1.0, i / fade, (frames - i) / fade) if fade else 1.0
+            value = int(12000 * amp * math.sin(2 * math.pi * freq * i / SAMPLE_RATE))
+            samples += struct.pack("<h", value)
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(SAMPLE_RATE)
+            w.writeframes(bytes(samples))
+        _tone_cache[key] = buf.getvalue()
+    return _tone_cache[key]
+
+
+def tone_file(freq=TONE_FREQ, ms=TONE_MS):
+    """Return the path of the cached tone WAV, writing it on first use"""
+    path = os.path.join(CACHE_DIR, f"alarm_{freq}hz_{ms}ms.wav")
+    if not os.path.exists(path):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(render_tone(freq, ms))
+        os.replace(tmp, path)
+    return path
+
+
+# =========================================================
+# Backends
+# =========================================================
+class AlarmBackend:
+    """Plays the alarm N times on a worker thread; play() returns immediately"""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread = None
+
+    def play(self, times=3):
+        """Start a new beep sequence (replaces any sequence still playing)"""
+        self.stop()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(times, self._stop), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Cancel the sequence after the current beep"""
+        self._stop.set()
+
+    def _run(self, times, stop):
+        for i in range(times):
+            if stop.is_set():
+                return
+            try:
+                self.beep()
+            except Exception:
+                return            # A broken audio device must never crash the app
+            if i < times - 1 and stop.wait(GAP_MS / 1000):
+                return
+
+    def beep(self):
+        """Play one beep and return when it has finished (runs on the worker thread)"""
+        raise NotImplementedError
+
+
+class WinsoundBackend(AlarmBackend):
+    """Windows: play the in-memory WAV with winsound"""
+
+    def __init__(self):
+        super().__init__()
+        import winsound
+        self._winsound = winsound
+        self._wav = render_tone()
+
+    def beep(self):
+        self._winsound.PlaySound(self._wav, self._winsound.SND_MEMORY)
+
+
+class CommandBackend(AlarmBackend):
+    """macOS / Linux: play the cached WAV file with a command-line player"""
+
+    def __init__(self, player):
+        super().__init__()
+        self.player = player
+        self._path = tone_file()
+
+    def beep(self):
+        subprocess.run([self.player, self._path], stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, timeout=5)
+
+
+class BellBackend(AlarmBackend):
+    """Fallback: terminal bell (no audio player available)"""
+
+    def beep(self):
+        sys.stdout.write("\a")
+        sys.stdout.flush()
+        threading.Event().wait(TONE_MS / 1000)   # Keep the same rhythm as a real beep
+
+
+def get_alarm_backend():
+    """Pick the best available backend for this machine"""
+    if platform.system() == "Windows":
+        try:
+            return WinsoundBackend()
+        except ImportError:
+            pass
+    for player in ("afplay", "paplay", "aplay"):
+        path = shutil.which(player)
+        if path:
+            try:
+                return CommandBackend(path)
+            except OSError:
+                break             # Can't write the cached tone: use the bell instead
+    return BellBackend()
@@ -0,0 +1,284 @@
+# File: appointments.py
+import json                       # Import json for the recovery journal records
+import os                         # Import os for file and path handling
+import time                       # Import time to build transaction IDs
+import uuid                       # Import uuid to give each appointment an ID both rows share
+from contextlib import ExitStack  # Import ExitStack to hold a variable number of locks
+from event_store import DATA_DIR, get_event_store, user_events, to_minutes  # Import event indexes
+from conflicts import first_overlap  # Import shared overlap check
+from storage import file_lock     # Import cross-process lock
+from user_store import find_user  # Import user look-up to pair only rows of registered users
+
+TX_JOURNAL = os.path.join(DATA_DIR, "appointments.journal")  # Write-ahead log of two-party changes
+TITLE_PREFIX = "Appointment with "
+
+
+def appointment_title(other_user):
+    return f"{TITLE_PREFIX}{other_user}"
+
+
+def new_appointment_id():
+    return uuid.uuid4().hex
+
+
+def other_party(event):
+    """The other user of an appointment event, or None"""
+    title = event.get("title", "")
+    return title[len(TITLE_PREFIX):].strip() if title.startswith(TITLE_PREFIX) else None
+
+
+# =========================================================
+# Transactions
+# =========================================================
+# A transaction lists every event it writes ("puts", with their final IDs)
+# and deletes ("dels"). Both are idempotent on the event journal, so after a
+# crash a transaction logged as "begin" without "commit" is simply redone.
+# New rows' IDs are not reserved until written, so a redone create moves a
+# row to a fresh ID if another event has taken its ID in the meantime.
+
+def _journal_append(record):
+    with file_lock(TX_JOURNAL):
+        os.makedirs(os.path.dirname(TX_JOURNAL) or ".", exist_ok=True)
+        with open(TX_JOURNAL, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())  # The intent is on disk before any event file changes
+        if record["state"] == "commit" and not _pending():
+            os.remove(TX_JOURNAL)     # Nothing left to recover: start the next log empty
+
+
+def _pending():
+    """{tx id: begin record} for transactions without a commit (journal lock held)"""
+    if not os.path.exists(TX_JOURNAL):
+        return {}
+    pending = {}
+    with open(TX_JOURNAL, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue              # Half-written last line of a crashed writer
+            if record.get("state") == "begin":
+                pending[record["tx"]] = record
+            elif record.get("state") == "commit":
+                pending.pop(record["tx"], None)
+    return pending
+
+
+def _locked(users):
+    """Lock several users' event stores in name order (same order in every process)"""
+    stack = ExitStack()
+    for user in sorted(set(users)):
+        store = get_event_store(user)
+        stack.enter_context(store._lock)        # Same order a single-store change takes them
+        stack.enter_context(file_lock(store.path))
+    return stack
+
+
+def _apply(record, redo=False):
+    for user, event in record["puts"]:
+        store = get_event_store(user)
+        if redo and record["op"] == "create":
+            current = store.get(event["id"])
+            if current is not None and current.get("appointment") != event.get("appointment"):
+                # The ID was only journaled, never written: an add() since the crash took it
+                event = {**event, "id": store.next_id()}
+        store.put(event)
+    for user, eid in record["dels"]:
+        get_event_store(user).delete(eid)
+
+
+def _run(op, users, plan):
+    """Lock every store, let plan() decide the changes, log them, apply them, commit
+
+    plan() runs with the locks held and returns (puts, dels, result).
+    """
+    recover()
+    with _locked(users):
+        puts, dels, result = plan()
+        record = {"tx": f"{os.getpid()}-{time.time_ns()}", "state": "begin", "op": op,
+                  "puts": puts, "dels": dels}
+        _journal_append(record)
+        _apply(record)
+        _journal_append({"tx": record["tx"], "state": "commit"})
+    return result
+
+
+def recover():
+    """Redo transactions a crashed process logged but never committed"""
+    if not os.path.exists(TX_JOURNAL):
+        return 0
+    with file_lock(TX_JOURNAL):
+        pending = _pending()
+    for tx, record in pending.items():
+        users = [u for u, _ in record["puts"]] + [u for u, _ in record["dels"]]
+        with _locked(users):
+            with file_lock(TX_JOURNAL):
+                still_pending = tx in _pending()  # Its owner may have finished while we waited
+            if still_pending:
+                _apply(record, redo=True)
+                _journal_append({"tx": tx, "state": "commit"})
+    return len(pending)
+
+
+# =========================================================
+# Appointments
+# =========================================================
+# An appointment is one row in each user's timetable carrying the same
+# "appointment" ID; each EventStore indexes its rows by that ID, so finding
+# either side is a dict look-up. The title still names the other user.
+
+def _row(other, date, start, end, appointment_id, eid):
+    return {
+        "id": eid,
+        "date": date,
+        "start_time": start,
+        "end_time": end,
+        "title": appointment_title(other),
+        "reminder": "0",
+        "category": "appointment",
+        "description": "",
+        "appointment": appointment_id,
+    }
+
+
+def _check_free(user, other_user, date, start, end, exclude=None):
+    """Raise ValueError if either user is busy (exclude: {user: own event id to ignore})"""
+    exclude = exclude or {}
+    for who in (user, other_user):
+        if first_overlap(user_events(who, date), to_minutes(start), to_minutes(end), exclude.get(who)) is not None:
+            raise ValueError("Conflict with your timetable!" if who == user
+                             else "Conflict with other user's timetable!")
+
+
+def _legacy_party(event):
+    """The other user of an appointment row written before appointment IDs, if registered"""
+    if event.get("appointment") or event.get("category") != "appointment":
+        return None
+    other_user = other_party(event)
+    return other_user if other_user and find_user(other_user) is not None else None
+
+
+def _legacy_counterpart(user, event, taken=()):
+    """The other user's unlinked row matching a title-linked appointment (pre-ID rows only)"""
+    other_user = _legacy_party(event)
+    if not other_user:
+        return None
+    for ev in get_event_store(other_user).events(event["date"]):
+        if (not ev.get("appointment") and ev["id"] not in taken and ev["title"] == appointment_title(user)
+                and ev["start_time"] == event["start_time"] and ev["end_time"] == event["end_time"]):
+            return ev
+    return None
+
+
+def create_appointment(user, other_user, date, start, end):
+    """Add the appointment to both timetables, or to neither
+
+    Raises ValueError if either user is busy at that time.
+    Returns (user's event, other user's event).
+    """
+    def plan():
+        _check_free(user, other_user, date, start, end)
+        appointment_id = new_appointment_id()
+        puts = [[user, _row(other_user, date, start, end, appointment_id,
+                            get_event_store(user).next_id())],
+                [other_user, _row(user, date, start, end, appointment_id,
+                                  get_event_store(other_user).next_id())]]
+        return puts, [], (puts[0][1], puts[1][1])
+    return _run("create", [user, other_user], plan)
+
+
+def get_appointment(user, appointment_id):
+    """{"id", "date", "start_time", "end_time", "rows": {user: event}} or None if user has no such appointment"""
+    mine = get_event_store(user).find_appointment(appointment_id)
+    if mine is None:
+        return None
+    rows = {user: mine}
+    other_user = other_party(mine)
+    theirs = get_event_store(other_user).find_appointment(appointment_id) if other_user else None
+    if theirs is not None:
+        rows[other_user] = theirs
+    return {"id": appointment_id, "date": mine["date"], "start_time": mine["start_time"],
+            "end_time": mine["end_time"], "rows": rows}
+
+
+def reschedule_appointment(user, appointment_id, date, start, end):
+    """Move both rows of an appointment to a new date/time, together
+
+    Raises ValueError if either user is busy then (their own row is ignored)
+    or the appointment is gone. Returns the user's updated event.
+    """
+    mine = get_event_store(user).find_appointment(appointment_id)
+    if mine is None:
+        raise ValueError("Appointment not found in your records.")
+    other_user = other_party(mine)
+
+    def plan():
+        appointment = get_appointment(user, appointment_id)  # Re-read with the locks held
+        if appointment is None:
+            raise ValueError("Appointment not found in your records.")
+        rows = appointment["rows"]
+        _check_free(user, other_user, date, start, end, {who: e["id"] for who, e in rows.items()})
+        puts = [[who, {**e, "date": date, "start_time": start, "end_time": end}] for who, e in rows.items()]
+        return puts, [], puts[0][1]
+    return _run("reschedule", [user] + ([other_user] if other_user else []), plan)
+
+
+def cancel_appointment(user, event):
+    """Delete an appointment event and its counterpart in the other user's timetable, together"""
+    other_user = other_party(event) if event.get("appointment") else _legacy_party(event)
+
+    def plan():
+        dels = [[user, event["id"]]]
+        if other_user:
+            if event.get("appointment"):
+                theirs = get_event_store(other_user).find_appointment(event["appointment"])
+            else:
+                theirs = _legacy_counterpart(user, event)  # Row written before appointment IDs
+            if theirs is not None:
+                dels.append([other_user, theirs["id"]])
+        return [], dels, len(dels)
+    return _run("cancel", [user] + ([other_user] if other_user else []), plan)
+
+
+def link_appointments(user):
+    """Give a user's title-linked appointment rows and their counterparts a shared ID
+
+    Rows written before appointments had IDs are paired by title, date and
+    times, as cancelling used to do, and only with a registered user's rows.
+    A row with no matching counterpart (or naming no registered user) is
+    left without an ID (it is not an appointment both users hold; cancelling
+    it deletes just that row).
+    Returns (rows linked, [unpaired rows]).
+    """
+    def candidates():
+        return [e for e in get_event_store(user).events()
+                if e["category"] == "appointment" and not e.get("appointment") and other_party(e)]
+
+    def pairs():
+        taken = {}                # {other user: their row ids already paired}
+        for e in candidates():
+            other_user = _legacy_party(e)
+            theirs = _legacy_counterpart(user, e, taken.setdefault(other_user, set()))
+            if theirs is not None:
+                taken[other_user].add(theirs["id"])
+            yield e, other_user, theirs
+
+    found = list(pairs())         # Read-only pass: usually nothing to do, so no locks taken
+    unpaired = [e for e, _, theirs in found if theirs is None]
+    parties = [other_user for _, other_user, theirs in found if theirs is not None]
+    if not parties:
+        return 0, unpaired
+
+    def plan():
+        puts = []
+        unpaired.clear()
+        for e, other_user, theirs in pairs():   # Re-read with the locks held
+            if theirs is None:
+                unpaired.append(e)
+                continue
+            appointment_id = new_appointment_id()
+            puts.append([user, {**e, "appointment": appointment_id}])
+            puts.append([other_user, {**theirs, "appointment": appointment_id}])
+        return puts, [], len(puts)
+    return _run("link", [user] + parties, plan), unpaired
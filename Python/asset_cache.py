@@ -0,0 +1,89 @@
+# File: asset_cache.py
+import os                         # Import os for file and path handling
+import tkinter as tk              # Import tkinter for PhotoImage (reads PNG without Pillow)
+
+ASSET_DIR = "assets"              # Directory holding the original icons
+CACHE_DIR = os.path.join(ASSET_DIR, ".cache")  # Pre-resized PNG variants (safe to delete)
+
+# Pillow is only imported when a variant has to be made, so once every
+# size exists on disk the app starts without loading it at all. Without
+# Pillow a missing variant gives no icon and callers show text only.
+
+
+def find_asset(name):
+    """Return the path of an asset, matching the file name case-insensitively
+
+    (Icons are referred to as e.g. "delete.png" but may be stored as "Delete.png",
+    which only works on case-insensitive file systems.) None if it doesn't exist.
+    """
+    path = os.path.join(ASSET_DIR, name)
+    if os.path.exists(path):
+        return path
+    try:
+        for entry in os.listdir(ASSET_DIR):
+            if entry.lower() == name.lower():
+                return os.path.join(ASSET_DIR, entry)
+    except FileNotFoundError:
+        pass
+    return None
+
+
+def variant_path(source, size):
+    """Return the cache path of an asset resized to (width, height)"""
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(CACHE_DIR, f"{stem}_{size[0]}x{size[1]}.png")
+
+
+def _make_variant(source, size, target):
+    """Resize an asset with Pillow and save it as PNG; returns the Pillow image (None without Pillow)"""
+    try:
+        from PIL import Image     # Import Pillow only when a new size is needed
+    except ImportError:
+        return None
+    img = Image.open(source).resize(size)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        img.save(tmp, "PNG")
+        os.replace(tmp, target)   # Other processes never see a half-written variant
+    except OSError:
+        pass                      # Read-only install: just don't cache on disk
+    return img
+
+
+def get_icon(widget, name, size):
+    """Return a PhotoImage of an asset at size (width, height), or None if it is missing
+
+    Each (name, size) is decoded once per Tk root and kept for the root's
+    lifetime, so every window shares one image and nothing is garbage collected
+    while still shown. Resized copies are kept in assets/.cache/.
+    """
+    root = widget._root()         # The Tk instance all Toplevels belong to
+    cache = getattr(root, "_asset_cache", None)
+    if cache is None:
+        cache = root._asset_cache = {}  # {(name, size): PhotoImage}
+    key = (name.lower(), tuple(size))
+    if key in cache:
+        return cache[key]
+
+    source = find_asset(name)
+    if source is None:
+        return None
+    target = variant_path(source, size)
+    try:
+        fresh = os.path.getmtime(target) >= os.path.getmtime(source)  # Re-make if the icon changed
+    except OSError:
+        fresh = False
+    if fresh:
+        photo = tk.PhotoImage(master=root, file=target)  # Tk reads PNG itself: no Pillow
+    else:
+        img = _make_variant(source, tuple(size), target)
+        if img is None:
+            photo = None          # No Pillow and no cached variant: text-only buttons
+        elif os.path.exists(target):
+            photo = tk.PhotoImage(master=root, file=target)
+        else:
+            from PIL import ImageTk   # Variant couldn't be saved: convert in memory
+            photo = ImageTk.PhotoImage(img, master=root)
+    cache[key] = photo
+    return photo
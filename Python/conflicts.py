@@ -0,0 +1,74 @@
+# File: conflicts.py
+import heapq                      # Import heapq to track the events still running during the sweep
+from event_store import user_occurrences, user_date_bounds, to_minutes  # Import merged event views
+
+
+def _intervals(events):
+    """Events -> [(date, start minute, end minute, event)] sorted, skipping unreadable times"""
+    intervals = []
+    for e in events:
+        try:
+            start, end = to_minutes(e["start_time"]), to_minutes(e["end_time"])
+        except (KeyError, ValueError):
+            continue
+        intervals.append((e["date"], start, end, e))
+    intervals.sort(key=lambda iv: iv[:3])
+    return intervals
+
+
+def find_conflicts(events):
+    """Return every pair of overlapping events as (earlier, later)
+
+    Sort once, then sweep by start time keeping a min-heap of the events still
+    running (by end time): O(n log n) plus one step per pair found. Events that
+    only touch (one ends as the next starts) don't conflict.
+    """
+    pairs = []
+    active = []                   # [(end minute, seq, event)] started but not yet ended
+    day = None
+    for seq, (date, start, end, e) in enumerate(_intervals(events)):
+        if date != day:
+            active, day = [], date    # Events never span midnight: new day, nothing running
+        while active and active[0][0] <= start:
+            heapq.heappop(active)     # Ended before this one starts
+        pairs.extend((other, e) for _, _, other in active)
+        heapq.heappush(active, (end, seq, e))
+    return pairs
+
+
+def conflicting_ids(events):
+    """Return the IDs of events that overlap at least one other event"""
+    return {e["id"] for pair in find_conflicts(events) for e in pair}
+
+
+def user_conflicts(user, start_date=None, end_date=None):
+    """Every overlapping pair in a user's timetable between two dates (inclusive, "YYYY-MM-DD")
+
+    Subscribed course calendars are included.
+    """
+    if start_date is None or end_date is None:
+        bounds = user_date_bounds(user)
+        if bounds is None:
+            return []
+        start_date, end_date = start_date or bounds[0], end_date or bounds[1]
+    return find_conflicts(user_occurrences(user, start_date, end_date))  # Series expanded for the range only
+
+
+def first_overlap(events, start, end, exclude_id=None):
+    """Return the first event of one day overlapping [start, end) minutes, or None
+
+    events must be sorted by start time (as EventStore.events(date) returns them),
+    so the scan stops at the first event starting after the new one ends.
+    """
+    for e in events:
+        if e["id"] == exclude_id:
+            continue
+        try:
+            e_start = to_minutes(e["start_time"])
+            if e_start >= end:
+                break             # This and every later event start after us
+            if to_minutes(e["end_time"]) > start:
+                return e
+        except ValueError:
+            continue
+    return None
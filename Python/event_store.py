@@ -0,0 +1,540 @@
+# File: event_store.py
+import bisect                     # Import bisect to keep each day sorted by start time
+import heapq                      # Import heapq to merge one-off events with expanded series
+import csv                        # Import csv to read/write <user>_events.csv and the journal
+import glob                       # Import glob to list the shared course calendars
+import io                         # Import io to parse journal lines appended since the last read
+import os                         # Import os for file and path handling
+import threading                  # Import threading to guard the cached index
+from datetime import datetime, timedelta  # Import datetime to expand recurring events
+from storage import file_lock, atomic_write  # Import cross-process lock and safe rewrite
+from recurrence import parse_rule # Import the shared recurrence rules (same as reminders)
+
+DATA_DIR = "data"                 # Directory holding the events CSV files
+SHARED_DIR = os.path.join(DATA_DIR, "shared")  # Course timetables stored once for all subscribers
+FIELDS = ["id", "date", "start_time", "end_time", "title", "reminder", "category", "description",
+          "repeat", "exdates",    # repeat: recurrence rule ("" = one-off); exdates: "YYYY-MM-DD;..." skipped
+          "appointment"]          # Appointment ID shared by both users' rows ("" = not an appointment)
+JOURNAL_FIELDS = ["op"] + FIELDS  # op is "put" (add / replace an event) or "del"
+COMPACT_MIN_ENTRIES = 64          # Fold the journal into the CSV once it has this many lines...
+COMPACT_RATIO = 0.5               # ...and at least this many per event in the CSV
+SESSIONS_HORIZON_DAYS = 366       # An open-ended series is conflict-checked this far ahead
+
+
+def events_file(user):
+    """Return the file path for a user's events CSV"""
+    return os.path.join(DATA_DIR, f"{user}_events.csv")
+
+
+def journal_file(user):
+    """Return the file path for a user's append-only event change journal"""
+    return os.path.join(DATA_DIR, f"{user}_events.journal")
+
+
+def shared_file(name):
+    """Return the file path for a shared course calendar's events CSV"""
+    return os.path.join(SHARED_DIR, f"{name}_events.csv")
+
+
+def subscriptions_file(user):
+    """Return the file path listing the shared calendars a user subscribes to"""
+    return os.path.join(DATA_DIR, f"{user}_subscriptions.txt")
+
+
+def to_minutes(hhmm):
+    """"HH:MM" -> minutes since midnight"""
+    h, m = hhmm.split(":")
+    return int(h) * 60 + int(m)
+
+
+def parse_event(row):
+    """CSV row -> event dict, or None if the start time can't be read"""
+    start_time_str = row["start_time"]
+    if ":" in start_time_str:                    # If format is HH:MM
+        start = start_time_str                   # Keep as is
+    elif "," in start_time_str:                  # If format is H,M (old files)
+        h, m = start_time_str.split(",")
+        start = f"{int(h):02d}:{int(m):02d}"     # Convert to HH:MM
+    else:
+        return None                              # Skip invalid format
+    return {
+        "id": int(row["id"]),
+        "date": row["date"],
+        "start_time": start,
+        "end_time": row["end_time"],
+        "title": row["title"],
+        "reminder": row.get("reminder") or "0",
+        "category": row.get("category") or "event",
+        "description": row.get("description") or "",
+        "repeat": row.get("repeat") or "",       # Older files have no repeat/exdates columns
+        "exdates": row.get("exdates") or "",
+        "appointment": row.get("appointment") or "",  # Added after repeat/exdates; older files lack it
+    }
+
+
+def expand(event, rule, first, last):
+    """Yield the occurrences of a recurring event between two dates (inclusive)
+
+    Each occurrence is a copy of the rule row with its own date. The event's
+    date is the first session; COUNT counts from it. Without COUNT the walk
+    jumps straight to the first date of the range instead of stepping there.
+    """
+    anchor = datetime.strptime(event["date"], "%Y-%m-%d")
+    start = datetime.strptime(first, "%Y-%m-%d")
+    end = datetime.strptime(last, "%Y-%m-%d")
+    skipped = set(event["exdates"].split(";")) if event["exdates"] else set()
+    cur, n = anchor, 1
+    if rule.count is None and start > anchor:
+        cur = rule.next_after(anchor, start - timedelta(minutes=1))  # First session on or after start
+    while cur is not None and cur <= end and (rule.count is None or n <= rule.count):
+        date = cur.strftime("%Y-%m-%d")
+        if cur >= start and date not in skipped:
+            yield {**event, "date": date}
+        cur = rule.next_after(anchor, cur)
+        n += 1
+
+
+def sessions(event, horizon_days=SESSIONS_HORIZON_DAYS):
+    """Every session of a new or edited event, for conflict checks
+
+    A one-off event is its only session. A series is expanded to its UNTIL
+    date or COUNT-th session, or horizon_days past its first session if it
+    has neither.
+    """
+    rule = parse_rule(event["repeat"]) if event.get("repeat") else None
+    if rule is None:
+        return [event]
+    if rule.until is not None:
+        last = rule.until.strftime("%Y-%m-%d")
+    elif rule.count is not None:
+        last = "9999-12-31"        # expand() stops after COUNT sessions
+    else:
+        last = (datetime.strptime(event["date"], "%Y-%m-%d") + timedelta(days=horizon_days)).strftime("%Y-%m-%d")
+    return list(expand({"exdates": "", **event}, rule, event["date"], last))
+
+
+class EventStore:
+    """Cached index of one user's events: {date: [(start minute, id)]}
+
+    Events live in <user>_events.csv plus an append-only journal of changes
+    since the last compaction, so one edit is a one-line append instead of a
+    full rewrite. The index is updated in place on our own edits; the files
+    are only re-read when another process changed them (and then only the
+    journal lines appended since our last read). A day view reads just that
+    day's events, already sorted by start time. A recurring event is one row
+    with a rule (see recurrence.py) and is only expanded for the dates asked for.
+    """
+
+    def __init__(self, user, path=None):
+        self.user = user
+        self.path = path or events_file(user)
+        self.journal_path = os.path.splitext(self.path)[0] + ".journal"  # <name>_events.journal
+        self._lock = threading.RLock()
+        self._by_id = {}          # {id: event} in file order
+        self._by_date = {}        # {date: [(start minute, id)]} sorted, one-off events only
+        self._rules = {}          # {id: Rule} for recurring events (expanded when read)
+        self._appointments = {}   # {appointment ID: event id}
+        self._max_id = 0          # Highest ID ever seen (next event gets +1)
+        self._signature = None    # (mtime_ns, size) of the CSV we last read or wrote
+        self._journal_offset = 0  # Bytes of the journal already applied
+        self._journal_inode = None
+        self._journal_entries = 0 # Journal lines since the last compaction
+
+    # ---------------- Index ----------------
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _index(self, event):
+        self._max_id = max(self._max_id, event["id"])
+        self._by_id[event["id"]] = event
+        if event.get("appointment"):
+            self._appointments[event["appointment"]] = event["id"]
+        rule = parse_rule(event["repeat"]) if event.get("repeat") else None
+        if rule is not None:
+            to_minutes(event["start_time"])  # Same check as one-off events
+            self._rules[event["id"]] = rule  # One row for the whole series
+            return
+        bisect.insort(self._by_date.setdefault(event["date"], []), (to_minutes(event["start_time"]), event["id"]))
+
+    def _unindex(self, event):
+        if event.get("appointment"):
+            self._appointments.pop(event["appointment"], None)
+        if self._rules.pop(event["id"], None) is not None:
+            self._by_id.pop(event["id"], None)
+            return
+        day = self._by_date.get(event["date"], [])
+        key = (to_minutes(event["start_time"]), event["id"])
+        i = bisect.bisect_left(day, key)
+        if i < len(day) and day[i] == key:
+            day.pop(i)
+        if not day:
+            self._by_date.pop(event["date"], None)
+        self._by_id.pop(event["id"], None)
+
+    def _rebuild(self, events):
+        self._by_id, self._by_date, self._rules, self._appointments, self._max_id = {}, {}, {}, {}, 0
+        for e in events:
+            self._put(e)
+
+    def _put(self, event):
+        """Add or replace an event in the index"""
+        old = self._by_id.get(event["id"])
+        if old is not None:
+            self._unindex(old)
+        try:
+            self._index(event)
+        except ValueError:
+            self._by_id.pop(event["id"], None)   # Unreadable time: can't be placed on a day
+            self._appointments.pop(event.get("appointment"), None)
+
+    def _read_file(self):
+        events = []
+        if os.path.exists(self.path):
+            with open(self.path, "r", newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    try:
+                        event = parse_event(row)
+                    except (KeyError, ValueError):
+                        continue
+                    if event is not None:
+                        events.append(event)
+        self._rebuild(events)
+        self._signature = self._file_signature()
+        self._journal_offset, self._journal_inode, self._journal_entries = 0, None, 0
+        self._read_journal()
+
+    def _read_journal(self):
+        """Apply journal lines appended since the last call"""
+        try:
+            st = os.stat(self.journal_path)
+        except FileNotFoundError:
+            self._journal_offset, self._journal_inode, self._journal_entries = 0, None, 0
+            return
+        if st.st_ino != self._journal_inode or st.st_size < self._journal_offset:
+            if self._journal_inode is not None:
+                self._read_file()             # Journal was compacted by someone else
+                return
+            self._journal_inode = st.st_ino
+        if st.st_size == self._journal_offset:
+            return
+        with open(self.journal_path, "rb") as f:
+            f.seek(self._journal_offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1          # Leave a half-written last line for next time
+        for row in csv.DictReader(io.StringIO(data[:end].decode("utf-8")), fieldnames=JOURNAL_FIELDS):
+            try:
+                if row["op"] == "del":
+                    old = self._by_id.get(int(row["id"]))
+                    if old is not None:
+                        self._unindex(old)
+                    self._max_id = max(self._max_id, int(row["id"]))
+                elif row["op"] == "put":
+                    event = parse_event(row)
+                    if event is not None:
+                        self._put(event)
+            except (KeyError, ValueError, TypeError):
+                continue
+            self._journal_entries += 1
+        self._journal_offset += end
+
+    def _refresh(self):
+        """Pick up changes made by other processes (one or two stats when nothing changed)"""
+        sig = self._file_signature()
+        if self._signature is None or sig != self._signature:
+            self._read_file()
+        else:
+            self._read_journal()
+
+    def _append(self, op, event):
+        """Write one journal line and apply it to the index (caller holds the locks)"""
+        os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+        with open(self.journal_path, "a", newline="", encoding="utf-8") as f:
+            csv.DictWriter(f, fieldnames=JOURNAL_FIELDS, extrasaction="ignore").writerow({**event, "op": op})
+        self._read_journal()                  # Applies our own line (and anything before it)
+        if self._journal_entries >= max(COMPACT_MIN_ENTRIES, len(self._by_id) * COMPACT_RATIO):
+            self._compact()
+
+    def _compact(self):
+        """Fold the journal into the CSV (caller holds the locks)
+
+        The CSV is swapped in before the journal is removed; replaying a journal
+        over its own compacted CSV gives the same events, so a crash in between is safe.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with atomic_write(self.path, newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(self._by_id.values())
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._signature = self._file_signature()
+        self._journal_offset, self._journal_inode, self._journal_entries = 0, None, 0
+
+    # ---------------- Public API ----------------
+    def events(self, date=None):
+        """Copies of the events on one date (sorted by start), or of all stored rows
+
+        For one date, recurring events are expanded to that day's session.
+        """
+        with self._lock:
+            self._refresh()
+            if date is None:
+                return [dict(e) for e in self._by_id.values()]
+            day = [dict(self._by_id[eid]) for _, eid in self._by_date.get(date, [])]
+            if self._rules:
+                sessions = [s for eid, rule in self._rules.items()
+                            for s in expand(self._by_id[eid], rule, date, date)]
+                day = sorted(day + sessions, key=lambda e: to_minutes(e["start_time"]))
+            return day
+
+    def occurrences(self, first, last):
+        """Generator over the events between two dates, sorted by (date, start)
+
+        One-off events come from the date index; each recurring event is
+        expanded lazily and the streams are merged, so nothing outside the
+        range is ever materialised.
+        """
+        with self._lock:
+            self._refresh()
+            dates = sorted(d for d in self._by_date if first <= d <= last)
+            singles = [dict(self._by_id[eid]) for d in dates for _, eid in self._by_date[d]]
+            series = [(dict(self._by_id[eid]), rule) for eid, rule in self._rules.items()]
+        key = lambda e: (e["date"], to_minutes(e["start_time"]))
+        return heapq.merge(singles, *(expand(e, rule, first, last) for e, rule in series), key=key)
+
+    def series(self):
+        """Copies of the recurring events' rule rows"""
+        with self._lock:
+            self._refresh()
+            return [dict(self._by_id[eid]) for eid in self._rules]
+
+    def get(self, eid):
+        """Copy of one event, or None"""
+        with self._lock:
+            self._refresh()
+            e = self._by_id.get(eid)
+            return dict(e) if e is not None else None
+
+    def find_appointment(self, appointment_id):
+        """Copy of this user's row of an appointment, or None"""
+        with self._lock:
+            self._refresh()
+            eid = self._appointments.get(appointment_id)
+            return dict(self._by_id[eid]) if eid is not None else None
+
+    def dates(self):
+        """Every date that has at least one event"""
+        with self._lock:
+            self._refresh()
+            return list(self._by_date)
+
+    def add(self, date, start, end, title, category="event", description="", reminder="0", repeat=""):
+        """Add an event (a series if repeat is a rule) with the next free ID; returns a copy"""
+        with self._lock, file_lock(self.path):
+            self._refresh()                   # See IDs handed out by other processes
+            event = {
+                "id": self._max_id + 1,
+                "date": date,
+                "start_time": start,
+                "end_time": end,
+                "title": title,
+                "reminder": reminder,
+                "category": category,
+                "description": description,
+                "repeat": repeat if repeat and repeat != "None" else "",
+                "exdates": "",
+                "appointment": "",
+            }
+            self._append("put", event)
+            return dict(event)
+
+    def add_many(self, events):
+        """Add many events with fresh IDs and write the CSV once; returns copies of them"""
+        with self._lock, file_lock(self.path):
+            self._refresh()
+            added = []
+            for e in events:
+                event = {k: e.get(k) or "" for k in FIELDS}
+                event["id"] = self._max_id + 1
+                event["reminder"] = event["reminder"] or "0"
+                event["category"] = event["category"] or "event"
+                self._put(event)
+                if event["id"] in self._by_id:    # Skipped if its start time is unreadable
+                    added.append(dict(event))
+            if added:
+                self._compact()               # One rewrite instead of a journal line each
+            return added
+
+    def next_id(self):
+        """ID the next added event would get (call with file_lock(self.path) held)"""
+        with self._lock:
+            self._refresh()
+            return self._max_id + 1
+
+    def put(self, event):
+        """Write a whole event under its own ID (add or replace; repeating it is harmless)"""
+        with self._lock, file_lock(self.path):
+            self._refresh()
+            event = {**{k: event.get(k) or "" for k in FIELDS}, "id": int(event["id"])}
+            self._append("put", event)
+            return dict(event)
+
+    def update(self, eid, **fields):
+        """Change some fields of an event; returns the new copy, or None if it is gone"""
+        with self._lock, file_lock(self.path):
+            self._refresh()
+            old = self._by_id.get(eid)
+            if old is None:
+                return None
+            event = {**old, **fields, "id": eid}
+            self._append("put", event)
+            return dict(event)
+
+    def skip_occurrence(self, eid, date):
+        """Drop one session of a recurring event (adds date to its exdates)"""
+        with self._lock, file_lock(self.path):
+            self._refresh()
+            old = self._by_id.get(eid)
+            if old is None or eid not in self._rules:
+                return None
+            skipped = [d for d in old["exdates"].split(";") if d] + [date]
+            event = {**old, "exdates": ";".join(sorted(set(skipped)))}
+            self._append("put", event)
+            return dict(event)
+
+    def move_occurrence(self, eid, date, **fields):
+        """Replace one session of a recurring event with a one-off copy carrying fields
+
+        fields may change the date, times, title etc. of just that session.
+        Returns the new one-off event, or None if the series is gone.
+        """
+        with self._lock, file_lock(self.path):
+            series = self.skip_occurrence(eid, date)
+            if series is None:
+                return None
+            moved = {**series, "date": date, "reminder": "0", **fields, "repeat": "", "exdates": ""}
+            return self.add(moved["date"], moved["start_time"], moved["end_time"], moved["title"],
+                            moved["category"], moved["description"], moved["reminder"])
+
+    def delete(self, eid):
+        """Remove an event by ID"""
+        with self._lock, file_lock(self.path):
+            self._refresh()
+            if eid in self._by_id:
+                self._append("del", {"id": eid})
+
+    def save(self, events):
+        """Replace every event (rewrites the CSV and clears the journal)"""
+        with self._lock, file_lock(self.path):
+            self._rebuild([{**{k: e.get(k, "") for k in FIELDS}, "id": int(e["id"])} for e in events])
+            self._compact()
+
+
+_stores = {}                      # {user or ("shared", name): EventStore} shared by every window
+_stores_lock = threading.Lock()
+
+
+def get_event_store(user):
+    """Return the shared event index for a user (one per process)"""
+    with _stores_lock:
+        if user not in _stores:
+            _stores[user] = EventStore(user)
+        return _stores[user]
+
+
+# =========================================================
+# Shared course calendars
+# =========================================================
+def valid_calendar_name(name):
+    """A calendar name becomes a file name: letters, digits, spaces, - and _ only"""
+    return bool(name) and all(c.isalnum() or c in " -_" for c in name) and name.strip() == name
+
+
+def get_shared_calendar(name):
+    """Return the event index of a shared calendar (one per process, like users')"""
+    if not valid_calendar_name(name):
+        raise ValueError(f"invalid calendar name: {name!r}")
+    key = ("shared", name)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = EventStore(name, shared_file(name))
+        return _stores[key]
+
+
+def shared_calendars():
+    """Names of every shared calendar"""
+    suffix = "_events.csv"
+    paths = glob.glob(os.path.join(SHARED_DIR, "*" + suffix)) + glob.glob(os.path.join(SHARED_DIR, "*_events.journal"))
+    return sorted({os.path.basename(p).rsplit("_events.", 1)[0] for p in paths})
+
+
+_subscriptions = {}               # {user: ((mtime_ns, size), [names])}
+
+
+def subscriptions(user):
+    """The shared calendars a user subscribes to (file re-read only when it changes)"""
+    path = subscriptions_file(user)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return []
+    sig = (st.st_mtime_ns, st.st_size)
+    cached = _subscriptions.get(user)
+    if cached is None or cached[0] != sig:
+        with open(path, encoding="utf-8") as f:
+            names = [line.strip() for line in f if valid_calendar_name(line.strip())]
+        cached = _subscriptions[user] = (sig, names)
+    return list(cached[1])
+
+
+def set_subscriptions(user, names):
+    """Replace the list of shared calendars a user subscribes to"""
+    path = subscriptions_file(user)
+    names = [n for n in dict.fromkeys(names) if valid_calendar_name(n)]  # Keep order, drop repeats
+    with file_lock(path):
+        with atomic_write(path) as f:
+            f.writelines(n + "\n" for n in names)
+    _subscriptions.pop(user, None)
+
+
+def _from_calendar(name, events):
+    """Mark events of a shared calendar (IDs are only unique within one calendar)"""
+    for e in events:
+        e["calendar"] = name
+        e["id"] = f"{name}:{e['id']}"
+        yield e
+
+
+def user_events(user, date):
+    """A user's events on one date: personal plus subscribed calendars, sorted by start
+
+    Each source is already sorted, so the view is a k-way merge of the streams.
+    """
+    streams = [get_event_store(user).events(date)]
+    for name in subscriptions(user):
+        streams.append(_from_calendar(name, get_shared_calendar(name).events(date)))
+    if len(streams) == 1:
+        return streams[0]
+    return list(heapq.merge(*streams, key=lambda e: to_minutes(e["start_time"])))
+
+
+def user_occurrences(user, first, last):
+    """Generator over a user's events between two dates (personal and subscribed), by (date, start)"""
+    streams = [get_event_store(user).occurrences(first, last)]
+    for name in subscriptions(user):
+        streams.append(_from_calendar(name, get_shared_calendar(name).occurrences(first, last)))
+    return heapq.merge(*streams, key=lambda e: (e["date"], to_minutes(e["start_time"])))
+
+
+def user_date_bounds(user):
+    """(first, last) date with events for a user and their subscriptions, or None"""
+    stores = [get_event_store(user)] + [get_shared_calendar(n) for n in subscriptions(user)]
+    dates = [d for store in stores for d in store.dates()]
+    starts = dates + [e["date"] for store in stores for e in store.series()]
+    if not starts:
+        return None
+    return min(starts), max(dates) if dates else min(starts)  # Open-ended series stop at the last one-off
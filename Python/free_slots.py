@@ -0,0 +1,53 @@
+# File: free_slots.py
+import heapq                      # Import heapq to merge every user's sorted busy times
+from concurrent.futures import ThreadPoolExecutor  # Import thread pool to load users in parallel
+from datetime import datetime, timedelta  # Import datetime to walk the date range
+from event_store import user_occurrences, to_minutes  # Import merged personal + course events
+
+DAY_START = 8 * 60                # Earliest slot offered (minutes since midnight)
+DAY_END = 22 * 60                 # Latest slot end offered
+MAX_WORKERS = 8                   # Threads used to load users' timetables
+
+
+def _busy(user, first, last):
+    """One user's busy intervals [(date, start, end)] between two dates, in order"""
+    busy = []
+    for e in user_occurrences(user, first, last):   # Personal + subscribed, sorted by (date, start)
+        try:
+            busy.append((e["date"], to_minutes(e["start_time"]), to_minutes(e["end_time"])))
+        except ValueError:
+            continue
+    return busy
+
+
+def find_free_slots(users, first, last, min_minutes=30, day_start=DAY_START, day_end=DAY_END):
+    """Return [(date, start minute, end minute)] when every user is free for at least min_minutes
+
+    Each user's timetable is loaded on a thread pool; the sorted busy lists
+    are then k-way merged into one stream and swept once per day, so the
+    cost is O(n log k) for n events of k users.
+    """
+    users = list(dict.fromkeys(users))              # Drop repeats, keep order
+    with ThreadPoolExecutor(max_workers=max(1, min(len(users), MAX_WORKERS))) as pool:
+        per_user = list(pool.map(lambda u: _busy(u, first, last), users))
+    busy = heapq.merge(*per_user)                   # All users, by (date, start)
+
+    slots = []
+    pending = next(busy, None)
+    day = datetime.strptime(first, "%Y-%m-%d")
+    end_day = datetime.strptime(last, "%Y-%m-%d")
+    while day <= end_day:
+        date = day.strftime("%Y-%m-%d")
+        free_from = day_start                       # Start of the current gap
+        while pending is not None and pending[0] < date:
+            pending = next(busy, None)              # (Only before the range; kept for safety)
+        while pending is not None and pending[0] == date:
+            _, start, end = pending
+            if min(start, day_end) - free_from >= min_minutes:
+                slots.append((date, free_from, min(start, day_end)))
+            free_from = max(free_from, end)         # Overlapping busy times just extend the block
+            pending = next(busy, None)
+        if day_end - free_from >= min_minutes:
+            slots.append((date, free_from, day_end))
+        day += timedelta(days=1)
+    return slots
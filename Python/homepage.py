@@ -1,12 +1,10 @@
 # File: homepage.py
 import tkinter as tk                    # Import tkinter for GUI components
-from PIL import Image, ImageTk          # Import Pillow for image handling
-import os                               # Import os for file and path handling
-from simple_reminder import ReminderApp # Import ReminderApp for reminder feature
-from student_timetable import open_timetable   # Import timetable window function
-from make_appointment import open_appointment # Import appointment window function
-from notes_organizer_app import NotesOrganizerApp # Import Notes Organizer feature
-from room_booking.main import MainApp   # Import MainApp for discussion room booking
+from tick_scheduler import get_scheduler  # Import the shared timer service for all windows
+from asset_cache import get_icon        # Import the shared icon cache (Pillow loaded only if needed)
+
+# Feature modules (and Pillow) are imported on first click, not at startup,
+# so the login window paints without waiting for every feature to load.
 
 # =========================================================
 # Main Homepage Function
@@ -25,6 +23,7 @@ def open_main_app(login_window, current_user):
         if reminder_window is not None and reminder_window.winfo_exists():
             reminder_window.lift()              # If window exists, bring it to front
             return
+        from simple_reminder import ReminderApp # Import ReminderApp for reminder feature
         reminder_window = tk.Toplevel(root)     # Create new window
         ReminderApp(reminder_window, current_user)  # Start ReminderApp
 
@@ -34,6 +33,7 @@ def open_main_app(login_window, current_user):
         if notes_window is not None and notes_window.winfo_exists():
             notes_window.lift()                 # If already open, bring to front
             return
+        from notes_organizer_app import NotesOrganizerApp # Import Notes Organizer feature
         notes_window = tk.Toplevel(root)        # Create new window
         NotesOrganizerApp(notes_window, current_user)  # Start NotesOrganizerApp
 
@@ -43,9 +43,25 @@ def open_main_app(login_window, current_user):
         if booking_window is not None and booking_window.winfo_exists():
             booking_window.lift()               # If already open, bring to front
             return
+        from room_booking.main import MainApp   # Import MainApp for discussion room booking
         booking_window = MainApp(root, current_user)  # Start MainApp for booking
         root.withdraw()                         # Hide homepage while booking is open
 
+    # ---------------- Timetable ----------------
+    def open_timetable_window():
+        from student_timetable import open_timetable   # Import timetable window function
+        open_timetable(root, current_user)
+
+    # ---------------- Appointment ----------------
+    def open_appointment_window():
+        from make_appointment import open_appointment # Import appointment window function
+        open_appointment(root, current_user)
+
+    # ---------------- Reminder Daemon ----------------
+    def start_reminder_daemon():
+        from reminder_daemon import start_daemon  # Fires reminders even while the reminder window is closed
+        start_daemon()
+
     # ---------------- Logout ----------------
     def logout():
         root.destroy()          # Close homepage window
@@ -56,17 +72,16 @@ def open_main_app(login_window, current_user):
     root.geometry("500x500")             # Set size
     root.configure(bg="#fdf6e3")         # Set background color (cream)
     root.title("TAR UMT Student Assistant App")  # Set window title
+    scheduler = get_scheduler(root)              # One timer service shared by every feature window
+    scheduler.call_later(200, start_reminder_daemon)  # Start it once the homepage has painted
 
     # ---------------- Title Section ----------------
     title_frame = tk.Frame(root, bg="#fdf6e3")   # Frame for title
     title_frame.pack(pady=20)
 
-    if os.path.exists("lightbulb.png"):          # Check if icon exists
-        img = Image.open(os.path.join("assets", "lightbulb.png")).resize((50, 50))
-        # Open and resize icon image
-        photo = ImageTk.PhotoImage(img)          # Convert to Tkinter-compatible format
+    photo = get_icon(root, "lightbulb.png", (50, 50))  # Cached 50x50 icon (None if missing)
+    if photo is not None:
         icon = tk.Label(title_frame, image=photo, bg="#fdf6e3")
-        icon.image = photo                       # Keep a reference to avoid garbage collection
         icon.pack(side="right", padx=5)          # Place on right side of title bar
 
     title_label = tk.Label(
@@ -104,8 +119,8 @@ def open_main_app(login_window, current_user):
 
     # Create feature buttons
     make_button("🕒 Simple Reminder App", "#FFD700", open_reminder).pack(pady=10)
-    make_button("📅 Student Timetable", "#90EE90", lambda: open_timetable(root, current_user)).pack(pady=10)
-    make_button("📌 Make Appointment", "#ADD8E6", lambda: open_appointment(root, current_user)).pack(pady=10)
+    make_button("📅 Student Timetable", "#90EE90", open_timetable_window).pack(pady=10)
+    make_button("📌 Make Appointment", "#ADD8E6", open_appointment_window).pack(pady=10)
     make_button("🏠 Discussion Room Booking", "#FFA07A", open_booking).pack(pady=10)
     make_button("📒 Notes Organizer", "#3498db", open_notes_organizer).pack(pady=10) 
 
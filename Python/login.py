@@ -1,10 +1,13 @@
 import tkinter as tk              # Import tkinter for GUI components
 from tkinter import messagebox    # Import messagebox for popup dialogs
 import os                         # Import os for file and directory handling
+import threading                  # Import threading to hash passwords off the UI thread
+import queue                      # Import queue to hand worker results back to Tk
+import user_store                 # Import indexed user store (lookup / registration)
 from homepage import open_main_app  # Import function to open the main app after login
 
 # --- Global variables for this file ---
-USER_FILE = os.path.join("data", "users.txt")  # Path to user data file
+USER_FILE = user_store.USER_FILE               # Path to user data file
 current_user = ""                              # Store currently logged-in username
 
 
@@ -19,35 +22,33 @@ def ensure_user_file():
             pass
 
 
-def read_users():
-    """Return [(student_id, username, password), ...]"""
-    ensure_user_file()                         # Ensure user file exists before reading
-    users = []                                 # Initialize empty list
-    with open(USER_FILE, "r", encoding="utf-8") as f:   # Open user file in read mode
-        for line in f:                         # Read each line
-            parts = line.strip().split(",")    # Split by comma
-            if len(parts) == 3:                # New format: id, username, password
-                users.append((parts[0], parts[1], parts[2]))
-            elif len(parts) == 2:              # Old format fallback: username, password
-                users.append(("0000000", parts[0], parts[1]))  # Use default ID
-    return users                               # Return list of users
+def run_in_background(widget, func, args, on_done, on_error):
+    """Run a slow call (password hashing) on a worker thread
 
+    on_done(result), or on_error(exception) if the call raised, runs on the Tk thread.
+    """
+    results = queue.Queue(maxsize=1)
 
-def generate_student_id():
-    """Generate a new unique student ID"""
-    users = read_users()                       # Load all users
-    ids = [int(u[0]) for u in users if u[0].isdigit()]  # Collect valid numeric IDs
-    if not ids:                                # If no IDs exist
-        return "1000001"                       # Start from 1000001
-    return str(max(ids) + 1).zfill(7)          # Otherwise assign max+1, padded to 7 digits
+    def work():
+        try:
+            results.put((None, func(*args)))
+        except Exception as e:                  # I/O error, bad users.txt line, ...
+            results.put((e, None))             # Still report back, or poll() would spin forever
 
+    threading.Thread(target=work, daemon=True).start()
 
-def write_user(username, password):
-    """Write new user with auto student_id"""
-    student_id = generate_student_id()         # Generate a new ID
-    with open(USER_FILE, "a", encoding="utf-8") as f:   # Open file in append mode
-        f.write(f"{student_id},{username},{password}\n")  # Write user info
-    return student_id                          # Return assigned ID
+    def poll():
+        try:
+            error, result = results.get_nowait()  # Worker finished?
+        except queue.Empty:
+            widget.after(20, poll)              # Not yet: check again shortly
+            return
+        if error is not None:
+            on_error(error)
+        else:
+            on_done(result)
+
+    widget.after(20, poll)
 
 
 # =========================================================
@@ -80,18 +81,30 @@ def open_register_window(parent):
             messagebox.showwarning("Warning", "Fields cannot be empty!", parent=reg_win)
             return
 
-        users = read_users()                     # Load existing users
-        if any(saved_user == username for _, saved_user, _ in users):
+        register_btn.config(state="disabled")    # Block double clicks while hashing
+        run_in_background(reg_win, user_store.register_user, (username, password),
+                          lambda student_id: finish_register(username, student_id),
+                          register_failed)
+
+    def register_failed(error):
+        """Registration raised: let the user try again (runs on the Tk thread)"""
+        register_btn.config(state="normal")
+        messagebox.showerror("Error", f"Could not register: {error}", parent=reg_win)
+
+    def finish_register(username, student_id):
+        """Show the registration result (runs on the Tk thread)"""
+        register_btn.config(state="normal")
+        if student_id is None:
             # If username already exists, show error
             messagebox.showerror("Error", "Username already exists!", parent=reg_win)
             return
 
-        student_id = write_user(username, password)  # Save new user
         messagebox.showinfo("Success", f"User '{username}' registered successfully!\nAssigned Student ID: {student_id}", parent=reg_win)
         # Show success message with assigned ID
         reg_win.destroy()                        # Close register window
 
-    tk.Button(reg_win, text="Register", bg="lightgreen", width=15, command=register_user).pack(pady=15)
+    register_btn = tk.Button(reg_win, text="Register", bg="lightgreen", width=15, command=register_user)
+    register_btn.pack(pady=15)
     # Button to trigger registration
 
 
@@ -100,23 +113,36 @@ def open_register_window(parent):
 # =========================================================
 def login_user():
     """Handle user login"""
-    global current_user
     username = user_entry.get().strip()         # Get username input
     password = pass_entry.get().strip()         # Get password input
 
-    users = read_users()                        # Load users
-    for saved_sid, saved_user, saved_pass in users:  # Check each user
-        if saved_user == username and saved_pass == password:  # Match found
-            current_user = username             # Set current user
-            messagebox.showinfo("Login Successful", f"Welcome, {username}!\nID: {saved_sid}", parent=login_window)
-            # Show success popup with ID
-            user_entry.delete(0, tk.END)        # Clear username field
-            pass_entry.delete(0, tk.END)        # Clear password field
-            login_window.withdraw()             # Hide login window
-            open_main_app(login_window, current_user)  # Open main app
-            return
+    login_btn.config(state="disabled")          # Block double clicks while hashing
+    run_in_background(login_window, user_store.authenticate, (username, password),
+                      lambda saved_sid: finish_login(username, saved_sid),
+                      login_failed)
+
+
+def login_failed(error):
+    """The password check raised (e.g. users.txt unreadable): let the user try again (Tk thread)"""
+    login_btn.config(state="normal")
+    messagebox.showerror("Login Failed", f"Could not check your login: {error}", parent=login_window)
 
-    # If loop finishes without returning -> wrong login
+
+def finish_login(username, saved_sid):
+    """Open the app or report failure once the password check is done (Tk thread)"""
+    global current_user
+    login_btn.config(state="normal")
+    if saved_sid is not None:                   # Match found
+        current_user = username                 # Set current user
+        messagebox.showinfo("Login Successful", f"Welcome, {username}!\nID: {saved_sid}", parent=login_window)
+        # Show success popup with ID
+        user_entry.delete(0, tk.END)            # Clear username field
+        pass_entry.delete(0, tk.END)            # Clear password field
+        login_window.withdraw()                 # Hide login window
+        open_main_app(login_window, current_user)  # Open main app
+        return
+
+    # No such user or wrong password
     messagebox.showerror("Login Failed", "Wrong username or password!", parent=login_window)
     pass_entry.delete(0, tk.END)                # Clear only password field
 
@@ -124,6 +150,7 @@ def login_user():
 # =========================================================
 # Main login window
 # =========================================================
+ensure_user_file()                              # Create data/users.txt on first run
 login_window = tk.Tk()                          # Create the root window
 login_window.title("Login")                     # Set title
 login_window.geometry("350x250")                # Set size
@@ -143,7 +170,8 @@ pass_entry.pack(pady=5)
 btn_frame = tk.Frame(login_window)              # Frame for buttons
 btn_frame.pack(pady=15)
 
-tk.Button(btn_frame, text="Login", bg="lightblue", width=10, command=login_user).grid(row=0, column=0, padx=10)
+login_btn = tk.Button(btn_frame, text="Login", bg="lightblue", width=10, command=login_user)
+login_btn.grid(row=0, column=0, padx=10)
 # Login button
 
 tk.Button(btn_frame, text="Register", bg="lightgreen", width=10, command=lambda: open_register_window(login_window)).grid(row=0, column=1, padx=10)
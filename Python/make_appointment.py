@@ -1,16 +1,21 @@
 # File: make_appointment.py
 import tkinter as tk  # import tkinter for GUI
 from tkinter import ttk, messagebox  # import ttk for styled widgets, messagebox for dialogs
-from datetime import datetime  # import datetime for date and time handling
+from datetime import datetime, timedelta  # import datetime for date and time handling
 import os  # import os for file path operations
-from student_timetable import (  # import timetable functions
-    load_events,  # command: load events from file
-    add_event_txt,  # command: add an event to file
-    delete_event_txt  # command: delete an event from file
+from user_store import USER_FILE, list_usernames  # import indexed user store
+from student_timetable import load_events  # import timetable loader
+from free_slots import find_free_slots  # command: import group free-time finder
+from appointments import (  # command: import two-party transactions
+    create_appointment,
+    cancel_appointment,
+    reschedule_appointment,
+    link_appointments,
+    recover
 )
 
 
-USERS_FILE = os.path.join("data", "users.txt")  # command: set the file path for users
+USERS_FILE = USER_FILE  # command: set the file path for users
 
 
 def to_minutes(hhmm: str) -> int:  # command: convert HH:MM to total minutes
@@ -86,12 +91,17 @@ class AppointmentApp:  # command: main appointment GUI class
         ttk.Combobox(root, textvariable=self.end_ampm, values=ampm,   width=4, state="readonly").place(x=350, y=140)  # command: end AM/PM dropdown
 
         tk.Button(root, text="Make Appointment", bg="lightgreen", command=self.make_appointment).place(x=100, y=180)  # command: button to create appointment
+        tk.Button(root, text="Find Free Slots", bg="lightyellow", command=self.free_slots_popup).place(x=250, y=180)  # command: button to search common free time
         tk.Button(root, text="Cancel Selected", bg="lightcoral", command=self.cancel_appointment).place(x=400, y=180)  # command: button to cancel selected appointment
 
         tk.Label(root, text="Your Appointment History:", bg="lightcyan").place(x=20, y=230)  # command: label for history
+        tk.Button(root, text="Reschedule Selected", bg="lightblue", command=self.reschedule_appointment).place(x=400, y=225)  # command: move selected appointment to the form's date/time
         self.history_listbox = tk.Listbox(root, width=70, height=8)  # command: listbox to show appointment history
         self.history_listbox.place(x=20, y=260)  # command: place listbox
 
+        self.history = []  # command: appointment events, one per listbox row
+        recover()  # command: finish any appointment a crashed session left half-written
+        link_appointments(self.current_user)  # command: give old title-linked appointments a shared ID (unpaired ones are marked in the list)
         self.refresh_history()  # command: refresh the listbox with current appointments
 
     def generate_time_options(self):  # command: generate times for dropdown
@@ -107,41 +117,17 @@ class AppointmentApp:  # command: main appointment GUI class
             messagebox.showerror("Error", f"{USERS_FILE} not found.")  # command: error if missing
             return
 
-        users = []
-        with open(USERS_FILE, "r", encoding="utf-8") as f:  # command: open file
-            for line in f:
-                parts = line.strip().split(",")  # command: split line
-                if len(parts) == 2:  # command: format username,password
-                    username, _ = parts
-                    if username != self.current_user:
-                        users.append(username)  # command: add user
-                elif len(parts) == 3:  # command: format id,username,password
-                    student_id, username, _ = parts
-                    if username != self.current_user:
-                        users.append(username)  # command: add user
+        users = [u for u in list_usernames() if u != self.current_user]  # command: every user except me
 
         self.user_combobox["values"] = users  # command: update dropdown
         if users:
             self.user_var.set(users[0])  # command: default selection
 
-    def has_conflict(self, events, start, end):  # command: check for conflicts
-        for e in events:
-            e_start = to_minutes(e['start_time'])  # command: event start minutes
-            e_end = to_minutes(e['end_time'])  # command: event end minutes
-            if start < e_end and end > e_start:  # command: check overlap
-                return True  # command: conflict found
-        return False  # command: no conflict
-
-    def make_appointment(self):  # command: create appointment
-        other_user = self.user_var.get().strip()  # command: get selected user
+    def read_form(self):  # command: date and 24h times from the form, or None after showing an error
         date = f"{self.year_var.get()}-{self.month_var.get()}-{self.day_var.get()}"  # command: get date
         start_str = f"{self.start_hour.get()}:{self.start_min.get()} {self.start_ampm.get()}"  # command: get start time
         end_str   = f"{self.end_hour.get()}:{self.end_min.get()} {self.end_ampm.get()}"  # command: get end time
 
-        if not other_user or not date or not start_str or not end_str:  # command: check blanks
-            messagebox.showerror("Error", "All fields are required!")  # command: show error
-            return
-
         try:
             datetime.strptime(date, "%Y-%m-%d")  # command: validate date
             start_24 = datetime.strptime(start_str, "%I:%M %p").strftime("%H:%M")  # command: convert start to 24h
@@ -150,69 +136,146 @@ class AppointmentApp:  # command: main appointment GUI class
                 raise ValueError
         except ValueError:
             messagebox.showerror("Error", "Invalid date or time!")  # command: show error
-            return
+            return None
+        return date, start_24, end_24
 
-        user_events = load_events(self.current_user, date)  # command: load current user events
-        if self.has_conflict(user_events, to_minutes(start_24), to_minutes(end_24)):  # command: check conflict
-            messagebox.showerror("Error", "Conflict with your timetable!")  # command: show conflict
-            return
-        other_events = load_events(other_user, date)  # command: load other user events
-        if self.has_conflict(other_events, to_minutes(start_24), to_minutes(end_24)):  # command: check conflict
-            messagebox.showerror("Error", "Conflict with other user's timetable!")  # command: show conflict
+    def make_appointment(self):  # command: create appointment
+        other_user = self.user_var.get().strip()  # command: get selected user
+        if not other_user:  # command: check blanks
+            messagebox.showerror("Error", "All fields are required!")  # command: show error
             return
 
-        title_current = f"Appointment with {other_user}"  # command: set current user title
-        add_event_txt(self.current_user, date, start_24, end_24, title_current, category="appointment")  # command: add event
+        form = self.read_form()  # command: validated date and times
+        if form is None:
+            return
+        date, start_24, end_24 = form
 
-        title_other = f"Appointment with {self.current_user}"  # command: set other user title
-        add_event_txt(other_user, date, start_24, end_24, title_other, category="appointment")  # command: add event
+        try:
+            create_appointment(self.current_user, other_user, date, start_24, end_24)  # command: both timetables or neither
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))  # command: show conflict (checked with both timetables locked)
+            return
 
         messagebox.showinfo("Success", "Appointment created!")  # command: show success
         self.refresh_history()  # command: refresh history
 
-    def cancel_appointment(self):  # command: cancel appointment
+    def free_slots_popup(self):  # command: find times when several users are all free
+        popup = tk.Toplevel(self.root)  # command: create popup window
+        popup.title("Find Free Slots")  # command: set popup title
+        popup.geometry("460x480")  # command: set popup size
+        popup.configure(bg="lightcyan")  # command: match main window colour
+
+        tk.Label(popup, text="Users (you are always included):", bg="lightcyan").pack(anchor="w", padx=15, pady=(10, 0))  # command: users label
+        users_box = tk.Listbox(popup, selectmode="multiple", height=6, exportselection=False)  # command: pick several users
+        users_box.pack(fill="x", padx=15)
+        users = list(self.user_combobox["values"])  # command: same users as the dropdown
+        for u in users:
+            users_box.insert(tk.END, u)
+        if self.user_var.get() in users:
+            users_box.selection_set(users.index(self.user_var.get()))  # command: preselect chosen user
+
+        options = tk.Frame(popup, bg="lightcyan")  # command: search options row
+        options.pack(fill="x", padx=15, pady=8)
+        tk.Label(options, text="Days from selected date:", bg="lightcyan").grid(row=0, column=0, sticky="w")
+        days_var = tk.StringVar(value="7")  # command: how many days to search
+        ttk.Combobox(options, textvariable=days_var, values=["1", "3", "5", "7", "14"], width=4, state="readonly").grid(row=0, column=1, padx=5)
+        tk.Label(options, text="Minimum length:", bg="lightcyan").grid(row=1, column=0, sticky="w")
+        length_var = tk.StringVar(value="60")  # command: minimum free minutes
+        ttk.Combobox(options, textvariable=length_var, values=["30", "60", "90", "120"], width=4, state="readonly").grid(row=1, column=1, padx=5)
+        tk.Label(options, text="minutes", bg="lightcyan").grid(row=1, column=2, sticky="w")
+
+        results = tk.Listbox(popup, height=12)  # command: free slots found
+        found = []  # command: (date, start, end) per listbox row
+
+        def search():  # command: run the finder
+            chosen = [users[i] for i in users_box.curselection()]  # command: selected users
+            try:
+                first = datetime.strptime(f"{self.year_var.get()}-{self.month_var.get()}-{self.day_var.get()}", "%Y-%m-%d")
+            except ValueError:
+                messagebox.showerror("Error", "Invalid date!", parent=popup)  # command: show error
+                return
+            last = first + timedelta(days=int(days_var.get()) - 1)  # command: end of range
+            slots = find_free_slots([self.current_user] + chosen, first.strftime("%Y-%m-%d"),
+                                    last.strftime("%Y-%m-%d"), min_minutes=int(length_var.get()))  # command: merged busy times
+            results.delete(0, tk.END)
+            found[:] = slots
+            for date, start, end in slots:
+                results.insert(tk.END, f"{date} | {to_12h_str(f'{start // 60:02d}:{start % 60:02d}')} - "
+                                       f"{to_12h_str(f'{end // 60:02d}:{end % 60:02d}')}")  # command: list slot
+            if not slots:
+                results.insert(tk.END, "No common free time in this range.")
+            popup.chosen = chosen  # command: remember who the slots are for
+
+        def use_slot(_event=None):  # command: copy a slot into the appointment form
+            sel = results.curselection()
+            if not sel or sel[0] >= len(found):
+                return
+            date, start, _ = found[sel[0]]
+            end = min(start + int(length_var.get()), found[sel[0]][2])  # command: book the minimum length
+            self.year_var.set(date[:4])
+            self.month_var.set(date[5:7])
+            self.day_var.set(date[8:10])
+            for minutes, hour_var, min_var, ampm_var in ((start, self.start_hour, self.start_min, self.start_ampm),
+                                                         (end, self.end_hour, self.end_min, self.end_ampm)):
+                t = datetime(2000, 1, 1, minutes // 60, minutes % 60)  # command: minutes -> 12h parts
+                hour_var.set(t.strftime("%I"))
+                min_var.set(t.strftime("%M"))
+                ampm_var.set(t.strftime("%p"))
+            if len(getattr(popup, "chosen", [])) == 1:
+                self.user_var.set(popup.chosen[0])  # command: one other user: fill them in too
+            popup.destroy()
+
+        tk.Button(popup, text="Search", bg="lightgreen", command=search).pack(pady=(0, 5))  # command: search button
+        results.pack(fill="both", expand=True, padx=15)
+        results.bind("<Double-1>", use_slot)  # command: double-click to use a slot
+        tk.Label(popup, text="Double-click a slot to fill in the appointment form.", bg="lightcyan", fg="gray").pack(pady=5)
+
+    def selected_appointment(self):  # command: event of the selected listbox row, or None after showing an error
         selection = self.history_listbox.curselection()  # command: get selected index
-        if not selection:
+        if not selection or selection[0] >= len(self.history):
             messagebox.showerror("Error", "No appointment selected!")  # command: show error
-            return
-        idx = selection[0]  # command: get index
-        line = self.history_listbox.get(idx)  # command: get line text
-        date, time_str, title = line.split(" | ", 2)  # command: split line
-        start_str, end_str = time_str.split(" - ")  # command: split time
-
-        start_24 = datetime.strptime(start_str.strip(), "%I:%M %p").strftime("%H:%M")  # command: convert start
-        end_24 = datetime.strptime(end_str.strip(), "%I:%M %p").strftime("%H:%M")  # command: convert end
-
-        user_events = load_events(self.current_user, date)  # command: load user events
-        to_delete = None  # command: init
-        for e in user_events:
-            if e['title'] == title and e['start_time'] == start_24 and e['end_time'] == end_24:  # command: match event
-                to_delete = e
-                break
-
-        if not to_delete:
-            messagebox.showerror("Error", "Appointment not found in your records.")  # command: show error
-            return
+            return None
+        return self.history[selection[0]]  # command: same order as the listbox rows
 
-        delete_event_txt(self.current_user, to_delete['id'])  # command: delete event
+    def cancel_appointment(self):  # command: cancel appointment
+        event = self.selected_appointment()  # command: no need to parse the listbox text
+        if event is None:
+            return
 
-        if title.startswith("Appointment with "):  # command: remove from other user
-            other_user = title.replace("Appointment with ", "").strip()
-            other_events = load_events(other_user, date)
-            for ev in other_events:
-                if ev['title'] == f"Appointment with {self.current_user}" and ev['start_time'] == start_24 and ev['end_time'] == end_24:
-                    delete_event_txt(other_user, ev['id'])
-                    break
+        cancel_appointment(self.current_user, event)  # command: delete both sides together (found by appointment ID)
 
         messagebox.showinfo("Success", "Appointment cancelled.")  # command: show success
         self.refresh_history()  # command: refresh history
 
+    def reschedule_appointment(self):  # command: move selected appointment to the date/time in the form
+        event = self.selected_appointment()
+        if event is None:
+            return
+        form = self.read_form()  # command: new date and times
+        if form is None:
+            return
+        if not event.get("appointment"):
+            messagebox.showerror("Error", "Appointment not found in your records.")  # command: not linked to the other user
+            return
+
+        try:
+            reschedule_appointment(self.current_user, event["appointment"], *form)  # command: both timetables or neither
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))  # command: show conflict
+            return
+
+        messagebox.showinfo("Success", "Appointment rescheduled.")  # command: show success
+        self.refresh_history()  # command: refresh history
+
     def refresh_history(self):  # command: update history listbox
         self.history_listbox.delete(0, tk.END)  # command: clear listbox
         events = load_events(self.current_user)  # command: load events
-        appointments = [e for e in events if e['title'].startswith("Appointment with ")]  # command: filter appointments
-        for e in sorted(appointments, key=lambda x: (x['date'], x['start_time'])):  # command: sort
+        appointments = [e for e in events if e.get('appointment') or e['title'].startswith("Appointment with ")]  # command: filter appointments
+        self.history = sorted(appointments, key=lambda x: (x['date'], x['start_time']))  # command: sort
+        for e in self.history:
             line = f"{e['date']} | {to_12h_str(e['start_time'])} - {to_12h_str(e['end_time'])} | {e['title']}"  # command: format line
+            if not e.get('appointment'):
+                line += " (not in their timetable)"  # command: old row with no counterpart to link
             self.history_listbox.insert(tk.END, line)  # command: insert line
 
 def open_appointment(parent, current_user):  # command: open appointment window
@@ -0,0 +1,101 @@
+# File: passwords.py
+import hashlib                    # Import hashlib for scrypt / PBKDF2 key derivation
+import hmac                       # Import hmac for constant-time comparison
+import os                         # Import os for random salts
+import time                       # Import time for the latency benchmark
+
+# --- Cost parameters (raise these as hardware gets faster) ---
+SCRYPT_N = 2 ** 14                # CPU/memory cost (16 MiB with r=8)
+SCRYPT_R = 8                      # Block size
+SCRYPT_P = 1                      # Parallelism
+PBKDF2_ITERATIONS = 600_000       # Used when hashlib was built without scrypt
+SALT_BYTES = 16                   # Random salt length per password
+
+HAS_SCRYPT = hasattr(hashlib, "scrypt")  # scrypt needs OpenSSL 1.1+
+DEFAULT_SCHEME = "scrypt" if HAS_SCRYPT else "pbkdf2_sha256"
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=128 * r * (n + p + 2), dklen=32)
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+
+
+def hash_password(password, scheme=None):
+    """Return a salted hash string safe to store in users.txt (no commas)"""
+    scheme = scheme or DEFAULT_SCHEME
+    salt = os.urandom(SALT_BYTES)
+    if scheme == "scrypt":
+        digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${digest.hex()}"
+    digest = _pbkdf2(password, salt, PBKDF2_ITERATIONS)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${salt.hex()}${digest.hex()}"
+
+
+def is_hashed(stored):
+    """True if the stored value is one of our hash formats (not legacy plaintext)"""
+    return stored.startswith(("scrypt$", "pbkdf2_sha256$"))
+
+
+def verify_password(password, stored):
+    """Check a password against a stored hash (or a legacy plaintext entry)"""
+    parts = stored.split("$")
+    try:
+        if parts[0] == "scrypt" and len(parts) == 6:
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            digest = _scrypt(password, bytes.fromhex(parts[4]), n, r, p)
+            return hmac.compare_digest(digest.hex(), parts[5])
+        if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            digest = _pbkdf2(password, bytes.fromhex(parts[2]), int(parts[1]))
+            return hmac.compare_digest(digest.hex(), parts[3])
+    except ValueError:
+        return False              # Corrupt entry never matches
+    return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))  # Legacy plaintext
+
+
+def needs_rehash(stored):
+    """True if the entry is plaintext or was hashed with weaker settings than today's"""
+    if not is_hashed(stored):
+        return True
+    parts = stored.split("$")
+    if parts[0] == "scrypt":
+        return (int(parts[1]), int(parts[2]), int(parts[3])) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return DEFAULT_SCHEME != "pbkdf2_sha256" or int(parts[1]) != PBKDF2_ITERATIONS
+
+
+_DUMMY_HASH = None                # Hash checked for unknown users so timing doesn't leak names
+
+
+def dummy_verify(password):
+    """Spend the same time as a real check (used when the username doesn't exist)"""
+    global _DUMMY_HASH
+    if _DUMMY_HASH is None:
+        _DUMMY_HASH = hash_password("dummy-password")
+    verify_password(password, _DUMMY_HASH)
+    return False
+
+
+# =========================================================
+# Benchmark: python passwords.py
+# =========================================================
+def benchmark(rounds=5):
+    """Print average hash / verify latency for each available scheme"""
+    schemes = ["scrypt", "pbkdf2_sha256"] if HAS_SCRYPT else ["pbkdf2_sha256"]
+    for scheme in schemes:
+        start = time.perf_counter()
+        stored = [hash_password("benchmark-pass", scheme) for _ in range(rounds)]
+        hash_ms = (time.perf_counter() - start) / rounds * 1000
+        start = time.perf_counter()
+        for s in stored:
+            verify_password("benchmark-pass", s)
+        verify_ms = (time.perf_counter() - start) / rounds * 1000
+        marker = " (default)" if scheme == DEFAULT_SCHEME else ""
+        print(f"{scheme:<14}{marker:<10} hash {hash_ms:7.1f} ms   login/verify {verify_ms:7.1f} ms")
+
+
+if __name__ == "__main__":
+    print(f"scrypt n={SCRYPT_N} r={SCRYPT_R} p={SCRYPT_P} | pbkdf2 iterations={PBKDF2_ITERATIONS}")
+    benchmark()
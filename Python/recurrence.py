@@ -0,0 +1,248 @@
+# File: recurrence.py
+import calendar                   # Import calendar for month lengths
+from datetime import datetime, timedelta  # Import datetime/timedelta for occurrence maths
+
+# Stored in the reminder "repeat" column, e.g. "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;COUNT=5"
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY")
+WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]  # Index = datetime.weekday()
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+LEGACY_ALIASES = {                # Old repeat values keep working unchanged
+    "Daily": "FREQ=DAILY",
+    "Weekly": "FREQ=WEEKLY",
+}
+PRESETS = {                       # Choices offered in the reminder form
+    "None": None,
+    "Daily": "FREQ=DAILY",
+    "Weekdays": "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR",
+    "Weekly": "FREQ=WEEKLY",
+    "Monthly": "FREQ=MONTHLY",
+}
+RULE_PARTS = ("FREQ", "INTERVAL", "BYDAY", "UNTIL", "COUNT", "WKST", "EXDATE")  # Anything else: not our subset
+DUE_FORMAT = "%Y-%m-%dT%H:%M"     # Same as reminder_repository.DUE_FORMAT
+MAX_MONTH_SKIPS = 400             # Enough to find Feb 29 with any interval (then give up)
+
+
+class Rule:
+    """One recurrence rule (a small subset of iCalendar RRULE)
+
+    FREQ      DAILY, WEEKLY or MONTHLY
+    INTERVAL  every N days / weeks / months (default 1)
+    BYDAY     weekdays to fire on, e.g. MO,WE (DAILY / WEEKLY only)
+    UNTIL     last date, YYYYMMDD (inclusive)
+    COUNT     occurrences left, counting the current one
+    EXDATE    dates to skip, YYYYMMDD,... (reminders of a timetable series
+              only: events keep their skipped dates in their own column)
+    Times of day always come from the reminder's own due time. Rules using
+    any other part (BYMONTHDAY, BYHOUR, "2MO"-style BYDAY, ...) don't parse,
+    rather than being read as a different schedule.
+    """
+
+    def __init__(self, freq, interval=1, byday=None, until=None, count=None, exdates=None):
+        self.freq = freq
+        self.interval = interval
+        self.byday = sorted(set(byday)) if byday else []  # Weekday numbers 0=Mon .. 6=Sun
+        self.until = until                                 # date or None
+        self.count = count                                 # int or None
+        self.exdates = sorted(set(exdates)) if exdates else []  # Skipped dates (still use up COUNT)
+
+    @classmethod
+    def parse(cls, text):
+        """Parse a repeat value; returns None for "None", blank, unreadable or unsupported values"""
+        text = LEGACY_ALIASES.get(text, text or "")
+        if text.upper().startswith("RRULE:"):
+            text = text[6:]
+        parts = {}
+        for item in text.split(";"):
+            if "=" in item:
+                key, value = item.split("=", 1)
+                parts[key.strip().upper()] = value.strip().upper()
+        if any(key not in RULE_PARTS for key in parts) or parts.get("WKST", "MO") != "MO":
+            return None           # Weeks always start on Monday here
+        byday = parts["BYDAY"].split(",") if parts.get("BYDAY") else []
+        if any(d not in WEEKDAYS for d in byday) or (byday and parts.get("FREQ") == "MONTHLY"):
+            return None           # "2MO" / "-1FR" (nth weekday) isn't supported
+        try:
+            if parts.get("FREQ") not in FREQUENCIES:
+                return None
+            until = parts.get("UNTIL")
+            rule = cls(
+                parts["FREQ"],
+                interval=int(parts.get("INTERVAL", 1)),
+                byday=[WEEKDAYS.index(d) for d in byday],
+                until=datetime.strptime(until[:8], "%Y%m%d").date() if until else None,
+                count=int(parts["COUNT"]) if "COUNT" in parts else None,
+                exdates=[datetime.strptime(d[:8], "%Y%m%d").date()
+                         for d in parts["EXDATE"].split(",")] if parts.get("EXDATE") else None,
+            )
+        except ValueError:
+            return None
+        if rule.interval < 1 or (rule.count is not None and rule.count < 1):
+            return None
+        return rule
+
+    def __str__(self):
+        text = f"FREQ={self.freq}"
+        if self.interval != 1:
+            text += f";INTERVAL={self.interval}"
+        if self.byday:
+            text += ";BYDAY=" + ",".join(WEEKDAYS[d] for d in self.byday)
+        if self.until is not None:
+            text += f";UNTIL={self.until:%Y%m%d}"
+        if self.count is not None:
+            text += f";COUNT={self.count}"
+        if self.exdates:
+            text += ";EXDATE=" + ",".join(f"{d:%Y%m%d}" for d in self.exdates)
+        return text
+
+    # ---------------- Next occurrence ----------------
+    def next_after(self, anchor, after):
+        """Return the first occurrence later than both anchor and after, or None
+
+        anchor is an occurrence of the rule (the reminder's current due time).
+        The answer is worked out from the interval, so occurrences missed while
+        the app was closed are skipped rather than replayed one by one.
+        UNTIL is checked here; COUNT is handled by advance().
+        """
+        start = max(anchor, after)
+        if self.freq == "DAILY":
+            nxt = self._next_daily(anchor, start)
+        elif self.freq == "WEEKLY":
+            nxt = self._next_weekly(anchor, start)
+        else:
+            nxt = self._next_monthly(anchor, start)
+        if nxt is None or (self.until is not None and nxt.date() > self.until):
+            return None
+        return nxt
+
+    def _next_daily(self, anchor, start):
+        step = timedelta(days=self.interval)
+        nxt = anchor + ((start - anchor) // step + 1) * step
+        if not self.byday:
+            return nxt
+        for _ in range(7):                         # Weekday pattern repeats within 7 steps
+            if nxt.weekday() in self.byday:
+                return nxt
+            nxt += step
+        return None                                # e.g. every 7 days but BYDAY misses it
+
+    def _next_weekly(self, anchor, start):
+        days = self.byday or [anchor.weekday()]
+        week0 = anchor - timedelta(days=anchor.weekday())   # Monday of the anchor week
+        weeks = (start - week0).days // 7
+        weeks = -(-weeks // self.interval) * self.interval  # Round up to an active week
+        for w in (weeks, weeks + self.interval):            # This active week, else the next
+            week_start = week0 + timedelta(weeks=w)
+            for d in days:
+                nxt = week_start + timedelta(days=d)
+                if nxt > start:
+                    return nxt
+        return None
+
+    def _next_monthly(self, anchor, start):
+        months = (start.year - anchor.year) * 12 + start.month - anchor.month
+        months = -(-months // self.interval) * self.interval  # Round up to an active month
+        for _ in range(MAX_MONTH_SKIPS):
+            y, m = divmod(anchor.month - 1 + months, 12)
+            y += anchor.year
+            if anchor.day <= calendar.monthrange(y, m + 1)[1]:  # Skip months without that day
+                nxt = anchor.replace(year=y, month=m + 1)
+                if nxt > start:
+                    return nxt
+            months += self.interval
+        return None
+
+    # ---------------- Display ----------------
+    def describe(self):
+        """Short text for the reminder list, e.g. "Every 2 weeks on Mon, Wed" """
+        unit = {"DAILY": "day", "WEEKLY": "week", "MONTHLY": "month"}[self.freq]
+        if self.interval == 1:
+            text = {"DAILY": "Daily", "WEEKLY": "Weekly", "MONTHLY": "Monthly"}[self.freq]
+        else:
+            text = f"Every {self.interval} {unit}s"
+        if self.byday == [0, 1, 2, 3, 4] and self.interval == 1:
+            text = "Weekdays"
+        elif self.byday:
+            text += " on " + ", ".join(DAY_NAMES[d] for d in self.byday)
+        if self.until is not None:
+            text += f" until {self.until:%Y-%m-%d}"
+        if self.count is not None:
+            text += f" ({self.count} left)"
+        return text
+
+
+# =========================================================
+# Helpers used by the reminder app
+# =========================================================
+def parse_rule(repeat):
+    """Rule for a repeat column value, or None if the reminder doesn't repeat"""
+    return Rule.parse(repeat)
+
+
+def build_rule(preset, interval=1, count=None, until=None):
+    """Repeat value for the form choices (None -> "None")"""
+    base = PRESETS.get(preset)
+    if base is None:
+        return "None"
+    rule = Rule.parse(base)
+    rule.interval = interval
+    rule.count = count
+    rule.until = until
+    return str(rule)
+
+
+def same_schedule(a, b):
+    """True if two repeat values are the same rule apart from COUNT and EXDATE
+
+    A repeating reminder counts its COUNT down each time it fires (and may
+    carry its series' skipped dates), so it still belongs to the event
+    series whose rule has the original COUNT.
+    """
+    rule_a, rule_b = Rule.parse(a), Rule.parse(b)
+    if rule_a is None or rule_b is None:
+        return False
+    rule_a.count = rule_b.count = None
+    rule_a.exdates = rule_b.exdates = []
+    return str(rule_a) == str(rule_b)
+
+
+def describe(repeat):
+    """Readable repeat text for a repeat column value"""
+    rule = Rule.parse(repeat)
+    return rule.describe() if rule else "None"
+
+
+def advance(repeat, due, now=None):
+    """Move a repeating reminder past now
+
+    Returns (next_due, new_repeat), or None when the rule has run out (or
+    doesn't repeat). due/next_due use the reminder format "YYYY-MM-DDTHH:MM".
+    Occurrences missed while the app was closed, and EXDATE ones, still use
+    up COUNT. EXDATEs that are behind the next due date are dropped.
+    """
+    rule = Rule.parse(repeat)
+    if rule is None:
+        return None
+    now = (now or datetime.now()).replace(second=0, microsecond=0)
+    skipped = set(rule.exdates)
+    if rule.count is None:
+        nxt = rule.next_after(datetime.fromisoformat(due), now)
+        while nxt is not None and nxt.date() in skipped:
+            nxt = rule.next_after(nxt, nxt)
+    else:
+        nxt = datetime.fromisoformat(due)
+        left = rule.count
+        while True:               # At most COUNT steps, one per occurrence used up
+            left -= 1
+            nxt = rule.next_after(nxt, nxt)
+            if nxt is None or left < 1:
+                return None
+            if nxt > now and nxt.date() not in skipped:
+                break
+        rule.count = left         # One rule row: the counter lives in the row itself
+    if nxt is None:
+        return None
+    if skipped:
+        rule.exdates = [d for d in rule.exdates if d > nxt.date()]
+    elif rule.count is None:
+        return nxt.strftime(DUE_FORMAT), repeat  # Unchanged (keeps legacy values like "Daily")
+    return nxt.strftime(DUE_FORMAT), str(rule)
@@ -0,0 +1,380 @@
+# File: reminder_daemon.py
+import atexit                     # Import atexit to stop the daemon together with the app
+import csv                        # Import csv for the per-user notification queue
+import glob                       # Import glob to find every user's reminder file
+import heapq                      # Import heapq for the single due-time heap
+import hmac                       # Import hmac for a constant-time token comparison
+import json                       # Import json for the line-based socket protocol
+import os                         # Import os for file and path handling
+import queue                      # Import queue to hand socket messages to the Tk thread
+import secrets                    # Import secrets to create the per-install token
+import selectors                  # Import selectors to sleep until a socket or timer needs us
+import socket                     # Import socket for the localhost GUI connection
+import subprocess                 # Import subprocess to start the daemon in the background
+import sys                        # Import sys to find the Python interpreter
+import threading                  # Import threading for the client reader thread
+from datetime import datetime     # Import datetime for sleep calculations
+from storage import file_lock, process_alive  # Import cross-process lock and owner check
+from reminder_repository import DATA_DIR, get_repository, parse_due, now_due
+
+DAEMON_HOST = "127.0.0.1"         # Only local GUIs may connect
+DAEMON_PORT = 47811               # Fixed port: binding it also keeps the daemon single-instance
+RESCAN_SECONDS = 15               # Longest sleep; picks up new users / edits from other processes
+CONNECT_TIMEOUT = 0.3             # Seconds a GUI waits before running its own scheduler
+STOP_TIMEOUT = 2.0                # Seconds the app waits for its daemon to exit
+TOKEN_FILE = os.path.join(DATA_DIR, "daemon.token")  # Shared secret; only the owner may read it
+NOTIFY_FIELDS = ["id", "task", "due", "repeat", "fired_at"]
+
+
+def daemon_token():
+    """Return the per-install secret a GUI must send in its hello (created on first use)
+
+    The port is open to every local user, so the daemon only serves clients
+    that could read this owner-only file.
+    """
+    os.makedirs(os.path.dirname(TOKEN_FILE) or ".", exist_ok=True)
+    with file_lock(TOKEN_FILE):
+        if not os.path.exists(TOKEN_FILE):
+            fd = os.open(TOKEN_FILE, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(secrets.token_hex(32))
+        elif os.name != "nt" and os.stat(TOKEN_FILE).st_mode & 0o077:
+            os.chmod(TOKEN_FILE, 0o600)  # Tighten a copy restored with loose permissions
+        with open(TOKEN_FILE, encoding="utf-8") as f:
+            return f.read().strip()
+
+
+def notification_file(user):
+    """Return the path of a user's queue of reminders that fired with no GUI open"""
+    return os.path.join(DATA_DIR, f"{user}_notifications.csv")
+
+
+def queue_notifications(user, reminders):
+    """Append fired reminders to the user's notification queue"""
+    path = notification_file(user)
+    with file_lock(path):
+        new_file = not os.path.exists(path)
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=NOTIFY_FIELDS, extrasaction="ignore")
+            if new_file:
+                writer.writeheader()
+            fired_at = now_due()
+            for r in reminders:
+                writer.writerow({**r, "fired_at": fired_at})
+
+
+def take_notifications(user):
+    """Return and clear the user's queued notifications (oldest first)"""
+    path = notification_file(user)
+    if not os.path.exists(path):
+        return []
+    with file_lock(path):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = [dict(r, id=int(r["id"])) for r in csv.DictReader(f) if r.get("id")]
+        os.remove(path)
+    return rows
+
+
+# =========================================================
+# Daemon
+# =========================================================
+class ReminderDaemon:
+    """Fires every user's reminders without any Tk window open
+
+    All Pending reminders of all users sit in one min-heap, so the daemon sleeps
+    until the earliest one is due (or RESCAN_SECONDS) and costs nothing while idle.
+    Due reminders are marked "Ringing" and sent to the user's connected GUIs as
+    JSON lines; with no GUI connected they go to data/<user>_notifications.csv.
+    A GUI must say hello with the token from daemon_token(); others are dropped.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, port=DAEMON_PORT, owner_pid=None):
+        self.data_dir = data_dir
+        self.port = port
+        self.owner_pid = owner_pid    # App that started us: exit once it has gone
+        self.token = daemon_token()
+        self.stopped = False
+        self.selector = selectors.DefaultSelector()
+        self._heap = []               # [(due, user, id)] for every Pending reminder
+        self._repos = {}              # {user: ReminderRepository} being watched
+        self._dirty = set()           # Users whose reminders changed since the heap was built
+        self._clients = {}            # {socket: {"user": name or None, "buffer": bytes}}
+
+    # ---------------- Reminder files ----------------
+    def _watch(self, user):
+        repo = get_repository(user)
+        repo.subscribe(lambda kind, reminders, u=user: self._dirty.add(u))
+        self._repos[user] = repo
+        self._dirty.add(user)
+
+    def rescan(self):
+        """Pick up new users and reminder files changed by other processes"""
+        suffix = "_reminder.csv"
+        for path in glob.glob(os.path.join(self.data_dir, "*" + suffix)):
+            user = os.path.basename(path)[:-len(suffix)]
+            if user not in self._repos:
+                self._watch(user)
+        for repo in self._repos.values():
+            repo.all()                # One stat per file; re-read + notify only when it changed
+        if self._dirty:
+            self._dirty.clear()
+            self._heap = [(r["due"], user, r["id"])
+                          for user, repo in self._repos.items()
+                          for r in repo.all() if r["status"] == "Pending"]
+            heapq.heapify(self._heap)
+
+    def fire_due(self):
+        """Mark every due reminder "Ringing" and deliver or queue it"""
+        this_minute = now_due()
+        due = {}
+        while self._heap and self._heap[0][0] <= this_minute:
+            _, user, rid = heapq.heappop(self._heap)
+            due.setdefault(user, []).append(rid)
+        for user, ids in due.items():
+            repo = self._repos[user]
+            with repo.batch():        # Re-checked under the file lock: a GUI may have got there first
+                fired = [repo.get(rid) for rid in ids]
+                fired = [r for r in fired if r is not None and r["status"] == "Pending"
+                         and r["due"] <= this_minute]
+                repo.set_status({r["id"]: "Ringing" for r in fired})
+                fired = [dict(r) for r in fired]
+            if fired and not self._send(user, [{"event": "due", **r} for r in fired]):
+                queue_notifications(user, fired)
+
+    def _timeout(self):
+        if not self._heap:
+            return RESCAN_SECONDS
+        delay = (parse_due(self._heap[0][0]) - datetime.now()).total_seconds()
+        return min(max(delay, 0), RESCAN_SECONDS)
+
+    # ---------------- GUI connections ----------------
+    def _accept(self, server):
+        conn, _ = server.accept()
+        conn.setblocking(False)
+        self._clients[conn] = {"user": None, "buffer": b""}
+        self.selector.register(conn, selectors.EVENT_READ, self._read)
+
+    def _read(self, conn):
+        try:
+            data = conn.recv(4096)
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(conn)
+            return
+        client = self._clients[conn]
+        client["buffer"] += data
+        *lines, client["buffer"] = client["buffer"].split(b"\n")
+        for line in lines:
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(msg, dict):
+                continue
+            if client["user"] is None:
+                # First line: {"op": "hello", "user": name, "token": secret} or {"op": "stop", "token": secret}
+                if not hmac.compare_digest(str(msg.get("token", "")), self.token):
+                    self._drop(conn)
+                    return
+                if msg.get("op") == "stop":
+                    self.stopped = True   # The app that started us is exiting
+                if msg.get("op") != "hello" or not msg.get("user"):
+                    self._drop(conn)
+                    return
+                client["user"] = msg["user"]
+                if client["user"] not in self._repos:
+                    self._watch(client["user"])
+                queued = take_notifications(client["user"])
+                if queued:
+                    self._send(client["user"], [{"event": "due", "queued": True, **r} for r in queued])
+            elif msg.get("op") == "changed" and client["user"] in self._repos:
+                self._dirty.add(client["user"])  # A GUI changed its reminders: rebuild the heap
+
+    def _send(self, user, messages):
+        """Send messages to every GUI of this user; returns False if none got them"""
+        payload = b"".join(json.dumps(m).encode("utf-8") + b"\n" for m in messages)
+        delivered = False
+        for conn, client in list(self._clients.items()):
+            if client["user"] == user:
+                try:
+                    conn.setblocking(True)
+                    conn.sendall(payload)
+                    conn.setblocking(False)
+                    delivered = True
+                except OSError:
+                    self._drop(conn)
+        return delivered
+
+    def _drop(self, conn):
+        self._clients.pop(conn, None)
+        try:
+            self.selector.unregister(conn)
+        except (KeyError, ValueError):
+            pass
+        conn.close()
+
+    # ---------------- Main loop ----------------
+    def serve_forever(self):
+        server = socket.create_server((DAEMON_HOST, self.port))  # Fails if a daemon already runs
+        server.setblocking(False)
+        self.selector.register(server, selectors.EVENT_READ, self._accept)
+        try:
+            while not self.stopped:
+                if self.owner_pid is not None and not process_alive(self.owner_pid):
+                    break             # The app died without stopping us
+                self.rescan()
+                self.fire_due()
+                for key, _ in self.selector.select(self._timeout()):  # Sleep until socket or due time
+                    key.data(key.fileobj)
+        finally:
+            for conn in list(self._clients):
+                self._drop(conn)
+            self.selector.unregister(server)
+            server.close()
+
+
+# =========================================================
+# GUI side
+# =========================================================
+class DaemonClient:
+    """Connection from a ReminderApp to the daemon
+
+    A reader thread puts incoming messages on a queue and writes a byte to
+    wake_fd's pipe (also once when the connection drops); the Tk thread
+    watches wake_fd and takes the messages with poll(). Tk is never called
+    from the reader thread, and nothing runs while no messages arrive.
+    wake_fd is None where Tk can't watch a pipe (Windows): poll() instead.
+    """
+
+    def __init__(self, sock, user, token):
+        self.sock = sock
+        self.user = user
+        self.messages = queue.Queue()
+        self.connected = True
+        self.wake_fd = None           # Readable whenever messages are waiting
+        self._wake_w = None
+        self._wake_lock = threading.Lock()  # close() must not race a wake-up write
+        if os.name != "nt":
+            self.wake_fd, self._wake_w = os.pipe()
+            os.set_blocking(self.wake_fd, False)
+            os.set_blocking(self._wake_w, False)
+        self.send({"op": "hello", "user": user, "token": token})
+        threading.Thread(target=self._reader, daemon=True).start()
+
+    def _reader(self):
+        buffer = b""
+        try:
+            while True:
+                data = self.sock.recv(4096)
+                if not data:
+                    break
+                buffer += data
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    self.messages.put(json.loads(line))
+                if lines:
+                    self._wake()
+        except (OSError, ValueError):
+            pass
+        self.connected = False
+        self._wake()              # Let the GUI notice and take over scheduling
+
+    def _wake(self):
+        with self._wake_lock:
+            if self._wake_w is not None:
+                try:
+                    os.write(self._wake_w, b"!")
+                except OSError:
+                    pass              # Pipe full: the Tk thread has a wake-up pending anyway
+
+    def send(self, msg):
+        try:
+            self.sock.sendall(json.dumps(msg).encode("utf-8") + b"\n")
+        except OSError:
+            self.connected = False
+
+    def poll(self):
+        """Return the messages received so far (call from the Tk thread)"""
+        if self.wake_fd is not None:
+            try:
+                while os.read(self.wake_fd, 4096):
+                    pass              # Drain first: messages put after this wake us again
+            except OSError:
+                pass
+        msgs = []
+        while True:
+            try:
+                msgs.append(self.messages.get_nowait())
+            except queue.Empty:
+                return msgs
+
+    def close(self):
+        self.connected = False
+        self.sock.close()
+        with self._wake_lock:
+            for fd in (self.wake_fd, self._wake_w):
+                if fd is not None:
+                    os.close(fd)
+            self.wake_fd = self._wake_w = None
+
+
+def connect(user, port=DAEMON_PORT):
+    """Return a DaemonClient, or None if no daemon is running"""
+    try:
+        sock = socket.create_connection((DAEMON_HOST, port), timeout=CONNECT_TIMEOUT)
+    except OSError:
+        return None
+    sock.settimeout(None)
+    return DaemonClient(sock, user, daemon_token())
+
+
+_started = None                   # Popen of the daemon this app started (None: not ours)
+
+
+def start_daemon():
+    """Start the daemon in the background unless one is already running
+
+    A daemon started here stops when this app exits (see stop_daemon).
+    """
+    global _started
+    try:
+        socket.create_connection((DAEMON_HOST, DAEMON_PORT), timeout=CONNECT_TIMEOUT).close()
+        return                        # Already running
+    except OSError:
+        pass
+    daemon_token()                    # Create the token before the daemon or any GUI needs it
+    kwargs = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+    else:
+        kwargs["start_new_session"] = True   # Ctrl+C in the app's terminal goes to the app only
+    _started = subprocess.Popen([sys.executable, os.path.abspath(__file__), str(os.getpid())],
+                                cwd=os.getcwd(), stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL, **kwargs)
+    atexit.register(stop_daemon)
+
+
+def stop_daemon():
+    """Stop the daemon this app started (a daemon started by another app is left alone)"""
+    global _started
+    proc, _started = _started, None
+    if proc is None or proc.poll() is not None:
+        return
+    try:
+        with socket.create_connection((DAEMON_HOST, DAEMON_PORT), timeout=CONNECT_TIMEOUT) as sock:
+            sock.sendall(json.dumps({"op": "stop", "token": daemon_token()}).encode("utf-8") + b"\n")
+    except OSError:
+        pass
+    try:
+        proc.wait(STOP_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        proc.terminate()              # Busy or not answering: stop it the hard way
+
+
+if __name__ == "__main__":
+    # python reminder_daemon.py [app pid]  -> fire reminders for every user until stopped
+    try:
+        ReminderDaemon(owner_pid=int(sys.argv[1]) if len(sys.argv) > 1 else None).serve_forever()
+    except OSError as e:
+        print("Reminder daemon not started:", e)
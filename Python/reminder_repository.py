@@ -0,0 +1,373 @@
+# File: reminder_repository.py
+import csv                        # Import csv to read/write <user>_reminder.csv
+import os                         # Import os for file and path handling
+import sys                        # Import sys for the command-line migrator
+import glob                       # Import glob to find every user's reminder file
+import threading                  # Import threading to guard the cached view
+from contextlib import contextmanager  # Import contextmanager for batch()
+from datetime import datetime     # Import datetime for due-time conversions
+from storage import file_lock, atomic_write  # Import cross-process lock and safe rewrite
+
+DATA_DIR = "data"                 # Directory holding the reminder CSV files
+FORMAT_VERSION = 2                # Current on-disk format
+VERSION_LINE = f"# reminder-format: {FORMAT_VERSION}"  # First line of a v2 file
+FIELDS = ["id", "task", "due", "status", "repeat"]  # v2 schema, rows sorted by due
+DUE_FORMAT = "%Y-%m-%dT%H:%M"     # ISO-8601 local time: sorts as plain text
+LEGACY_FORMAT = "%Y-%m-%d %I:%M %p"  # v1 "datetime" column (doesn't sort because of AM/PM)
+
+
+def reminder_file(user):
+    """Return the file path for a user's reminder CSV file"""
+    return os.path.join(DATA_DIR, f"{user}_reminder.csv")
+
+
+# ---------------- Due-time helpers ----------------
+def to_due(dt):
+    """datetime -> due string ("2025-09-18T15:30")"""
+    return dt.strftime(DUE_FORMAT)
+
+
+def parse_due(due):
+    """due string -> datetime"""
+    return datetime.fromisoformat(due)
+
+
+def now_due():
+    """Current minute as a due string (compare with reminder["due"] as text)"""
+    return to_due(datetime.now())
+
+
+def display_due(due):
+    """due string -> ("2025-09-18", "03:30 PM") for showing to the user"""
+    hour, minute = int(due[11:13]), due[14:16]
+    suffix = "AM" if hour < 12 else "PM"
+    return due[:10], f"{(hour % 12) or 12:02d}:{minute} {suffix}"
+
+
+def due_from_display(date_str, time_str):
+    """("2025-09-18", "03:30 PM") -> due string"""
+    return to_due(datetime.strptime(f"{date_str} {time_str}", LEGACY_FORMAT))
+
+
+class ReminderRepository:
+    """Cached, indexed view of one user's reminders
+
+    Reminders are indexed by ID and by (task, due). The file is only re-read
+    when its mtime/size changes, and every change is pushed to subscribers
+    (e.g. an open ReminderApp) instead of them polling the CSV.
+    Listeners are called as listener(kind, reminders) with kind one of
+    "added", "removed", "updated" or "reloaded".
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.path = reminder_file(user)
+        self._lock = threading.RLock()
+        self._by_id = {}          # {id: reminder dict} in file order
+        self._by_key = {}         # {(task, due): [ids]}
+        self._max_id = -1         # Highest ID in use (next reminder gets +1)
+        self._sorted = True       # _by_id is in due-time order
+        self._signature = None    # (mtime_ns, size) of the file we last read or wrote
+        self._listeners = []
+        self._batch_depth = 0     # >0 while inside batch(): writes are deferred
+        self._dirty = False       # Batch made changes that still need saving
+        self._events = []         # Notifications waiting to be delivered
+
+    # ---------------- Loading ----------------
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _index(self, reminder):
+        if self._by_id and reminder["due"] < self._last_due():
+            self._sorted = False          # Appended out of order: sort before the next save/read
+        self._by_id[reminder["id"]] = reminder
+        self._max_id = max(self._max_id, reminder["id"])
+        self._by_key.setdefault((reminder["task"], reminder["due"]), []).append(reminder["id"])
+
+    def _last_due(self):
+        return self._by_id[next(reversed(self._by_id))]["due"]
+
+    def _unindex(self, reminder):
+        key = (reminder["task"], reminder["due"])
+        ids = self._by_key.get(key, [])
+        if reminder["id"] in ids:
+            ids.remove(reminder["id"])
+        if not ids:
+            self._by_key.pop(key, None)
+        self._by_id.pop(reminder["id"], None)
+
+    def _read_file(self):
+        """Load the file; v2 is a pure read, v1 files are converted and rewritten once"""
+        self._by_id, self._by_key, self._max_id = {}, {}, -1
+        self._sorted = True
+        migrated = False
+        if os.path.exists(self.path):
+            with open(self.path, newline="", encoding="utf-8-sig") as f:  # BOM-safe
+                first = f.readline()
+                if first.strip() == VERSION_LINE:
+                    for row in csv.DictReader(f):
+                        if row.get("task"):
+                            self._index({
+                                "id": int(row["id"]),
+                                "task": row["task"],
+                                "due": row["due"],         # Already sortable: no parsing
+                                "status": row["status"],
+                                "repeat": row["repeat"],
+                            })
+                else:
+                    f.seek(0)
+                    for reminder in read_legacy_rows(f):
+                        self._index(reminder)
+                    migrated = True
+        if migrated:
+            self._sort()
+            with file_lock(self.path):
+                self._save()              # Upgrade the file to the current format
+        self._signature = self._file_signature()
+
+    def _refresh(self):
+        """Re-read the file only if someone else changed it; returns True if it did"""
+        if self._signature is not None and self._file_signature() == self._signature:
+            return False
+        self._read_file()
+        return True
+
+    def _sort(self):
+        """Restore due-time order after an out-of-order add or reschedule"""
+        if not self._sorted:
+            self._by_id = dict(sorted(self._by_id.items(), key=lambda kv: (kv[1]["due"], kv[0])))
+            self._sorted = True
+
+    # ---------------- Saving / notifying ----------------
+    def _save(self):
+        self._sort()
+        with atomic_write(self.path, newline="") as f:
+            f.write(VERSION_LINE + "\r\n")
+            writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(self._by_id.values())
+        self._signature = self._file_signature()
+
+    def _notify(self, kind, reminders):
+        """Queue a notification; delivered once the current change is saved"""
+        self._events.append((kind, reminders))
+
+    def _deliver(self):
+        """Call subscribers (outside the file lock, so they may change the repository)"""
+        events, self._events = self._events, []
+        for kind, reminders in events:
+            for listener in list(self._listeners):
+                listener(kind, reminders)
+
+    @contextmanager
+    def _mutation(self):
+        """Lock the file, pick up outside changes, apply a change and save once
+
+        Inside batch() the lock is already held and the save happens at batch end.
+        """
+        with self._lock:
+            if self._batch_depth:
+                yield
+                self._dirty = True
+                return
+            with file_lock(self.path):
+                if self._refresh():
+                    self._notify("reloaded", list(self._by_id.values()))
+                yield
+                self._save()
+            self._deliver()
+
+    @contextmanager
+    def batch(self):
+        """Group several changes into a single file write and one round of notifications"""
+        with self._lock:
+            if self._batch_depth:             # Nested batch: the outer one saves
+                self._batch_depth += 1
+                try:
+                    yield self
+                finally:
+                    self._batch_depth -= 1
+                return
+            with file_lock(self.path):        # Hold the lock for the whole batch
+                if self._refresh():
+                    self._notify("reloaded", list(self._by_id.values()))
+                self._batch_depth = 1
+                try:
+                    yield self
+                finally:
+                    self._batch_depth = 0
+                    if self._dirty:
+                        self._save()
+                        self._dirty = False
+            self._deliver()
+
+    # ---------------- Queries ----------------
+    def _sync(self):
+        """Pick up changes made by other processes and tell subscribers about them"""
+        if not self._batch_depth and self._refresh():
+            self._notify("reloaded", list(self._by_id.values()))
+            self._deliver()
+
+    def all(self):
+        """Return every reminder, earliest due first"""
+        with self._lock:
+            self._sync()
+            self._sort()
+            return list(self._by_id.values())
+
+    def get(self, reminder_id):
+        """Return the reminder with this ID, or None"""
+        with self._lock:
+            self._sync()
+            return self._by_id.get(reminder_id)
+
+    def find(self, task, due):
+        """Return the first reminder for (task, due), or None (O(1))"""
+        with self._lock:
+            self._sync()
+            ids = self._by_key.get((task, due))
+            return self._by_id[ids[0]] if ids else None
+
+    def find_all(self, task, due):
+        """Return every reminder for (task, due)"""
+        with self._lock:
+            self._sync()
+            return [self._by_id[rid] for rid in self._by_key.get((task, due), [])]
+
+    def reload(self):
+        """Force a re-read of the file and tell subscribers"""
+        with self._lock:
+            self._read_file()
+            self._sort()
+            reminders = list(self._by_id.values())
+            self._notify("reloaded", reminders)
+            self._deliver()
+        return reminders
+
+    # ---------------- Changes ----------------
+    def add(self, task, due, repeat="None", status="Pending"):
+        """Add a reminder with the next free ID and return it"""
+        with self._mutation():
+            reminder = {
+                "id": self._max_id + 1,
+                "task": task,
+                "due": due,
+                "status": status,
+                "repeat": repeat,
+            }
+            self._index(reminder)
+            self._notify("added", [reminder])
+        return reminder
+
+    def remove(self, reminder_ids):
+        """Delete reminders by ID"""
+        with self._mutation():
+            removed = [self._by_id[rid] for rid in reminder_ids if rid in self._by_id]
+            for r in removed:
+                self._unindex(r)
+            self._notify("removed", removed)
+        return removed
+
+    def update(self, changes):
+        """Apply {id: {field: value}} to many reminders with a single write"""
+        with self._mutation():
+            updated = []
+            for rid, fields in changes.items():
+                r = self._by_id.get(rid)
+                if r is None:
+                    continue
+                if "task" in fields or "due" in fields:
+                    self._unindex(r)
+                    r.update(fields)
+                    self._index(r)
+                else:
+                    r.update(fields)
+                updated.append(r)
+            self._notify("updated", updated)
+        return updated
+
+    def set_status(self, changes):
+        """Apply {id: status} to many reminders with a single write"""
+        return self.update({rid: {"status": status} for rid, status in changes.items()})
+
+    def replace_all(self, reminders):
+        """Overwrite the whole list (compatibility path for save_reminders)"""
+        with self._mutation():
+            self._by_id, self._by_key, self._max_id = {}, {}, -1
+            self._sorted = True
+            for i, r in enumerate(reminders):
+                self._index({
+                    "id": r.get("id", i),
+                    "task": r["task"],
+                    "due": r["due"],
+                    "status": r.get("status", "Pending"),
+                    "repeat": r.get("repeat", "None"),
+                })
+            self._sort()
+            self._notify("reloaded", list(self._by_id.values()))
+
+    # ---------------- Subscriptions ----------------
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+
+_repositories = {}                # {user: ReminderRepository} shared by every window
+_repositories_lock = threading.Lock()
+
+
+def get_repository(user):
+    """Return the shared repository for a user (one per process)"""
+    with _repositories_lock:
+        if user not in _repositories:
+            _repositories[user] = ReminderRepository(user)
+        return _repositories[user]
+
+
+# =========================================================
+# Migration from the v1 format
+# =========================================================
+def read_legacy_rows(f):
+    """Yield reminders from a v1 file (id,task,datetime,status[,repeat])"""
+    for i, row in enumerate(csv.DictReader(f)):
+        if not row or not row.get("task"):
+            continue
+        try:
+            due = to_due(datetime.strptime(row["datetime"], LEGACY_FORMAT))
+        except (KeyError, ValueError):
+            continue                      # Unreadable time: nothing could ever fire it
+        yield {
+            "id": int(row.get("id") or i),            # Use ID from file, or row index if missing
+            "task": row["task"],
+            "due": due,
+            "status": row.get("status") or "Pending",
+            "repeat": row.get("repeat") or "None",    # Oldest files have no repeat column
+        }
+
+
+def migrate_all(data_dir=DATA_DIR):
+    """Convert every <user>_reminder.csv in data_dir to the current format"""
+    migrated = []
+    for path in glob.glob(os.path.join(data_dir, "*_reminder.csv")):
+        with open(path, encoding="utf-8-sig") as f:
+            if f.readline().strip() == VERSION_LINE:
+                continue
+        user = os.path.basename(path)[:-len("_reminder.csv")]
+        repo = ReminderRepository(user)
+        repo.path = path
+        repo._read_file()                 # Reading a v1 file rewrites it as v2
+        migrated.append(path)
+    return migrated
+
+
+if __name__ == "__main__":
+    # python reminder_repository.py [data_dir]  -> upgrade all reminder files now
+    for p in migrate_all(sys.argv[1] if len(sys.argv) > 1 else DATA_DIR):
+        print("migrated", p)
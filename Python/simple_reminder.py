@@ -1,78 +1,185 @@
 import tkinter as tk              # Import tkinter for GUI components
 from tkinter import ttk, messagebox  # Import ttk for themed widgets, messagebox for popups
-import winsound                   # Import winsound for playing beep sounds on Windows
+from alarm_sound import get_alarm_backend  # Import cross-platform, non-blocking alarm player
 import time                       # Import time module for formatting current time
 from datetime import datetime, timedelta  # Import datetime and timedelta for date/time handling
-import csv                        # Import csv module to read and write CSV files
 import os                         # Import os module for file and directory handling
+import heapq                      # Import heapq for the pending-reminder min-heap
+import bisect                     # Import bisect to find a row's position in the sorted list
+import reminder_repository        # Import shared reminder store (also used by the timetable)
+import recurrence                 # Import repeat rules (every N days, weekdays, monthly, ...)
+import reminder_daemon            # Import background daemon connection (fires reminders without us)
+from tick_scheduler import get_scheduler  # Import the app-wide timer shared by all windows
+from reminder_repository import get_repository, to_due, parse_due, now_due, display_due
 
 # ---------------- CSV File Operations ----------------
 DATA_DIR = "data"                 # Define the directory to store reminder CSV files
+MAX_SLEEP_MS = 60_000             # Longest timer sleep (re-syncs after suspend / clock changes)
+FLUSH_DELAY_MS = 200              # Status changes made within this window share one write
+SNOOZE_MINUTES = 10               # "Snooze" in the catch-up window moves a reminder this far
+DAEMON_POLL_MS = 500              # Where Tk can't watch the daemon's wake-up pipe (Windows)
+STATUSES = ["Pending", "Ringing", "Rang"]  # Reminder life cycle (for the status filter)
+LIST_COLUMNS = {                  # Reminder list columns: heading, width in pixels
+    "date": ("Date", 100),
+    "time": ("Time", 80),
+    "task": ("Task", 260),
+    "repeat": ("Repeat", 160),
+    "status": ("Status", 80),
+}
+LIST_COLUMN_INDEX = {col: i for i, col in enumerate(LIST_COLUMNS)}
 os.makedirs(DATA_DIR, exist_ok=True)  # Create the "data" directory if it does not already exist
 
 
 def reminder_file(user):
     """Return the file path for a user's reminder CSV file"""
-    return os.path.join(DATA_DIR, f"{user}_reminder.csv")  # Combine directory and filename with user ID
+    return reminder_repository.reminder_file(user)  # Shared with the timetable
 
 
 def load_reminders(user):
-    """Load reminders from CSV for a given user"""
-    events = []                   # Initialize an empty list to store reminders
-    file = reminder_file(user)     # Get the CSV file path for the user
-    if os.path.exists(file):       # Check if the file exists
-        with open(file, newline="", encoding="utf-8") as f:  # Open the file in read mode
-            reader = csv.DictReader(f)  # Create a CSV reader that reads rows as dictionaries
-            for row in reader:          # Loop through each row in the CSV file
-                events.append({         # Append each reminder as a dictionary into events list
-                    "id": int(row.get("id", len(events))),  # Use ID from file, or generate one if missing
-                    "task": row["task"],                    # Task description
-                    "datetime": row["datetime"],            # Date and time string
-                    "status": row["status"],                # Status (Pending, Ringing, Rang)
-                    "repeat": row.get("repeat", "None")     # Repeat type (None, Daily, Weekly)
-                })
-    return events  # Return the list of reminders
+    """Load reminders for a given user (copies from the shared cached repository)"""
+    return [dict(r) for r in get_repository(user).all()]
 
 
 def save_reminders(user, events):
     """Save all reminders back to the CSV file"""
-    file = reminder_file(user)     # Get the file path for the user
-    with open(file, "w", newline="", encoding="utf-8") as f:  # Open the file in write mode
-        writer = csv.DictWriter(f, fieldnames=["id", "task", "datetime", "status", "repeat"])  
-        # Create a CSV writer with fixed field names
-        writer.writeheader()       # Write the header row (column names)
-        for i, e in enumerate(events):  # Loop through all reminders
-            writer.writerow({      # Write each reminder as a row in the CSV file
-                "id": e.get("id", i),          # ID of the reminder (use existing or index as fallback)
-                "task": e["task"],             # Task description
-                "datetime": e["datetime"],     # Date and time string
-                "status": e["status"],         # Status of reminder
-                "repeat": e.get("repeat", "None")  # Repeat value, default to "None"
-            })
-
-
-def add_reminder_to_csv(user, task, dt_str, repeat="None"):
-    """Add a new reminder to the CSV"""
-    events = load_reminders(user)  # Load all reminders for the user
-    next_id = max([e["id"] for e in events], default=-1) + 1  # Generate the next ID (increment by 1)
-    events.append({                # Append a new reminder dictionary
-        "id": next_id,             # Unique reminder ID
-        "task": task,              # Task description
-        "datetime": dt_str,        # Reminder date/time string
-        "status": "Pending",       # Initial status is "Pending"
-        "repeat": repeat           # Repeat option
-    })
-    save_reminders(user, events)   # Save the updated reminder list back to CSV
+    get_repository(user).replace_all(events)
+
+
+def add_reminder_to_csv(user, task, due, repeat="None"):
+    """Add a new reminder to the CSV (due is an ISO "YYYY-MM-DDTHH:MM" string)"""
+    return get_repository(user).add(task, due, repeat)  # Return it so callers can schedule it
 
 
 def update_reminder_status(user, reminder_id, new_status):
     """Update the status of a reminder by ID"""
-    events = load_reminders(user)  # Load all reminders for the user
-    for e in events:               # Loop through all reminders
-        if e["id"] == reminder_id: # Find the reminder with matching ID
-            e["status"] = new_status  # Update its status
-            break                  # Exit the loop after updating
-    save_reminders(user, events)   # Save the updated reminders back to CSV
+    apply_status_changes(user, {reminder_id: new_status})
+
+
+def apply_status_changes(user, changes):
+    """Apply {reminder_id: new_status} for many reminders with one write"""
+    get_repository(user).set_status(changes)
+
+
+# ---------------- Pending Reminder Queue ----------------
+class ReminderQueue:
+    """Min-heap of Pending reminders ordered by due time
+
+    Due times are ISO strings, so they are compared as text without parsing.
+    Removal is lazy: the entry is marked dead and skipped when it reaches the top.
+    """
+
+    def __init__(self):
+        self._heap = []            # [due, id, reminder or None]
+        self._entries = {}         # {id: heap entry} for O(1) removal
+
+    def rebuild(self, reminders):
+        """Replace the queue with the Pending reminders from a full load"""
+        self._entries = {}
+        self._heap = []
+        for r in reminders:
+            if r["status"] == "Pending":
+                entry = [r["due"], r["id"], r]
+                self._entries[r["id"]] = entry
+                self._heap.append(entry)
+        heapq.heapify(self._heap)  # O(n) build instead of n pushes
+
+    def push(self, reminder):
+        """Schedule one reminder (replaces an older entry with the same ID)"""
+        self.remove(reminder["id"])
+        entry = [reminder["due"], reminder["id"], reminder]
+        self._entries[reminder["id"]] = entry
+        heapq.heappush(self._heap, entry)
+
+    def remove(self, reminder_id):
+        """Unschedule a reminder"""
+        entry = self._entries.pop(reminder_id, None)
+        if entry is not None:
+            entry[-1] = None       # Mark dead; dropped when it reaches the top
+
+    def next_due(self):
+        """Return the earliest due string, or None if nothing is pending"""
+        while self._heap and self._heap[0][-1] is None:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """Remove and return every reminder due at or before now (a due string), oldest first"""
+        due = []
+        while self.next_due() is not None and self._heap[0][0] <= now:
+            _, rid, reminder = heapq.heappop(self._heap)
+            del self._entries[rid]
+            due.append(reminder)
+        return due
+
+
+# ---------------- Tick / Flush Logic ----------------
+class ReminderTicker:
+    """Due reminders and the status writes they cause, without any Tk
+
+    Fired reminders, dismissed alerts and snoozes are collected and written
+    by flush() in one atomic repository write, however many there are.
+    ReminderApp owns the timers and windows; this owns the data.
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.queue = ReminderQueue()  # Pending reminders ordered by due time
+        self.changes = {}         # {id: status} waiting for the next flush
+        self.rang = []            # Alerts the user dismissed since the last flush
+        self.snoozed = []         # Missed reminders the user snoozed since the last flush
+
+    def tick(self, now):
+        """Mark every reminder due at now (a due string) Ringing in one write; returns them"""
+        fired = self.queue.pop_due(now)  # Only reminders that are actually due come off the heap
+        for e in fired:
+            self.changes[e["id"]] = "Ringing"
+        self.flush()
+        return fired
+
+    def dismissed(self, reminder_id, title, repeat, old_due):
+        """An alert was closed: mark it Rang (or move a repeating one on) at the next flush"""
+        self.rang.append((reminder_id, title, repeat, old_due))
+
+    def caught_up(self, dismissed, snoozed):
+        """Decisions from the missed-reminders window"""
+        self.rang.extend((e["id"], e["task"], e.get("repeat"), e["due"]) for e in dismissed)
+        self.snoozed.extend(snoozed)
+
+    def flush(self):
+        """Write everything collected since the last flush (nothing to do: no write)"""
+        if not self.changes and not self.rang and not self.snoozed:
+            return
+        changes, rang, snoozed = self.changes, self.rang, self.snoozed
+        self.changes, self.rang, self.snoozed = {}, [], []
+        updates = {rid: {"status": status} for rid, status in changes.items()}
+        snooze_due = to_due(datetime.now() + timedelta(minutes=SNOOZE_MINUTES))
+        with self.repo.batch():  
+            # Single atomic write (and one round of notifications) for the whole batch
+            for rid, title, repeat, old_due in rang:
+                updates[rid] = {"status": "Rang"}  
+                # Mark reminder as rung (final state unless it repeats)
+                latest = self.repo.get(rid)  
+                if latest is None or latest["repeat"] != repeat or latest["due"] != old_due:  
+                    # If no reminder found or it was changed meanwhile, don't repeat it
+                    continue
+                nxt = recurrence.advance(repeat, old_due)  
+                # Next occurrence after now (missed ones are skipped, not replayed)
+                if nxt is not None:
+                    updates[rid] = {"due": nxt[0], "repeat": nxt[1], "status": "Pending"}  
+                    # Move the same row forward (rescheduled via the change notification)
+            for e in snoozed:
+                latest = self.repo.get(e["id"])
+                if latest is None or latest["due"] != e["due"]:
+                    continue
+                nxt = recurrence.advance(latest["repeat"], e["due"])
+                if nxt is None:
+                    updates[e["id"]] = {"due": snooze_due, "status": "Pending"}  
+                    # One-off reminder: just move it
+                else:
+                    updates[e["id"]] = {"due": nxt[0], "repeat": nxt[1], "status": "Pending"}
+                    self.repo.add(e["task"], snooze_due)  
+                    # Repeating reminder: keep its schedule, snooze a one-off copy
+            self.repo.update(updates)
 
 
 # ---------------- Reminder GUI ----------------
@@ -80,6 +187,16 @@ class ReminderApp:
     def __init__(self, root, current_user):
         self.root = root                      # Reference to the Tkinter root window
         self.current_user = current_user      # Store the current logged-in user
+        self.alarm = get_alarm_backend()      # Alarm player (plays on a worker thread)
+        self.repo = get_repository(current_user)  # Shared reminder store (pushes changes to us)
+        self.ticker = ReminderTicker(self.repo)  # Due reminders and their batched status writes
+        self.queue = self.ticker.queue        # Pending reminders ordered by due time
+        self.scheduler = get_scheduler(root)  # One shared timer for the clock, checks and flushes
+        self._check_timer = None              # Timer of the next scheduled check
+        self.catch_up = None                  # Summary window for missed reminders (one at most)
+        self._flush_timer = None              # Timer of the pending flush
+        self._daemon_watch = None             # Wake-up fd (or poll timer) while the daemon is connected
+        self.daemon = reminder_daemon.connect(current_user)  # None -> we schedule reminders ourselves
 
         self.root.title("Simple Reminder")    # Set the window title
         self.root.geometry("750x650")         # Set the window size
@@ -95,19 +212,44 @@ class ReminderApp:
         # Create a labeled frame for reminder list
         list_frame.pack(pady=10, padx=20, fill="x")  # Pack it with padding and horizontal fill
 
-        self.listbox = tk.Listbox(
-            list_frame, width=100, height=12, font=("Courier New", 10),
-            bg="white", relief="solid", bd=1
-        )  # Create a listbox to show reminders
-        self.listbox.pack(pady=5, padx=10)  # Pack the listbox inside the frame
+        filter_frame = tk.Frame(list_frame, bg="#E0FFFF")  # Frame for sort / filter options
+        filter_frame.pack(fill="x", padx=10)
+        tk.Label(filter_frame, text="Status:", bg="#E0FFFF").pack(side=tk.LEFT)
+        self.status_filter = tk.StringVar(value="All")  # Show only this status
+        ttk.Combobox(filter_frame, textvariable=self.status_filter, values=["All"] + STATUSES,
+                     width=9, state="readonly").pack(side=tk.LEFT, padx=5)
+        tk.Label(filter_frame, text="Date starts with:", bg="#E0FFFF").pack(side=tk.LEFT, padx=(10, 0))
+        self.date_filter = tk.StringVar()  # e.g. "2025-09" for one month, blank for all
+        tk.Entry(filter_frame, textvariable=self.date_filter, width=12).pack(side=tk.LEFT, padx=5)
+        self.status_filter.trace_add("write", lambda *_: self.refresh_list())
+        self.date_filter.trace_add("write", lambda *_: self.refresh_list())
+
+        tree_frame = tk.Frame(list_frame, bg="#E0FFFF")
+        tree_frame.pack(pady=5, padx=10, fill="x")
+        self.tree = ttk.Treeview(tree_frame, columns=list(LIST_COLUMNS), show="headings",
+                                 height=10, selectmode="browse")
+        # Treeview keyed by reminder ID: each change only touches its own row
+        for col, (heading, width) in LIST_COLUMNS.items():
+            self.tree.heading(col, text=heading, command=lambda c=col: self.sort_by(c))
+            self.tree.column(col, width=width, anchor="w")
+        self.tree.tag_configure("Ringing", background="#FFE4B5")  # Highlight ringing reminders
+        self.tree.tag_configure("Rang", foreground="gray")       # Grey out finished ones
+        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill="x", expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill="y")
+        self.sort_column = "date"             # Column the list is sorted by
+        self.sort_reverse = False             # Descending when True
+        self._order = []                      # [(sort key, id)] of shown rows, ascending
+        self._row_keys = {}                   # {id: sort key} of shown rows
 
         # ---------------- Buttons Section ----------------
         btn_frame = tk.Frame(self.root, bg="#E0FFFF")  # Create a frame to hold buttons
         btn_frame.pack(pady=10)                       # Pack it with padding
 
         tk.Button(btn_frame, text="Refresh", bg="yellow", width=15,
-                  command=self.refresh_list).pack(side=tk.LEFT, padx=8)  
-        # Button to refresh the reminder list
+                  command=self.repo.reload).pack(side=tk.LEFT, padx=8)  
+        # Button to re-read the reminder file (subscribers are told about the result)
 
         tk.Button(btn_frame, text="Clear All History", bg="red", fg="white", width=15,
                   command=self.clear_history).pack(side=tk.LEFT, padx=8)  
@@ -188,42 +330,149 @@ class ReminderApp:
         # Repeat selection
         tk.Label(form_frame, text="Repeat:", bg="#E0FFFF", anchor="e", width=10).grid(row=3, column=0, padx=5, pady=5)
         # Label for repeat selection
+        repeat_frame = tk.Frame(form_frame, bg="#E0FFFF")  # Frame to hold repeat rule options
+        repeat_frame.grid(row=3, column=1, columnspan=3, sticky="w")
+
         self.repeat_var = tk.StringVar()  # Variable to store repeat option
-        ttk.Combobox(form_frame, textvariable=self.repeat_var, values=["None", "Daily", "Weekly"],
-                     width=10, state="readonly").grid(row=3, column=1, pady=5, sticky="w")
+        ttk.Combobox(repeat_frame, textvariable=self.repeat_var, values=list(recurrence.PRESETS),
+                     width=10, state="readonly").grid(row=0, column=0, padx=2, pady=5)
         # Dropdown for repeat options
         self.repeat_var.set("None")  # Default value is "None"
 
+        tk.Label(repeat_frame, text="every", bg="#E0FFFF").grid(row=0, column=1, padx=2)
+        self.interval_var = tk.StringVar(value="1")  # Repeat every N days/weeks/months
+        tk.Spinbox(repeat_frame, from_=1, to=99, textvariable=self.interval_var, width=4)\
+            .grid(row=0, column=2, padx=2)
+
+        tk.Label(repeat_frame, text="times", bg="#E0FFFF").grid(row=0, column=3, padx=2)
+        self.count_var = tk.StringVar()  # Optional number of occurrences (blank = forever)
+        tk.Entry(repeat_frame, textvariable=self.count_var, width=5).grid(row=0, column=4, padx=2)
+
+        tk.Label(repeat_frame, text="until (YYYY-MM-DD)", bg="#E0FFFF").grid(row=0, column=5, padx=2)
+        self.until_var = tk.StringVar()  # Optional last date (blank = no end date)
+        tk.Entry(repeat_frame, textvariable=self.until_var, width=11).grid(row=0, column=6, padx=2)
+
         # Add button
         tk.Button(form_frame, text="Add Reminder", bg="lightgreen", width=20, command=self.add_reminder)\
             .grid(row=4, column=0, columnspan=4, pady=10)
         # Button to add the reminder with entered details
 
+        self.root.bind("<Destroy>", self._on_destroy)  # Silence the alarm when the window closes
+
         # Start clock + reminders check
-        self.update_clock()       # Start updating clock
-        self.check_reminders()    # Start checking reminders
+        self.update_clock()       # Show the time now...
+        self.scheduler.every(1000, self.update_clock, owner=self.root)  
+        # ...then on every second, sharing the wake-up with any other clock
+        self.reload_queue()       # Load pending reminders and start the scheduler (no daemon)
+        if self.daemon is not None:
+            self.start_daemon_polling()  # The daemon fires reminders; we only show them
+        else:
+            self.show_notifications(reminder_daemon.take_notifications(current_user))
+            # Reminders the daemon fired while no window was open
         self.refresh_list()       # Load reminders into the list
+        self.repo.subscribe(self.on_repository_change)  # Get told about changes (e.g. from the timetable)
+
+
+    def _on_destroy(self, event):
+        """Stop any playing alarm once the reminder window itself is destroyed"""
+        if event.widget is self.root:
+            self.alarm.stop()
+            if self.daemon is not None:
+                self.stop_daemon_polling()
+                self.daemon.close()
+            self.repo.unsubscribe(self.on_repository_change)
+            if self.catch_up is not None and self.catch_up.rows:
+                self.catch_up.apply()   # Missed reminders still listed count as seen
+            self.flush_changes()  # Don't lose status changes still waiting to be written
+
+    def on_repository_change(self, kind, reminders):
+        """Keep the schedule and list in step with the repository (no file polling)"""
+        if kind != "reloaded" and self.daemon is not None:
+            self.daemon.send({"op": "changed"})  # Let the daemon reschedule straight away
+        if kind == "reloaded":
+            self.queue.rebuild(reminders)
+        else:
+            for r in reminders:
+                if kind != "removed" and r["status"] == "Pending":
+                    self.queue.push(r)      # New, rescheduled or re-armed reminder
+                else:
+                    self.queue.remove(r["id"])
+        self.schedule_next_check()
+        if not self.root.winfo_exists():
+            return
+        if kind == "reloaded":
+            self.refresh_list()
+        elif kind == "removed":
+            for r in reminders:
+                self._hide_row(r["id"])
+        else:
+            for r in reminders:
+                self._show_row(r)       # Insert, update or move just this row
 
 
-     # ---------------- Refresh List ----------------
+     # ---------------- Reminder List ----------------
     def refresh_list(self):
-        """Reload and display all reminders in the listbox"""
-        self.listbox.delete(0, tk.END)          # Clear the listbox before reloading
-        events = load_reminders(self.current_user)  # Load all reminders for current user
-        if not events:                          # If no reminders exist
-            self.listbox.insert(tk.END, "No reminder events.")  # Show placeholder text
+        """Rebuild the whole list (after a reload or a sort / filter change)"""
+        self.tree.delete(*self.tree.get_children())  # Clear every row
+        self._order, self._row_keys = [], {}
+        for e in self.repo.all():               # Cached reminders for current user
+            self._show_row(e)
+
+    def sort_by(self, column):
+        """Sort by a column; clicking the same heading again reverses the order"""
+        self.sort_reverse = not self.sort_reverse if column == self.sort_column else False
+        self.sort_column = column
+        self.refresh_list()
+
+    def _sort_key(self, e):
+        if self.sort_column == "task":
+            return (e["task"].lower(), e["due"])
+        if self.sort_column in ("repeat", "status"):
+            return (self._values(e)[LIST_COLUMN_INDEX[self.sort_column]], e["due"])
+        return (e["due"],)                      # Date and time both sort by due time
+
+    def _matches(self, e):
+        status = self.status_filter.get()
+        return (status == "All" or e["status"] == status) and e["due"].startswith(self.date_filter.get().strip())
+
+    @staticmethod
+    def _values(e):
+        date, time_part = display_due(e["due"])  # Split into date and 12-hour time
+        return (date, time_part, e["task"], recurrence.describe(e.get("repeat")), e["status"])
+
+    def _show_row(self, e):
+        """Insert or update one reminder's row in its sorted position (O(log n) search)"""
+        rid = e["id"]
+        if not self._matches(e):
+            self._hide_row(rid)
+            return
+        key = (self._sort_key(e), rid)
+        if self._row_keys.get(rid) == key:
+            self.tree.item(rid, values=self._values(e), tags=(e["status"],))  # Same place: update in place
+            return
+        if rid in self._row_keys:
+            self._order.pop(bisect.bisect_left(self._order, self._row_keys[rid]))
+        index = bisect.bisect_left(self._order, key)
+        self._order.insert(index, key)
+        self._row_keys[rid] = key
+        if self.sort_reverse:
+            index = len(self._order) - 1 - index
+        if self.tree.exists(rid):
+            self.tree.item(rid, values=self._values(e), tags=(e["status"],))
+            self.tree.move(rid, "", index)
         else:
-            self.listbox.insert(
-                tk.END,
-                f"{'Date':<15} | {'Time':<10} | {'Task':<40} | {'Repeat':<10} | {'Status':<10}"
-            )  # Insert header row
-            self.listbox.insert(tk.END, "-" * 100)  # Insert a separator line
-            for e in events:                        # Loop through all reminders
-                date, time_part = e['datetime'].split(" ", 1)  # Split into date and time parts
-                self.listbox.insert(
-                    tk.END,
-                    f"{date:<15} | {time_part:<10} | {e['task']:<40} | {e.get('repeat','None'):<10} | {e['status']:<10}"
-                )  # Insert formatted reminder row
+            self.tree.insert("", index, iid=rid, values=self._values(e), tags=(e["status"],))
+
+    def _hide_row(self, rid):
+        key = self._row_keys.pop(rid, None)
+        if key is not None:
+            self._order.pop(bisect.bisect_left(self._order, key))
+            self.tree.delete(rid)
+
+    def selected_reminder(self):
+        """Return the selected reminder, or None"""
+        selection = self.tree.selection()
+        return self.repo.get(int(selection[0])) if selection else None
 
 
     # ---------------- Add Reminder ----------------
@@ -261,12 +510,29 @@ class ReminderApp:
             messagebox.showerror("Error", "You cannot select a past date or time!")
             return
 
-        add_reminder_to_csv(self.current_user, task, dt_str, repeat)  
-        # Save new reminder to CSV
+        try:
+            interval = int(self.interval_var.get())  
+            # Repeat every N days/weeks/months
+            count = int(self.count_var.get()) if self.count_var.get().strip() else None  
+            # Optional number of occurrences
+            until = datetime.strptime(self.until_var.get().strip(), "%Y-%m-%d").date() \
+                if self.until_var.get().strip() else None  
+            # Optional last date
+            if interval < 1 or (count is not None and count < 1):
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Invalid repeat settings!")  # Show error if invalid input
+            return
+        if until is not None and until < dt_obj.date():
+            messagebox.showerror("Error", "The repeat end date is before the reminder date!")
+            return
+        repeat = recurrence.build_rule(repeat, interval, count, until)  
+        # One stored rule instead of a new row for every repeat
+
+        self.repo.add(task, to_due(dt_obj), repeat)  
+        # Save new reminder (the repository pushes it into our schedule and list)
         messagebox.showinfo("Success", f"Reminder added for {dt_str}")  
         # Show success popup
-        self.refresh_list()  
-        # Refresh reminder list display
 
 
     # ---------------- Clock Update ----------------
@@ -274,89 +540,145 @@ class ReminderApp:
         """Update the on-screen clock every second"""
         now = time.strftime("%I:%M:%S %p")   # Get current time in HH:MM:SS AM/PM format
         self.clock_label.config(text=f"{now}")  # Update clock label text
-        if self.root.winfo_exists():  # Check if window still exists
-            self.root.after(1000, self.update_clock)  
-            # Call this function again after 1 second
+        # Called again every second by the shared scheduler (stops when the window closes)
 
 
     # ---------------- Check Reminders ----------------
+    def reload_queue(self):
+        """Rebuild the pending queue from the repository"""
+        self.queue.rebuild(self.repo.all())
+        self.schedule_next_check()
+
+    def schedule_next_check(self):
+        """Sleep until the earliest pending reminder is due (no timer when idle)"""
+        if self._check_timer is not None:
+            self._check_timer.cancel()
+            self._check_timer = None
+        if not self.root.winfo_exists():
+            return
+        if self.daemon is not None:
+            return                # The daemon is watching the reminders for us
+        next_due = self.queue.next_due()
+        if next_due is None:
+            return                # Nothing pending: no wake-ups at all
+        delay = (parse_due(next_due) - datetime.now()).total_seconds() * 1000
+        delay = int(min(max(delay, 0), MAX_SLEEP_MS))
+        self._check_timer = self.scheduler.call_later(delay, self.check_reminders, owner=self.root)
+
     def check_reminders(self):
-        """Check reminders every second (trigger normal + catch-up alarms)"""
-        now_dt = datetime.now()  
-        # Get current datetime
-        now_str = now_dt.strftime("%Y-%m-%d %I:%M %p")  
-        # Format current time to match reminder format
-        events = load_reminders(self.current_user)  
-        # Load all reminders
-
-        for e in events:  
-            # Loop through each reminder
-            event_dt = datetime.strptime(e["datetime"], "%Y-%m-%d %I:%M %p")  
-            # Convert reminder datetime string to datetime object
-
-            # Normal on-time reminder
-            if e["datetime"] == now_str and e["status"] == "Pending":
-                update_reminder_status(self.current_user, e["id"], "Ringing")  
-                # Mark status as "Ringing"
-                self.root.after(0, lambda t=e["task"], rid=e["id"], r=e.get("repeat"), dt=e["datetime"]:
-                                self.alert(t, rid, r, dt))  
-                # Call alert popup immediately
-
-            # Catch-up reminder (missed but still Pending)
-            elif event_dt < now_dt and e["status"] == "Pending":
-                update_reminder_status(self.current_user, e["id"], "Ringing")  
-                # Mark status as "Ringing"
-                self.root.after(500, lambda t=e["task"], rid=e["id"], r=e.get("repeat"), dt=e["datetime"]:
-                                self.alert(t, rid, r, dt))  
-                # Call alert popup slightly delayed (0.5s)
-
-        if self.root.winfo_exists():  
-            # Check again after 1 second if window is still open
-            self.root.after(1000, self.check_reminders)
+        """Fire every reminder that is due (normal + catch-up alarms), then sleep again"""
+        self._check_timer = None
+        self.daemon = reminder_daemon.connect(self.current_user)  
+        # The daemon may have started since the window opened: let it take over
+        if self.daemon is not None:
+            self.start_daemon_polling()
+            return
+        this_minute = now_due()  
+        # Current minute as a due string (reminders have minute precision)
+
+        fired = self.ticker.tick(this_minute)  
+        # Due reminders marked "Ringing": one write no matter how many fired
+        self.show_notifications(fired)
+
+        self.schedule_next_check()  
+        # Sleep until the next reminder is due
+
+
+    # ---------------- Background Daemon ----------------
+    def start_daemon_polling(self):
+        """Read daemon messages when the client's wake-up pipe says some arrived (no idle polling)"""
+        fd = self.daemon.wake_fd
+        if fd is not None:
+            self.root.tk.createfilehandler(fd, tk.READABLE, lambda fd, mask: self.poll_daemon())
+            # Tk's own event loop watches the pipe; the reader thread never touches Tk
+            self._daemon_watch = fd
+        else:
+            self._daemon_watch = self.scheduler.every(DAEMON_POLL_MS, self.poll_daemon, owner=self.root)
+        self.poll_daemon()        # Anything that arrived before we started watching
+
+    def stop_daemon_polling(self):
+        if self._daemon_watch is None:
+            return
+        if isinstance(self._daemon_watch, int):
+            self.root.tk.deletefilehandler(self._daemon_watch)
+        else:
+            self._daemon_watch.cancel()
+        self._daemon_watch = None
+
+    def poll_daemon(self):
+        """Show reminders sent by the daemon; fall back to our own scheduler if it stops"""
+        if self.daemon is None:
+            return
+        self.show_notifications([m for m in self.daemon.poll() if m.get("event") == "due"])
+        if not self.daemon.connected:
+            self.stop_daemon_polling()
+            self.daemon.close()
+            self.daemon = None
+            self.reload_queue()   # Daemon went away: schedule reminders in this window again
+
+    def show_notifications(self, reminders):
+        """Alert fired reminders: on-time ones pop up, missed ones share one summary window"""
+        this_minute = now_due()
+        missed = []
+        for e in reminders:
+            if e["due"] == this_minute:  
+                # On-time alert fires immediately
+                self.root.after(0, lambda t=e["task"], rid=e["id"], r=e.get("repeat"), due=e["due"]:
+                                self.alert(t, rid, r, due))
+            else:
+                missed.append(e)  
+                # Missed while the app was closed: no popup storm
+        if missed:
+            self.show_catch_up(missed)
+
+    # ---------------- Missed Reminders ----------------
+    def show_catch_up(self, missed):
+        """List missed reminders in one window (added to it if it is already open)"""
+        if self.catch_up is None or not self.catch_up.window.winfo_exists():
+            self.catch_up = CatchUpWindow(self.root, self.apply_catch_up)
+        self.catch_up.add(missed)
+        self.play_alarm_sequence(1)  
+        # One short alarm for the whole batch
+
+    def apply_catch_up(self, dismissed, snoozed):
+        """Persist the catch-up window's decisions in one batch"""
+        self.ticker.caught_up(dismissed, snoozed)
+        self.flush_changes()
 
 
     # ---------------- Alarm Sound ----------------
     def play_alarm_sequence(self, times_left):
-        """Play beep sound multiple times"""
+        """Play beep sound multiple times (returns immediately)"""
         if times_left <= 0 or not self.root.winfo_exists():  
             # Stop if no times left or window closed
             return
-        winsound.Beep(1000, 700)  
-        # Play beep sound (1000 Hz, 0.7s)
-        self.root.after(1000, lambda: self.play_alarm_sequence(times_left - 1))  
-        # Call again after 1 second until times_left is 0
+        self.alarm.play(times_left)  
+        # Beeps play on the backend's worker thread, so the UI keeps running
 
 
     # ---------------- Show Reminder Alert ----------------
-    def alert(self, title, reminder_id, repeat, old_dt_str):
+    def alert(self, title, reminder_id, repeat, old_due):
         """Show popup + play alarm when reminder time is reached"""
         self.play_alarm_sequence(3)  
         # Play alarm sound 3 times
         messagebox.showinfo("Reminder", f"{self.current_user}, time for: {title}")  
         # Show popup reminder
-        update_reminder_status(self.current_user, reminder_id, "Rang")  
-        # Mark reminder as already "Rang"
-
-        reminders = load_reminders(self.current_user)  
-        # Reload reminders
-        latest = next((r for r in reminders if r["id"] == reminder_id), None)  
-        # Find the latest reminder with this ID
-
-        if latest is None or latest["repeat"] != repeat:  
-            # If no reminder found or repeat is changed, do nothing
-            return
-
-        # Create next repeat reminder
-        if repeat == "Daily":
-            new_dt = datetime.now() + timedelta(days=1)  
-            # Add 1 day
-            add_reminder_to_csv(self.current_user, title, new_dt.strftime("%Y-%m-%d %I:%M %p"), repeat)  
-            # Save new reminder for tomorrow
-        elif repeat == "Weekly":
-            new_dt = datetime.strptime(old_dt_str, "%Y-%m-%d %I:%M %p") + timedelta(weeks=1)  
-            # Add 1 week to old reminder date
-            add_reminder_to_csv(self.current_user, title, new_dt.strftime("%Y-%m-%d %I:%M %p"), repeat)  
-            # Save new reminder for next week
+        self.ticker.dismissed(reminder_id, title, repeat, old_due)  
+        # Mark reminder as already "Rang" (batched with other alerts)
+        self.schedule_flush()
+
+    # ---------------- Batched Status Writes ----------------
+    def schedule_flush(self):
+        """Write collected changes shortly, so alerts closed together share one write"""
+        if self._flush_timer is None and self.root.winfo_exists():
+            self._flush_timer = self.scheduler.call_later(FLUSH_DELAY_MS, self.flush_changes, owner=self.root)
+
+    def flush_changes(self):
+        """Persist all collected status changes and next repeats in one atomic write"""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        self.ticker.flush()
 
       # ---------------- Clear History ----------------
     def clear_history(self):
@@ -364,64 +686,23 @@ class ReminderApp:
         if messagebox.askyesno("Confirm", "Are you sure you want to delete all completed reminders?"):
             # Ask the user for confirmation before clearing
             clear_rang_reminders(self.current_user)  
-            # Remove reminders with status = "Rang"
-            self.refresh_list()  
-            # Refresh the listbox to show updated reminders
+            # Remove reminders with status = "Rang" (the list updates via the repository)
 
 
     # ---------------- Cancel Repeat ----------------
     def cancel_repeat(self):
         """Cancel repeat for the selected reminder"""
-        selection = self.listbox.curselection()  
-        # Get the selected row index from the listbox
-        if not selection:
+        reminder = self.selected_reminder()  
+        # Get the selected row (rows are keyed by reminder ID)
+        if reminder is None:
             messagebox.showwarning("No Selection", "Please select a reminder to cancel repeat.")
             # Show warning if nothing is selected
             return
-        index = selection[0]  
-        # Get index of selected item
-        if index <= 1:  
-            # Prevent canceling header/separator rows
-            messagebox.showwarning("Invalid Selection", "Please select a valid reminder row.")
-            return
-
-        line = self.listbox.get(index)  
-        # Get the selected reminder text line
-        parts = line.split("|")  
-        # Split the line into parts (Date, Time, Task, Repeat, Status)
-        if len(parts) < 5:
-            messagebox.showerror("Error", "Invalid reminder format.")  
-            # Error if format is not valid
-            return
 
-        date = parts[0].strip()       # Extract date
-        time_part = parts[1].strip()  # Extract time
-        task = parts[2].strip()       # Extract task
-        dt_str = f"{date} {time_part}"  
-        # Combine date and time into datetime string
-
-        reminders = load_reminders(self.current_user)  
-        # Load reminders from CSV
-        for r in reminders:  
-            if r["datetime"] == dt_str and r["task"] == task:
-                r["repeat"] = "None"  
-                # Cancel repeat by setting it to "None"
-
-        now = datetime.now()
-        reminders = [
-            r for r in reminders
-            if not (
-                r["task"] == task and
-                r["repeat"] == "Daily" and
-                datetime.strptime(r["datetime"], "%Y-%m-%d %I:%M %p") > now
-            )
-        ]
-        # Remove any future daily repeat reminders for this task
-
-        save_reminders(self.current_user, reminders)  
-        # Save updated reminders back to CSV
-        self.refresh_list()  
-        # Refresh the reminder list
+        self.repo.update({reminder["id"]: {"repeat": "None"}})  
+        # Cancel repeat by setting it to "None" (a repeating reminder is a single row,
+        # so there are no future copies to delete); the repository pushes the result
+        # into our schedule and list
         messagebox.showinfo("Cancelled", "Next Repeat Cancelled.")  
         # Show confirmation popup
 
@@ -429,27 +710,12 @@ class ReminderApp:
     # ---------------- Delete Reminder ----------------
     def delete_reminder(self):
         """Delete the selected reminder"""
-        selection = self.listbox.curselection()  
-        # Get the selected row index from listbox
-        if not selection:
+        reminder = self.selected_reminder()  
+        # Get the selected row (rows are keyed by reminder ID)
+        if reminder is None:
             messagebox.showwarning("No Selection", "Please select a reminder to delete.")
             # Warn if nothing is selected
             return
-        index = selection[0]  
-        # Get index of selected item
-        if index <= 1:
-            # Prevent deleting header/separator rows
-            messagebox.showwarning("Invalid Selection", "Please select a valid reminder row.")
-            return
-
-        line = self.listbox.get(index)  
-        # Get the selected reminder line
-        parts = line.split("|")  
-        # Split into parts
-        if len(parts) < 5:
-            messagebox.showerror("Error", "Invalid reminder format.")  
-            # Error if format is invalid
-            return
 
         confirm = messagebox.askyesno("Confirm Delete", "Are you sure you want to delete and stop repeat this reminder now?")
         # Ask user confirmation before deleting
@@ -457,33 +723,90 @@ class ReminderApp:
             # Do nothing if user cancels
             return
 
-        date = parts[0].strip()       # Extract date
-        time_part = parts[1].strip()  # Extract time
-        task = parts[2].strip()       # Extract task
-        dt_str = f"{date} {time_part}"  
-        # Build datetime string
-
-        reminders = load_reminders(self.current_user)  
-        # Load all reminders
-        reminders = [r for r in reminders if not (r["datetime"] == dt_str and r["task"] == task)]
-        # Filter out the selected reminder (delete it)
-        save_reminders(self.current_user, reminders)  
-        # Save updated reminders
-        self.refresh_list()  
-        # Refresh the listbox
+        self.repo.remove([reminder["id"]])  
+        # Delete the selected reminder; the repository pushes the change into
+        # our schedule and list (only its row is removed)
         messagebox.showinfo("Deleted", "Reminder deleted successfully.")  
         # Show success popup
 
 
+# ---------------- Catch-up Window ----------------
+class CatchUpWindow:
+    """One window listing reminders missed while the app was closed
+
+    Each row can be dismissed or snoozed; nothing is written until "Apply"
+    (or closing the window), so all decisions are saved in one batch.
+    """
+
+    def __init__(self, parent, on_apply):
+        self.on_apply = on_apply              # on_apply(dismissed, snoozed)
+        self.rows = {}                        # {id: (reminder, decision StringVar)}
+        self.window = tk.Toplevel(parent)
+        self.window.title("Missed Reminders")
+        self.window.geometry("560x400")
+        self.window.configure(bg="#E0FFFF")
+        self.window.protocol("WM_DELETE_WINDOW", self.apply)  # Closing counts as Apply
+
+        self.title_label = tk.Label(self.window, bg="#E0FFFF", font=("Arial", 13, "bold"))
+        self.title_label.pack(pady=10)
+
+        # ===== Scrollable =====
+        body = tk.Frame(self.window, bg="#E0FFFF")
+        body.pack(fill="both", expand=True, padx=10)
+        canvas = tk.Canvas(body, bg="#E0FFFF", highlightthickness=0)
+        scrollbar = ttk.Scrollbar(body, orient="vertical", command=canvas.yview)
+        self.scroll_frame = tk.Frame(canvas, bg="#E0FFFF")
+        self.scroll_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
+        canvas.create_window((0, 0), window=self.scroll_frame, anchor="nw")
+        canvas.configure(yscrollcommand=scrollbar.set)
+        canvas.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        btn_frame = tk.Frame(self.window, bg="#E0FFFF")
+        btn_frame.pack(pady=10)
+        tk.Button(btn_frame, text="Dismiss All", bg="lightgreen", width=12,
+                  command=lambda: self.set_all("Dismiss")).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text=f"Snooze All {SNOOZE_MINUTES} min", bg="yellow", width=16,
+                  command=lambda: self.set_all("Snooze")).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Apply", bg="lightblue", width=12,
+                  command=self.apply).pack(side=tk.LEFT, padx=5)
+
+    def add(self, reminders):
+        """Add rows for more missed reminders (duplicates are ignored)"""
+        for e in reminders:
+            if e["id"] in self.rows:
+                continue
+            row = tk.Frame(self.scroll_frame, bg="#E0FFFF")
+            row.pack(fill="x", pady=2)
+            date, time_part = display_due(e["due"])
+            tk.Label(row, text=f"{date} {time_part}", bg="#E0FFFF", width=20, anchor="w").pack(side=tk.LEFT)
+            tk.Label(row, text=e["task"], bg="#E0FFFF", width=24, anchor="w").pack(side=tk.LEFT)
+            decision = tk.StringVar(value="Dismiss")  # Per-item action
+            ttk.Combobox(row, textvariable=decision, values=["Dismiss", "Snooze"],
+                         width=9, state="readonly").pack(side=tk.LEFT, padx=5)
+            self.rows[e["id"]] = (e, decision)
+        self.title_label.config(text=f"You missed {len(self.rows)} reminder(s)")
+        self.window.lift()
+
+    def set_all(self, decision):
+        for _, var in self.rows.values():
+            var.set(decision)
+
+    def apply(self):
+        """Hand every decision to the app in one call and close"""
+        dismissed = [e for e, var in self.rows.values() if var.get() != "Snooze"]
+        snoozed = [e for e, var in self.rows.values() if var.get() == "Snooze"]
+        self.rows = {}
+        self.window.destroy()
+        self.on_apply(dismissed, snoozed)
+
+
 # ---------------- Utility Functions ----------------
 def clear_rang_reminders(user):
     """Remove all reminders with status 'Rang'"""
-    events = load_reminders(user)  
-    # Load reminders
-    filtered = [e for e in events if e["status"] != "Rang"]  
+    repo = get_repository(user)
+    repo.remove([e["id"] for e in repo.all() if e["status"] == "Rang"])  
     # Keep only those that are not 'Rang'
-    save_reminders(user, filtered)  
-    # Save updated list
 
 
 # ---------------- External Interface ----------------
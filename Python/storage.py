@@ -0,0 +1,123 @@
+# File: storage.py
+import os                         # Import os for file and path handling
+import time                       # Import time for lock retry / stale checks
+import threading                  # Import threading for the in-process lock table
+from contextlib import contextmanager  # Import contextmanager to build "with" helpers
+
+LOCK_RETRY_DELAY = 0.01           # Seconds to wait between lock attempts
+LOCK_STALE_AFTER = 10.0           # An ownerless lock file older than this is left over from a crash
+STILL_ACTIVE = 259                # Windows exit code of a process that is still running
+
+_thread_locks = {}                # {path: threading.Lock} so threads of one process queue up too
+_thread_locks_guard = threading.Lock()
+_held = threading.local()         # {path: depth} of locks this thread already holds
+
+
+def _thread_lock(path):
+    """Return the in-process lock that belongs to a file path"""
+    key = os.path.abspath(path)
+    with _thread_locks_guard:
+        if key not in _thread_locks:
+            _thread_locks[key] = threading.Lock()
+        return _thread_locks[key]
+
+
+def process_alive(pid):
+    """True if a process with this PID is running (on this machine)"""
+    if os.name == "nt":
+        import ctypes             # os.kill(pid, 0) would terminate the process on Windows
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        ok = kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return not ok or code.value == STILL_ACTIVE
+    try:
+        os.kill(pid, 0)           # Signal 0: existence check only
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True               # Someone else's process
+    return True
+
+
+def _lock_is_stale(lock_path):
+    """A lock is stale once its owner has died
+
+    The owner writes its PID right after creating the file; a lock with no
+    PID yet is only taken as stale once it is older than LOCK_STALE_AFTER.
+    A live owner keeps its lock however long it holds it.
+    """
+    try:
+        with open(lock_path, "rb") as f:
+            owner = f.read().strip()
+    except FileNotFoundError:
+        return False              # Released meanwhile: just retry
+    if owner.isdigit():
+        pid = int(owner)
+        return pid == os.getpid() or not process_alive(pid)  # Our own PID: left by a previous run
+    return time.time() - os.path.getmtime(lock_path) > LOCK_STALE_AFTER
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on a data file (works across threads and processes)
+
+    Re-entrant: a thread that already holds the lock can take it again.
+    """
+    held = _held.__dict__.setdefault("depths", {})
+    key = os.path.abspath(path)
+    if held.get(key):
+        held[key] += 1                               # Nested use in the same thread
+        try:
+            yield
+        finally:
+            held[key] -= 1
+        return
+    lock_path = path + ".lock"                       # Lock is a sibling "<file>.lock"
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    with _thread_lock(path):
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)  # Atomic "create if missing"
+                break
+            except FileExistsError:
+                try:
+                    if _lock_is_stale(lock_path):
+                        os.remove(lock_path)         # Owner crashed: break the stale lock
+                        continue
+                except OSError:
+                    continue                         # Lock vanished between calls, retry now
+                time.sleep(LOCK_RETRY_DELAY)
+        held[key] = 1
+        try:
+            os.write(fd, str(os.getpid()).encode())  # Record owner for debugging
+            os.close(fd)
+            yield
+        finally:
+            held[key] = 0
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+
+
+@contextmanager
+def atomic_write(path, newline=None):
+    """Open a temp file for writing and swap it over path on success
+
+    Readers see either the old file or the new one, never a half-written one.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", newline=newline, encoding="utf-8") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())                 # Data on disk before the rename
+        os.replace(tmp, path)                    # Atomic on Windows and POSIX
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
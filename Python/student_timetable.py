@@ -1,10 +1,20 @@
 import tkinter as tk  # Import tkinter GUI library
-from tkinter import ttk, messagebox  # Import themed widgets and message boxes
+from tkinter import ttk, messagebox, filedialog, simpledialog  # Import themed widgets, message boxes and file pickers
 import os  # Import OS module for file operations
-import csv  # Import CSV module to read/write CSV files
-from datetime import datetime  # Import datetime module for date and time handling
-from PIL import Image, ImageTk  # Import Pillow for image handling
-from simple_reminder import open_reminder  # Import function to open reminder window
+import calendar  # Import calendar for month lengths when paging months
+from datetime import datetime, timedelta  # Import datetime module for date and time handling
+from asset_cache import get_icon  # Import shared icon cache (no Pillow once icons are cached)
+from reminder_repository import get_repository, reminder_file, to_due  # Import shared reminder store
+from event_store import (  # Import cached per-date event index and shared course calendars
+    get_event_store, get_shared_calendar, events_file, to_minutes, user_events, sessions,
+    shared_calendars, subscriptions, set_subscriptions, valid_calendar_name,
+)
+from recurrence import PRESETS, build_rule, describe, parse_rule, same_schedule  # Import shared repeat rules
+from tick_scheduler import get_scheduler  # Import shared timer to debounce canvas resizes
+from conflicts import conflicting_ids, first_overlap, user_conflicts  # Import sweep-line conflict analyser
+from timetable_ics import import_ics, export_ics  # Import streaming iCalendar import/export
+from agenda import agenda  # Import merged events / appointments / bookings / reminders
+from appointments import cancel_appointment  # Import two-party appointment transactions
 DATA_DIR = "data"  # Define directory to store user data
 os.makedirs(DATA_DIR, exist_ok=True)  # Create data directory if it doesn't exist
 
@@ -12,112 +22,38 @@ os.makedirs(DATA_DIR, exist_ok=True)  # Create data directory if it doesn't exis
 
 # =========================================================
 def get_user_events_file(username):
-    return os.path.join("data", f"{username}_events.csv")  # Return file path for user's events CSV
+    return events_file(username)  # Return file path for user's events CSV
 
 def load_events(user, date=None):
-    """load event"""
-    events = []  # Initialize empty list of events
-    file = get_user_events_file(user)  # Get CSV file path for the user
-    if not os.path.exists(file):  # If file doesn't exist
-        return events  # Return empty list
-
-    with open(file, "r", encoding="utf-8") as f:  # Open CSV file in read mode
-        reader = csv.DictReader(f)  # Read rows as dictionaries
-        for row in reader:  # Loop through each row
-            start_time_str = row["start_time"]  # Get start time string
-
-            
-            if ":" in start_time_str:  # If format is HH:MM
-                start = start_time_str  # Keep as is
-            elif "," in start_time_str:  # If format is H,M
-                h, m = start_time_str.split(",")  # Split by comma
-                start = f"{int(h):02d}:{int(m):02d}"  # Convert to HH:MM
-            else:
-                continue  # Skip invalid format
-
-            events.append({  # Append event to list
-                "id": int(row["id"]),  # Event ID
-                "date": row["date"],  # Event date
-                "start_time": start,  # Start time in HH:MM
-                "end_time": row["end_time"],  # End time
-                "title": row["title"],  # Event title
-                "reminder": row.get("reminder", "0"),  # Reminder flag
-                "category": row.get("category", "event"),  # Event category
-                "description": row.get("description", "")  # Event description
-            })
-
-    if date:  # If date filter is provided
-        events = [e for e in events if e["date"] == date]  # Filter events by date
-    return events  # Return list of events
+    """load event (for one date: personal events merged with subscribed course calendars)"""
+    if date is None:
+        return get_event_store(user).events()  # Every personal row
+    return user_events(user, date)  # Cached indexes: one day is read without parsing any file
 
 def save_events(username, events):
     """保存某用户的所有事件"""
-    file = get_user_events_file(username)  # Get CSV file path
-    with open(file, "w", newline="", encoding="utf-8") as f:  # Open file in write mode
-        writer = csv.writer(f)  # Create CSV writer
-        writer.writerow(["id", "date", "start_time", "end_time", "title", "reminder", "category","description"])  # Write header
-        for e in events:  # Loop through events
-            writer.writerow([  # Write event data
-                e["id"], e["date"], e["start_time"], e["end_time"],
-                e["title"], e["reminder"], e["category"],e.get("description","")
-            ])
-
-def add_event_txt(username, date, start, end, title, category="event",description=""):
-    events = load_events(username)  # Load existing events
-    eid = max([e["id"] for e in events], default=0) + 1  # Generate new event ID
-    events.append({  # Append new event
-        "id": eid,
-        "date": date,
-        "start_time": start,
-        "end_time": end,
-        "title": title,
-        "reminder": "0",  # Default reminder off
-        "category": category,
-        "description" : description
-    })
-    save_events(username, events)  # Save updated events
-
-def update_event_txt(username, eid, title, start, end, category,description):
-    events = load_events(username)  # Load existing events
-    for e in events:  # Find the event by ID
-        if e["id"] == eid:
-            e["title"] = title  # Update title
-            e["start_time"] = start  # Update start time
-            e["end_time"] = end  # Update end time
-            e["category"] = category  # Update category
-            e["description"] = description  # Update description
-            break
-    save_events(username, events)  # Save updated events
+    get_event_store(username).save(events)  # Rewrite the file and the cached index
+
+def add_event_txt(username, date, start, end, title, category="event",description="", repeat=""):
+    return get_event_store(username).add(date, start, end, title, category, description, repeat=repeat)  # One journal line, no rewrite
+
+def update_event_txt(username, eid, title, start, end, category,description, repeat=None):
+    fields = dict(title=title, start_time=start, end_time=end, category=category, description=description)
+    if repeat is not None:
+        fields["repeat"] = "" if repeat == "None" else repeat  # change the series rule too
+    get_event_store(username).update(eid, **fields)  # One journal line, no rewrite
 
 def delete_event_txt(username, eid):
-    events = load_events(username)  # Load existing events
-    events = [e for e in events if e["id"] != eid]  # Remove event by ID
-    save_events(username, events)  # Save updated events
+    get_event_store(username).delete(eid)  # One journal line, no rewrite
 
 # =========================================================
 # Appointment Delete (check delete of two person)
 # =========================================================
 def delete_appointment(current_user, event):
-    title = event["title"]  # Get event title
-    date = event["date"]  # Get event date
-    start = event["start_time"]  # Get start time
-    end = event["end_time"]  # Get end time
-
-    delete_event_txt(current_user, event["id"])  # Delete current user's event
-
-    if title.startswith("Appointment with "):  # Check if it is an appointment
-        other_user = title.replace("Appointment with ", "").strip()  # Extract other user
-        other_events = load_events(other_user)  # Load other user's events
-        for ev in other_events:  # Loop through other user's events
-            expected_title = f"Appointment with {current_user}"  # Expected reciprocal title
-            if (
-                ev["date"] == date
-                and ev["start_time"] == start
-                and ev["end_time"] == end
-                and ev["title"] == expected_title
-            ):
-                delete_event_txt(other_user, ev["id"])  # Delete reciprocal event
-                break
+    if event.get("appointment") or event["title"].startswith("Appointment with "):  # Check if it is an appointment
+        cancel_appointment(current_user, event)  # Delete both users' rows in one transaction
+    else:
+        delete_event_txt(current_user, event["id"])  # Delete current user's event
 
 # =========================================================
 # Reminder 
@@ -126,77 +62,99 @@ def delete_appointment(current_user, event):
 # Reminder CSV
 # =========================================================
 def get_user_reminders_file(username):
-    return os.path.join(DATA_DIR, f"{username}_reminder.csv")  # Return path to user's reminder CSV
+    return reminder_file(username)  # Return path to user's reminder CSV (shared with ReminderApp)
 
 def load_reminders(username):
-    reminders = []  # Initialize empty list
-    file = get_user_reminders_file(username)  # Get file path
-    if not os.path.exists(file):  # If file does not exist
-        return reminders  # Return empty list
-
-    with open(file, "r", encoding="utf-8-sig") as f:  # Open CSV with BOM-safe encoding
-        reader = csv.DictReader(f)  # Read rows as dicts
-        for i, row in enumerate(reader, start=1):  # Loop with default index
-            if not row:  # Skip empty rows
-                continue
-            reminders.append({  # Append reminder
-                "id": int(row.get("id", i)),  # Use CSV ID or default index
-                "task": row.get("task", ""),  # Reminder task
-                "datetime": row.get("datetime", ""),  # Date and time string
-                "status": row.get("status", "Pending")  # Status
-            })
-    return reminders  # Return reminders list
+    return [dict(r) for r in get_repository(username).all()]  # Copies of the cached reminders
 
 def save_reminders(username, reminders):
-    file = get_user_reminders_file(username)  # Get file path
-    with open(file, "w", newline="", encoding="utf-8") as f:  # Open file to write
-        writer = csv.writer(f)  # CSV writer
-        writer.writerow(["id", "task", "datetime", "status"])  # Write header
-        for r in reminders:  # Loop through reminders
-            writer.writerow([r["id"], r["task"], r["datetime"], r["status"]])  # Write row
-
-def add_reminder(username, task, dt_str):
-    reminders = load_reminders(username)  # Load existing reminders
-    rid = max([r["id"] for r in reminders], default=0) + 1  # Generate new reminder ID
-    reminders.append({  # Append new reminder
-        "id": rid,
-        "task": task,
-        "datetime": dt_str,
-        "status": "Pending"  # Default status
-    })
-    save_reminders(username, reminders)  # Save reminders
+    get_repository(username).replace_all(reminders)  # Keeps the repeat column intact
+
+def add_reminder(username, task, due):
+    return get_repository(username).add(task, due)  # Add reminder (open ReminderApps are notified)
 
 def update_reminder_status(username, rid, status):
-    reminders = load_reminders(username)  # Load existing reminders
-    for r in reminders:  # Find reminder by ID
-        if r["id"] == rid:
-            r["status"] = status  # Update status
-            break
-    save_reminders(username, reminders)  # Save changes
+    get_repository(username).set_status({rid: status})  # Update one reminder's status
+
+def set_event_reminder_flag(username, eid, flag):
+    get_event_store(username).update(eid, reminder=flag)  # Update reminder flag (one journal line)
+
+def event_reminders(username, event):
+    """Reminders the user has for this event (a series matches by title and rule, ignoring COUNT)"""
+    repo = get_repository(username)
+    if event.get("repeat"):
+        return [r for r in repo.all() if r["task"] == event["title"] and same_schedule(r["repeat"], event["repeat"])]
+    due = to_due(datetime.strptime(f"{event['date']} {event['start_time']}", "%Y-%m-%d %H:%M"))
+    return repo.find_all(event["title"], due)
+
+def series_reminder_rule(username, event):
+    """Repeat value for a reminder that starts at this session of a series
+
+    COUNT becomes what is left of the series from this session on, and the
+    series' skipped dates come along so the reminder steps over them too.
+    """
+    rule = parse_rule(event.get("repeat"))
+    if rule is None:
+        return "None"
+    if event.get("calendar"):
+        stored = get_shared_calendar(event["calendar"]).get(int(str(event["id"]).rsplit(":", 1)[1]))
+    else:
+        stored = get_event_store(username).get(event["id"])
+    stored = stored or event  # the rule row holds the first session and the skipped dates
+    clicked = datetime.strptime(event["date"], "%Y-%m-%d")
+    if rule.count is not None:
+        anchor = cur = datetime.strptime(stored["date"], "%Y-%m-%d")
+        n = 1  # position of the clicked session, counted like event_store.expand
+        while cur is not None and cur < clicked and n < rule.count:
+            cur = rule.next_after(anchor, cur)
+            n += 1
+        rule.count -= n - 1
+    skipped = stored.get("exdates", "")
+    rule.exdates = [d for d in (datetime.strptime(s, "%Y-%m-%d").date() for s in skipped.split(";") if s)
+                    if d > clicked.date()]
+    return str(rule)
 
 def toggle_reminder(username, event, all_events):
     # click the reminder
-    reminders = load_reminders(username)  # Load reminders
-    dt_str = datetime.strptime(
+    repo = get_repository(username)  # Shared, indexed reminder store
+    due = to_due(datetime.strptime(
         f"{event['date']} {event['start_time']}", "%Y-%m-%d %H:%M"
-    ).strftime("%Y-%m-%d %I:%M %p")  # Convert to 12-hour format
+    ))  # Convert to the reminder due format (also pads "9:05" to "09:05")
     task = event["title"]  # Get task title
 
     # Check got or not
-    existing = next((r for r in reminders if r["task"] == task and r["datetime"] == dt_str), None)  # Check if reminder exists
+    if event.get("calendar"):
+        # shared course event: the row is everyone's, so only the personal reminder changes
+        existing = event_reminders(username, event)
+        if existing:
+            repo.remove([r["id"] for r in existing])  # Remove reminder
+        else:
+            repo.add(task, due, repeat=series_reminder_rule(username, event))  # Add reminder (from this session on)
+        return
+    if event.get("repeat"):
+        # a series gets one repeating reminder for the rest of it, starting from this session
+        existing = event_reminders(username, event)  # still found after the reminder's COUNT went down
+        if event["reminder"] == "0" and not existing:
+            repo.add(task, due, repeat=series_reminder_rule(username, event))  # Add repeating reminder
+            event["reminder"] = "1"
+        elif event["reminder"] == "1":
+            repo.remove([r["id"] for r in existing])  # Remove it (whichever session it is on now)
+            event["reminder"] = "0"
+        set_event_reminder_flag(username, event["id"], event["reminder"])  # flag lives on the rule row
+        return
+    existing = repo.find(task, due)  # O(1) lookup by (task, due)
 
     if event["reminder"] == "0" and not existing:  # If reminder not set
         # add to reminders.csv
-        add_reminder(username, task, dt_str)  # Add reminder
+        repo.add(task, due)  # Add reminder
         event["reminder"] = "1"  # Update event flag
     elif event["reminder"] == "1" and existing:  # If reminder exists
         # delete reminder
-        reminders = [r for r in reminders if not (r["task"] == task and r["datetime"] == dt_str)]  # Remove reminder
-        save_reminders(username, reminders)  # Save
+        repo.remove([r["id"] for r in repo.find_all(task, due)])  # Remove reminder
         event["reminder"] = "0"  # Update event flag
 
-    # save title CSV
-    save_events(username, all_events)  # Save events
+    # save the flag on this event only (all_events is just the day being shown)
+    set_event_reminder_flag(username, event["id"], event["reminder"])
 
 # =========================================================
 # Time
@@ -225,6 +183,70 @@ def to_12h_str(hhmm):
     h, m, ampm = to_12h(hhmm)  # Convert to 12h
     return f"{h}:{m:02d} {ampm}"  # Return formatted string
 
+# =========================================================
+# Week / Month views
+# =========================================================
+VIEWS = ["Day", "Week", "Month", "Agenda"]  # choices in the view picker
+AGENDA_ICONS = {"event": "📌", "appointment": "🤝", "booking": "🏫", "reminder": "🔔"}  # agenda type column
+CATEGORY_COLORS = {  # block colour per event category
+    "event": "#3498db",
+    "class": "#27ae60",
+    "appointment": "#8e44ad",
+    "meeting": "#e67e22",
+}
+HOUR_HEIGHT = 40  # pixels per hour in the week view
+TIME_GUTTER = 70  # width of the hour labels on the left of the week view
+HEADER_HEIGHT = 30  # height of the day-name row
+MONTH_LINES = 4  # event titles shown in a month cell before "+N more"
+MIN_CANVAS_SIZE = (700, 420)  # used until the canvas has been laid out
+CONFLICT_BG = "#fdecea"  # day-table row colour of overlapping events
+CONFLICT_OUTLINE = "#c0392b"  # week/month marker of overlapping events
+
+def parse_date(date_str):
+    return datetime.strptime(date_str, "%Y-%m-%d").date()  # "YYYY-MM-DD" -> date
+
+def week_dates(date_str):
+    d = parse_date(date_str)  # selected day
+    monday = d - timedelta(days=d.weekday())  # weeks start on Monday
+    return [(monday + timedelta(days=i)).isoformat() for i in range(7)]  # Mon..Sun
+
+def month_dates(date_str):
+    first = parse_date(date_str).replace(day=1)  # first of the selected month
+    start = first - timedelta(days=first.weekday())  # Monday on or before it
+    return [(start + timedelta(days=i)).isoformat() for i in range(42)]  # 6 full weeks
+
+def shift_date(date_str, view, step):
+    d = parse_date(date_str)  # current anchor date
+    if view == "Day":
+        return (d + timedelta(days=step)).isoformat()  # previous / next day
+    if view in ("Week", "Agenda"):
+        return (d + timedelta(weeks=step)).isoformat()  # same weekday, previous / next week
+    y, m = divmod(d.month - 1 + step, 12)  # previous / next month
+    y, m = d.year + y, m + 1
+    return d.replace(year=y, month=m, day=min(d.day, calendar.monthrange(y, m)[1])).isoformat()  # clamp 31st etc.
+
+def assign_lanes(events):
+    """Place overlapping events side by side: events sorted by start -> [(event, lane, lanes)]"""
+    placed = []  # finished clusters
+    cluster = []  # [(event, lane)] of the current run of overlapping events
+    lane_ends = []  # end time of the last event in each lane of the cluster
+    cluster_end = ""  # latest end time in the cluster
+    for e in events:
+        if cluster and e["start_time"] >= cluster_end:  # no overlap with anything so far
+            placed.extend((ev, lane, len(lane_ends)) for ev, lane in cluster)
+            cluster, lane_ends, cluster_end = [], [], ""
+        for lane, end in enumerate(lane_ends):
+            if end <= e["start_time"]:  # first lane that is free again
+                lane_ends[lane] = e["end_time"]
+                break
+        else:
+            lane = len(lane_ends)  # every lane busy: open a new one
+            lane_ends.append(e["end_time"])
+        cluster.append((e, lane))
+        cluster_end = max(cluster_end, e["end_time"])
+    placed.extend((ev, lane, len(lane_ends)) for ev, lane in cluster)
+    return placed
+
 
 
 
@@ -238,10 +260,8 @@ class TimetableApp:
         self.current_user = current_user  # store the current username
         self.root.title("Student Timetable")  # set window title
         self.root.geometry("1400x900")  # set default window size
-        edit_img = Image.open(os.path.join("assets","edit-246.png")).resize((16,16))  # load and resize edit icon
-        delete_img = Image.open(os.path.join("assets", "delete.png")).resize((16,16))  # load and resize delete icon
-        self.delete_icon = ImageTk.PhotoImage(delete_img)  # convert delete image to Tkinter PhotoImage
-        self.edit_icon = ImageTk.PhotoImage(edit_img)  # convert edit image to Tkinter PhotoImage
+        self.edit_icon = get_icon(root, "edit-246.png", (16, 16))  # cached 16x16 edit icon
+        self.delete_icon = get_icon(root, "Delete.png", (16, 16))  # cached 16x16 delete icon
 
         # allow window resizing
         self.root.rowconfigure(0, weight=1)  # make row 0 expandable
@@ -284,10 +304,51 @@ class TimetableApp:
 
         ttk.Button(control_frame, text="Load Date", width=btn_width, command=self.load_date_from_picker).pack(side="left", padx=5, pady=2)  # button to load selected date
         ttk.Button(control_frame, text="Add Event", width=btn_width, command=self.add_event_popup).pack(side="left", padx=5, pady=2)  # button to add event
+        ttk.Button(control_frame, text="Conflicts", width=btn_width, command=self.show_conflicts).pack(side="left", padx=5, pady=2)  # list overlapping events
+        ttk.Button(control_frame, text="Import ICS", width=btn_width, command=self.import_ics_file).pack(side="left", padx=5, pady=2)  # bulk import a calendar
+        ttk.Button(control_frame, text="Export ICS", width=btn_width, command=self.export_ics_file).pack(side="left", padx=5, pady=2)  # save timetable as .ics
+        ttk.Button(control_frame, text="Courses", width=btn_width, command=self.courses_popup).pack(side="left", padx=5, pady=2)  # shared course timetables
+
+        # view picker and paging
+        self.view_var = tk.StringVar(value="Day")  # Day table, or Week / Month canvas
+        view_box = ttk.Combobox(control_frame, textvariable=self.view_var, values=VIEWS, width=7, state="readonly")
+        view_box.pack(side="left", padx=5)  # place view picker
+        view_box.bind("<<ComboboxSelected>>", lambda e: self.redraw())  # switch view
+        ttk.Button(control_frame, text="◀", width=3, command=lambda: self.step(-1)).pack(side="left", padx=2)  # previous day/week/month
+        ttk.Button(control_frame, text="▶", width=3, command=lambda: self.step(1)).pack(side="left", padx=2)  # next day/week/month
 
         self.table_frame = tk.Frame(root)  # frame to hold event table
         self.table_frame.pack(padx=10, pady=10)  # pack table frame with padding
 
+        # one canvas for the week and month views (packed instead of the table)
+        self.calendar_frame = tk.Frame(root)  # frame holding canvas and scrollbar
+        self.canvas = tk.Canvas(self.calendar_frame, bg="white", highlightthickness=0)  # week / month drawing
+        scroll = ttk.Scrollbar(self.calendar_frame, orient="vertical", command=self.canvas.yview)  # scroll the 24h week
+        self.canvas.configure(yscrollcommand=scroll.set)  # link scrollbar
+        scroll.pack(side="right", fill="y")  # place scrollbar
+        self.canvas.pack(side="left", fill="both", expand=True)  # canvas fills the window
+        self.canvas.tag_bind("event", "<Button-1>", self.on_canvas_event)  # one binding for every event block
+        self.canvas.tag_bind("day", "<Button-1>", self.on_canvas_day)  # click a month cell to open that day
+        self.canvas.bind("<Configure>", self.on_canvas_resize)  # redraw the grid when resized
+        self._canvas_items = {}  # {canvas item: event dict or date} for the visible range
+        self._grid_key = None  # (view, width, height) the static grid was drawn for
+        self._resize_timer = None  # pending debounced redraw
+
+        # agenda: everything of the selected week in one list
+        self.agenda_frame = tk.Frame(root)
+        self.agenda_tree = ttk.Treeview(self.agenda_frame, columns=("date", "time", "type", "title", "detail"),
+                                        show="headings", height=25)
+        for col, text, width in (("date", "Date", 130), ("time", "Time", 160), ("type", "Type", 130),
+                                 ("title", "Title", 380), ("detail", "Details", 260)):
+            self.agenda_tree.heading(col, text=text)
+            self.agenda_tree.column(col, width=width, anchor="w")
+        agenda_scroll = ttk.Scrollbar(self.agenda_frame, orient="vertical", command=self.agenda_tree.yview)
+        self.agenda_tree.configure(yscrollcommand=agenda_scroll.set)
+        agenda_scroll.pack(side="right", fill="y")
+        self.agenda_tree.pack(side="left", fill="both", expand=True)
+        self.agenda_tree.bind("<Double-1>", self.on_agenda_open)  # double-click an event for details
+        self._agenda_items = {}  # {tree iid: agenda item}
+
         self.redraw()  # draw the table for the first time
 
     def load_date_from_picker(self):
@@ -295,7 +356,53 @@ class TimetableApp:
         self.date_var.set(date_str)  # update date_var
         self.redraw()  # refresh table
 
+    def set_date(self, date_str):
+        self.date_var.set(date_str)  # update selected date
+        self.year_var.set(date_str[:4])  # keep pickers in step
+        self.month_var.set(date_str[5:7])
+        self.day_var.set(date_str[8:10])
+
+    def step(self, direction):
+        self.set_date(shift_date(self.date_var.get(), self.view_var.get(), direction))  # page by the current view
+        self.redraw()  # show the new range
+
     def redraw(self):
+        view = self.view_var.get()
+        for frame in (self.table_frame, self.calendar_frame, self.agenda_frame):
+            frame.pack_forget()  # only the current view's frame is shown
+        if view == "Day":
+            self.table_frame.pack(padx=10, pady=10)  # show day table
+            self.draw_day()
+        elif view == "Agenda":
+            self.agenda_frame.pack(fill="both", expand=True, padx=10, pady=10)  # show agenda list
+            self.draw_agenda()
+        else:
+            self.calendar_frame.pack(fill="both", expand=True, padx=10, pady=10)  # show canvas
+            self.draw_calendar()
+
+    def draw_agenda(self):
+        tree = self.agenda_tree
+        tree.delete(*tree.get_children())  # clear the previous week
+        self._agenda_items = {}
+        dates = week_dates(self.date_var.get())  # Monday..Sunday of the selected date
+        category = self.category_filter.get()  # category filter applies to timetable rows
+        for i, item in enumerate(agenda(self.current_user, dates[0], dates[-1])):
+            ref = item["ref"]
+            if category != "all" and item["source"] in ("event", "appointment") and ref.get("category") != category:
+                continue
+            time_str = to_12h_str(item["start"]) + (f" - {to_12h_str(item['end'])}" if item["end"] else "")
+            iid = tree.insert("", "end", values=(
+                item["date"], time_str, f"{AGENDA_ICONS[item['source']]} {item['source'].title()}",
+                item["title"], item["detail"],
+            ))
+            self._agenda_items[iid] = item
+
+    def on_agenda_open(self, _event):
+        item = self._agenda_items.get(self.agenda_tree.focus())  # double-clicked row
+        if item and item["source"] in ("event", "appointment"):
+            self.show_event_detail(item["ref"])  # same popup as the day table
+
+    def draw_day(self):
         for w in self.table_frame.winfo_children():
             w.destroy()  # clear old table content
 
@@ -327,10 +434,13 @@ class TimetableApp:
             ).grid(row=1, column=0, columnspan=3)  # show message if no events
             return
 
-        events.sort(key=lambda e: e["start_time"])  # sort events by start time
+        # events come from the index already sorted by start time
+        clashes = conflicting_ids(events)  # events overlapping another one
 
         for i, e in enumerate(events, start=1):
             bg_color = "#ffffff" if i % 2 == 1 else "#f4f6f7"  # alternate row color
+            if e["id"] in clashes:
+                bg_color = CONFLICT_BG  # highlight overlapping events
 
             s_h, s_m, s_ampm = to_12h(e["start_time"])  # convert start time to 12h
             e_h, e_m, e_ampm = to_12h(e["end_time"])  # convert end time to 12h
@@ -341,7 +451,7 @@ class TimetableApp:
             ).grid(row=i, column=0, sticky="nsew", padx=2, pady=2)  # display time
 
             lbl = tk.Label(
-                table, text=f"[{e['category']}] {e['title']}",
+                table, text=f"{'⚠ ' if e['id'] in clashes else ''}[{e['category']}] {e['title']}",
                 bg=bg_color, anchor="w", font=("Segoe UI", 10)
             )
             lbl.grid(row=i, column=1, sticky="nsew", padx=2, pady=2)  # display event title
@@ -355,7 +465,13 @@ class TimetableApp:
             action_frame.grid_columnconfigure(2, weight=1)  # spacer column
             action_frame.grid_columnconfigure(3, minsize=120)  # reminder column
 
-            if e.get("category") == "appointment":
+            if e.get("calendar"):
+                tk.Label(
+                    action_frame, text=f"(Course: {e['calendar']})", fg="gray",
+                    bg=bg_color, font=("Segoe UI", 10, "italic")
+                ).grid(row=0, column=0, columnspan=2, sticky="w", padx=5)  # shared rows are edited by the course owner
+                e["reminder"] = "1" if event_reminders(self.current_user, e) else "0"  # reminder is personal
+            elif e.get("category") == "appointment":
                 tk.Label(
                     action_frame, text="(Locked)", fg="gray",
                     bg=bg_color, font=("Segoe UI", 10, "italic")
@@ -385,6 +501,281 @@ class TimetableApp:
             )
             cb.grid(row=0, column=3, sticky="w", padx=5)  # reminder checkbox
 
+    # ---------------- Week / Month canvas ----------------
+    def visible_events(self, date):
+        events = load_events(self.current_user, date)  # one day from the cached index, sorted by start
+        category = self.category_filter.get()  # selected category filter
+        if category == "all":
+            return events
+        return [e for e in events if e.get("category") == category]  # apply filter
+
+    def canvas_size(self):
+        width = max(self.canvas.winfo_width(), MIN_CANVAS_SIZE[0])  # actual size once laid out
+        height = max(self.canvas.winfo_height(), MIN_CANVAS_SIZE[1])
+        return width, height
+
+    def draw_calendar(self):
+        """Draw the week or month around the selected date
+
+        The grid lines only change with the view or window size, so paging just
+        deletes the "range" items and draws the visible dates again.
+        """
+        view = self.view_var.get()  # "Week" or "Month"
+        width, height = self.canvas_size()
+        key = (view, width, height if view == "Month" else None)  # the week grid ignores height
+        if key != self._grid_key:
+            self.canvas.delete("all")  # new view or size: rebuild the grid too
+            if view == "Week":
+                self.draw_week_grid(width)
+            else:
+                self.draw_month_grid(width, height)
+            self._grid_key = key
+        else:
+            self.canvas.delete("range")  # same grid: only the dates and events change
+        self._canvas_items = {}  # forget the previous range's items
+        if view == "Week":
+            self.draw_week(width)
+        else:
+            self.draw_month(width, height)
+
+    def draw_week_grid(self, width):
+        col_w = (width - TIME_GUTTER) / 7  # one column per day
+        bottom = HEADER_HEIGHT + 24 * HOUR_HEIGHT  # end of the 24h grid
+        for h in range(25):
+            y = HEADER_HEIGHT + h * HOUR_HEIGHT  # hour line
+            self.canvas.create_line(TIME_GUTTER, y, width, y, fill="#e1e4e8", tags="grid")
+            if h < 24:
+                self.canvas.create_text(TIME_GUTTER - 6, y + 2, text=to_12h_str(f"{h:02d}:00"),
+                                        anchor="ne", fill="gray", font=("Segoe UI", 8), tags="grid")  # hour label
+        for i in range(8):
+            x = TIME_GUTTER + i * col_w  # day separator
+            self.canvas.create_line(x, 0, x, bottom, fill="#d0d4db", tags="grid")
+        self.canvas.configure(scrollregion=(0, 0, width, bottom))  # scroll through the day
+        self.canvas.yview_moveto(7 / 24)  # start at 7 AM
+
+    def draw_week(self, width):
+        col_w = (width - TIME_GUTTER) / 7  # one column per day
+        today = datetime.now().strftime("%Y-%m-%d")  # highlight today's header
+        for i, date in enumerate(week_dates(self.date_var.get())):
+            x0 = TIME_GUTTER + i * col_w  # left edge of the day
+            header = self.canvas.create_rectangle(x0, 0, x0 + col_w, HEADER_HEIGHT, outline="",
+                                                  fill="#3498db" if date == today else "#2c3e50",
+                                                  tags=("range", "day"))
+            label = self.canvas.create_text(x0 + col_w / 2, HEADER_HEIGHT / 2, fill="white",
+                                            text=parse_date(date).strftime("%a %d %b"),
+                                            font=("Segoe UI", 10, "bold"), tags=("range", "day"))  # day name
+            self._canvas_items[header] = date  # header click opens the day
+            self._canvas_items[label] = date
+            events = self.visible_events(date)
+            clashes = conflicting_ids(events)  # overlapping events get a red outline
+            for e, lane, lanes in assign_lanes(events):
+                try:
+                    start, end = to_minutes(e["start_time"]), to_minutes(e["end_time"])
+                except ValueError:
+                    continue  # unreadable end time: nowhere to draw it
+                lane_w = col_w / lanes  # overlapping events share the column
+                bx0 = x0 + lane * lane_w + 2
+                bx1 = bx0 + lane_w - 4
+                by0 = HEADER_HEIGHT + start * HOUR_HEIGHT / 60
+                by1 = max(HEADER_HEIGHT + end * HOUR_HEIGHT / 60, by0 + 14)  # keep tiny events clickable
+                color = CATEGORY_COLORS.get(e.get("category"), "#7f8c8d")
+                clash = e["id"] in clashes
+                block = self.canvas.create_rectangle(bx0, by0, bx1, by1, fill=color,
+                                                     outline=CONFLICT_OUTLINE if clash else "white",
+                                                     width=3 if clash else 1, tags=("range", "event"))
+                text = e["title"] if by1 - by0 < 28 else f"{to_12h_str(e['start_time'])}\n{e['title']}"
+                caption = self.canvas.create_text(bx0 + 3, by0 + 2, anchor="nw", text=text, fill="white",
+                                                  width=max(bx1 - bx0 - 6, 1), font=("Segoe UI", 8),
+                                                  tags=("range", "event"))
+                self._canvas_items[block] = e  # click either item for details
+                self._canvas_items[caption] = e
+
+    def draw_month_grid(self, width, height):
+        cell_w = width / 7  # one column per weekday
+        for i, name in enumerate(["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]):
+            self.canvas.create_rectangle(i * cell_w, 0, (i + 1) * cell_w, HEADER_HEIGHT,
+                                         fill="#2c3e50", outline="white", tags="grid")
+            self.canvas.create_text((i + 0.5) * cell_w, HEADER_HEIGHT / 2, text=name, fill="white",
+                                    font=("Segoe UI", 10, "bold"), tags="grid")  # weekday name
+        self.canvas.configure(scrollregion=(0, 0, width, height))  # nothing to scroll
+        self.canvas.yview_moveto(0)
+
+    def draw_month(self, width, height):
+        cell_w = width / 7  # one column per weekday
+        cell_h = (height - HEADER_HEIGHT) / 6  # six week rows
+        anchor = self.date_var.get()  # selected date decides the month
+        today = datetime.now().strftime("%Y-%m-%d")  # highlight today
+        for idx, date in enumerate(month_dates(anchor)):
+            row, col = divmod(idx, 7)
+            x0, y0 = col * cell_w, HEADER_HEIGHT + row * cell_h  # cell corner
+            in_month = date[:7] == anchor[:7]
+            cell = self.canvas.create_rectangle(x0, y0, x0 + cell_w, y0 + cell_h, outline="#d0d4db",
+                                                fill="white" if in_month else "#f4f6f7", tags=("range", "day"))
+            self._canvas_items[cell] = date  # click a cell to open that day
+            self.canvas.create_text(x0 + 6, y0 + 4, anchor="nw", text=str(int(date[8:])),
+                                    fill="#3498db" if date == today else ("#2c3e50" if in_month else "gray"),
+                                    font=("Segoe UI", 10, "bold"), tags="range")  # day number
+            events = self.visible_events(date)
+            clashes = conflicting_ids(events)  # overlapping events are marked in red
+            lines = max(1, min(MONTH_LINES, int((cell_h - 24) // 16)))  # titles that fit in the cell
+            shown = events if len(events) <= lines else events[:lines - 1]  # leave a row for "+N more"
+            for j, e in enumerate(shown):
+                item = self.canvas.create_text(x0 + 6, y0 + 22 + j * 16, anchor="nw",
+                                               text=f"{'⚠ ' if e['id'] in clashes else ''}{to_12h_str(e['start_time'])} {e['title']}",
+                                               width=cell_w - 10,
+                                               fill=CONFLICT_OUTLINE if e["id"] in clashes
+                                               else CATEGORY_COLORS.get(e.get("category"), "#7f8c8d"),
+                                               font=("Segoe UI", 8), tags=("range", "event"))
+                self._canvas_items[item] = e
+            if len(events) > len(shown):
+                more = self.canvas.create_text(x0 + 6, y0 + 22 + len(shown) * 16, anchor="nw",
+                                               text=f"+{len(events) - len(shown)} more", fill="gray",
+                                               font=("Segoe UI", 8, "italic"), tags=("range", "day"))
+                self._canvas_items[more] = date
+
+    def visible_range(self):
+        view = self.view_var.get()  # range shown by the current view
+        if view in ("Week", "Agenda"):
+            dates = week_dates(self.date_var.get())
+        elif view == "Month":
+            dates = [d for d in month_dates(self.date_var.get()) if d[:7] == self.date_var.get()[:7]]
+        else:
+            dates = [self.date_var.get()]
+        return dates[0], dates[-1]
+
+    def show_conflicts(self):
+        first, last = self.visible_range()  # check what the current view shows
+        pairs = user_conflicts(self.current_user, first, last)  # one sort + sweep over the range
+        if not pairs:
+            messagebox.showinfo("Conflicts", f"No overlapping events between {first} and {last}.")
+            return
+        lines = [
+            f"{a['date']}  {to_12h_str(a['start_time'])} {a['title']}  ↔  {to_12h_str(b['start_time'])} {b['title']}"
+            for a, b in pairs[:20]
+        ]  # first 20 pairs
+        if len(pairs) > 20:
+            lines.append(f"... and {len(pairs) - 20} more")
+        messagebox.showwarning("Conflicts", f"{len(pairs)} overlapping pair(s) between {first} and {last}:\n\n" + "\n".join(lines))
+
+    def import_ics_file(self):
+        path = filedialog.askopenfilename(title="Import calendar", filetypes=[("iCalendar", "*.ics"), ("All files", "*.*")])
+        if not path:
+            return
+        skip = messagebox.askyesno("Import ICS", "Skip imported events that overlap your existing events?")
+        try:
+            result = import_ics(self.current_user, path, skip_conflicts=skip)  # streams the file, one write
+        except (OSError, UnicodeDecodeError) as e:
+            messagebox.showerror("Import ICS", f"Could not read the file:\n{e}")
+            return
+        lines = [f"Imported {len(result['added'])} event(s)."]
+        if result["duplicates"]:
+            lines.append(f"{result['duplicates']} already in your timetable.")
+        if result["unsupported"]:
+            lines.append(f"{result['unsupported']} all-day or unreadable event(s) not imported.")
+        if result["skipped"]:
+            lines.append(f"{result['skipped']} skipped because they overlap existing events.")
+        if result["conflicts"]:
+            lines.append(f"{len(result['conflicts'])} overlapping pair(s) are highlighted in the timetable.")
+        messagebox.showinfo("Import ICS", "\n".join(lines))
+        self.redraw()  # show the new events
+
+    def export_ics_file(self):
+        path = filedialog.asksaveasfilename(title="Export calendar", defaultextension=".ics",
+                                            initialfile=f"{self.current_user}_timetable.ics",
+                                            filetypes=[("iCalendar", "*.ics")])
+        if not path:
+            return
+        try:
+            count = export_ics(self.current_user, path)  # written day by day from the index
+        except OSError as e:
+            messagebox.showerror("Export ICS", f"Could not write the file:\n{e}")
+            return
+        messagebox.showinfo("Export ICS", f"Exported {count} event(s) to\n{path}")
+
+    def courses_popup(self):
+        popup = tk.Toplevel(self.root)
+        popup.title("Course Timetables")
+        popup.geometry("380x420")
+        popup.configure(bg="#e9ecf1")
+
+        card = tk.Frame(popup, bg="white", highlightbackground="#d0d4db", highlightthickness=1, padx=20, pady=15)
+        card.pack(fill="both", expand=True, padx=20, pady=20)
+        tk.Label(card, text="📚 Subscribed courses", font=("Segoe UI", 14, "bold"), fg="#2c3e50", bg="white").pack(anchor="w", pady=(0, 10))
+
+        list_frame = tk.Frame(card, bg="white")  # one checkbox per shared calendar
+        list_frame.pack(fill="both", expand=True)
+        chosen = {}  # {calendar name: IntVar}
+
+        def fill():
+            for w in list_frame.winfo_children():
+                w.destroy()
+            mine = set(subscriptions(self.current_user))
+            names = shared_calendars()
+            if not names:
+                tk.Label(list_frame, text="No course timetables yet.", fg="gray", bg="white").pack(anchor="w")
+            for name in names:
+                chosen[name] = tk.IntVar(value=int(name in mine))
+                tk.Checkbutton(list_frame, text=name, variable=chosen[name], bg="white", anchor="w").pack(fill="x")
+
+        def import_course():
+            name = simpledialog.askstring("Import course", "Course / section name (e.g. BACS2063 T3):", parent=popup)
+            if name is None:
+                return
+            name = name.strip()
+            if not valid_calendar_name(name):
+                messagebox.showerror("Import course", "Use letters, digits, spaces, - and _ only.", parent=popup)
+                return
+            path = filedialog.askopenfilename(parent=popup, title="Course calendar", filetypes=[("iCalendar", "*.ics"), ("All files", "*.*")])
+            if not path:
+                return
+            try:
+                result = import_ics(self.current_user, path, calendar=name)  # stored once in data/shared/
+            except (OSError, UnicodeDecodeError) as e:
+                messagebox.showerror("Import course", f"Could not read the file:\n{e}", parent=popup)
+                return
+            messagebox.showinfo("Import course", f"{len(result['added'])} event(s) added to {name}.", parent=popup)
+            fill()
+            chosen[name].set(1)  # subscribe to what you just imported
+
+        def save():
+            set_subscriptions(self.current_user, [n for n, v in chosen.items() if v.get()])
+            popup.destroy()
+            self.redraw()
+
+        fill()
+        btn_frame = tk.Frame(card, bg="white")
+        btn_frame.pack(fill="x", pady=(10, 0))
+        ttk.Button(btn_frame, text="Import ICS as course", command=import_course).pack(side="left")
+        ttk.Button(btn_frame, text="Save", command=save).pack(side="right")
+
+    def on_canvas_event(self, _event):
+        item = self.canvas.find_withtag("current")  # item under the mouse
+        ev = self._canvas_items.get(item[0]) if item else None
+        if isinstance(ev, dict):
+            self.show_event_detail(ev)  # same popup as the day table
+
+    def on_canvas_day(self, _event):
+        item = self.canvas.find_withtag("current")  # item under the mouse
+        date = self._canvas_items.get(item[0]) if item else None
+        if isinstance(date, str):
+            self.set_date(date)  # open that day in the table view
+            self.view_var.set("Day")
+            self.redraw()
+
+    def on_canvas_resize(self, _event):
+        if self.view_var.get() not in ("Week", "Month"):
+            return
+        if self._resize_timer is not None:
+            self._resize_timer.cancel()  # only redraw once the window stops changing size
+        self._resize_timer = get_scheduler(self.root).call_later(100, self.redraw_if_resized, owner=self.canvas)
+
+    def redraw_if_resized(self):
+        self._resize_timer = None
+        view = self.view_var.get()
+        width, height = self.canvas_size()
+        if view in ("Week", "Month") and (view, width, height if view == "Month" else None) != self._grid_key:
+            self.draw_calendar()
+
          
 
 
@@ -397,14 +788,14 @@ class TimetableApp:
 
     def edit_event_popup(self, eid):
         events = load_events(self.current_user, self.date_var.get())
-        event = next((ev for ev in events if ev["id"] == eid), None)
+        event = next((ev for ev in events if ev["id"] == eid and not ev.get("calendar")), None)
         if event:
             self.event_popup(event)
 
     def event_popup(self, event=None):
         popup = tk.Toplevel(self.root)
         popup.title("Event Editor")
-        popup.geometry("600x500")
+        popup.geometry("600x580")
         popup.configure(bg="#e9ecf1")   # background
 
         card = tk.Frame(
@@ -472,6 +863,27 @@ class TimetableApp:
         if event:
             desc_text.insert("1.0", event.get("description", ""))
 
+        # === Repeat ===
+        tk.Label(card, text="Repeat:", font=("Segoe UI", 11), bg="white").grid(row=6, column=0, sticky="e", pady=5)
+        repeat_choices = list(PRESETS)  # None, Daily, Weekdays, Weekly, Monthly
+        current_rule = parse_rule(event.get("repeat")) if event else None
+        repeat_var = tk.StringVar(value="None")
+        until_var = tk.StringVar()
+        if current_rule is not None:
+            until_var.set(current_rule.until.isoformat() if current_rule.until else "")
+            current_rule.until = None  # compare the pattern without its end date
+            preset = next((k for k, v in PRESETS.items() if v == str(current_rule)), None)
+            if preset is None:
+                repeat_choices.append("Keep current")  # custom rule (e.g. imported): keep as is
+                preset = "Keep current"
+            repeat_var.set(preset)
+        ttk.Combobox(card, textvariable=repeat_var, values=repeat_choices, state="readonly", width=12).grid(row=6, column=1, columnspan=2, pady=5, sticky="w")
+        if event and event.get("repeat"):
+            tk.Label(card, text=describe(event["repeat"]), font=("Segoe UI", 9), fg="gray", bg="white").grid(row=6, column=3, sticky="w")
+        tk.Label(card, text="Until:", font=("Segoe UI", 11), bg="white").grid(row=7, column=0, sticky="e", pady=5)
+        tk.Entry(card, textvariable=until_var, font=("Segoe UI", 10), width=12, relief="solid", bd=1).grid(row=7, column=1, columnspan=2, pady=5, sticky="w")
+        tk.Label(card, text="YYYY-MM-DD, optional", font=("Segoe UI", 9), fg="gray", bg="white").grid(row=7, column=3, sticky="w")
+
         # === Save ===
         def save():
             if not title_var.get().strip():
@@ -490,37 +902,68 @@ class TimetableApp:
                 messagebox.showerror("Error", "Start time must be before end time.")
                 return
 
-            events = load_events(self.current_user, self.date_var.get())
-            for ev in events:
-                if event and ev["id"] == event["id"]:
-                    continue  
+            title = title_var.get().strip()
+            category = category_var.get().strip()
+            description = desc_text.get("1.0", "end").strip()
+
+            if repeat_var.get() == "Keep current":
+                repeat = event["repeat"]  # unchanged custom rule
+            else:
+                try:
+                    until = datetime.strptime(until_var.get().strip(), "%Y-%m-%d").date() if until_var.get().strip() else None
+                except ValueError:
+                    messagebox.showerror("Error", "Until must be a date like 2025-12-31.")
+                    return
+                repeat = build_rule(repeat_var.get(), until=until)  # "None" for one-off events
 
-                ev_start = ev["start_time"]
-                ev_end   = ev["end_time"]
+            only_this = False
+            if event and event.get("repeat"):
+                only_this = messagebox.askyesnocancel(
+                    "Recurring event",
+                    "Change only this session?\n\nYes: only this session\nNo: every session of the series"
+                )
+                if only_this is None:
+                    return
 
-                # Check if time tumplica
-                if not (end <= ev_start or start >= ev_end):
+            # check every session the save will write, not just the day on screen
+            stored = get_event_store(self.current_user).get(event["id"]) if event else None
+            if only_this or repeat == "None" or not repeat:
+                candidate = {"date": self.date_var.get(), "repeat": ""}
+            elif stored is not None:
+                candidate = {"date": stored["date"], "repeat": repeat, "exdates": stored["exdates"]}  # series keeps its first date
+            else:
+                candidate = {"date": self.date_var.get(), "repeat": repeat}
+            for session in sessions(candidate):
+                events = load_events(self.current_user, session["date"])  # sorted by start time
+                ev = first_overlap(events, to_minutes(start), to_minutes(end), event["id"] if event else None)
+                if ev is not None:
                     messagebox.showerror(
                         "Error",
-                        f"Time conflict with existing event:\n{ev['title']} ({ev_start} - {ev_end})"
+                        f"Time conflict with existing event on {ev['date']}:\n{ev['title']} ({ev['start_time']} - {ev['end_time']})"
                     )
                     return
-                    
-            title = title_var.get().strip()
-            category = category_var.get().strip()
-            description = desc_text.get("1.0", "end").strip()
+
+            if event and event.get("repeat"):
+                if only_this:
+                    get_event_store(self.current_user).move_occurrence(
+                        event["id"], event["date"], title=title, start_time=start, end_time=end,
+                        category=category, description=description
+                    )  # skip this date in the series and add a one-off copy
+                    popup.destroy()
+                    self.redraw()
+                    return
 
             if event:
-                update_event_txt(self.current_user, event["id"], title, start, end, category, description)
+                update_event_txt(self.current_user, event["id"], title, start, end, category, description, repeat)
             else:
-                add_event_txt(self.current_user, self.date_var.get(), start, end, title, category, description)
+                add_event_txt(self.current_user, self.date_var.get(), start, end, title, category, description, repeat)
 
             popup.destroy()
             self.redraw()
 
         # === button ===
         btn_frame = tk.Frame(card, bg="white")
-        btn_frame.grid(row=6, column=0, columnspan=4, pady=15)
+        btn_frame.grid(row=8, column=0, columnspan=4, pady=15)
 
         tk.Button(btn_frame, text="💾 Save", command=save,
                 bg="#2ecc71", fg="white", font=("Segoe UI", 10, "bold"),
@@ -615,6 +1058,17 @@ class TimetableApp:
 
     
     def delete_and_refresh(self, event):
+        if event.get("repeat"):
+            only_this = messagebox.askyesnocancel(
+                "Recurring event",
+                "Delete only this session?\n\nYes: only this session\nNo: the whole series"
+            )
+            if only_this is None:
+                return
+            if only_this:
+                get_event_store(self.current_user).skip_occurrence(event["id"], event["date"])  # add an exception date
+                self.redraw()
+                return
         delete_appointment(self.current_user, event)
         self.redraw()
 
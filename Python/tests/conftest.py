@@ -0,0 +1,15 @@
+# File: tests/conftest.py
+import os                         # Import os for path handling
+import sys                        # Import sys so the tests can import the app modules
+import pytest                     # Import pytest for fixtures
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)       # The modules live next to this folder, not in a package
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Run a test in an empty working folder (the modules read and write ./data)"""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    return tmp_path / "data"
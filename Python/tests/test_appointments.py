@@ -0,0 +1,106 @@
+# File: tests/test_appointments.py
+import multiprocessing as mp      # Import multiprocessing to run real concurrent writers
+import os                         # Import os to check the recovery journal
+import random                     # Import random for each worker's mix of operations
+from collections import defaultdict
+import storage                    # Import storage to shorten the stale-lock timeout
+import appointments
+from event_store import EventStore, get_event_store, to_minutes
+
+USERS = ["amy", "ben", "cat"]
+DATE = "2030-01-07"
+WORKERS = 6
+ROUNDS = 25
+
+
+def _create_and_cancel(seed):
+    """Worker: book random half-hours between random pairs, cancelling some"""
+    rng = random.Random(seed)
+    for _ in range(ROUNDS):
+        user, other = rng.sample(USERS, 2)
+        hour = rng.randrange(8, 20)
+        try:
+            appointments.create_appointment(user, other, DATE, f"{hour:02d}:00", f"{hour:02d}:30")
+        except ValueError:
+            pass                  # Someone else booked that time first
+        mine = [e for e in get_event_store(user).events(DATE) if e["appointment"]]
+        if mine and rng.random() < 0.4:
+            appointments.cancel_appointment(user, rng.choice(mine))
+
+
+def _crash_mid_create(user, other):
+    """Worker: log a create, then die before writing either row"""
+    appointments._apply = lambda record, redo=False: os._exit(1)
+    appointments.create_appointment(user, other, DATE, "09:00", "10:00")
+
+
+def _rows_by_appointment(users):
+    rows = defaultdict(list)
+    for user in users:
+        for e in EventStore(user).events():   # Fresh store: read only what is on disk
+            if e["appointment"]:
+                rows[e["appointment"]].append((user, e))
+    return rows
+
+
+def test_concurrent_create_and_cancel_keep_both_sides(data_dir):
+    with mp.get_context("spawn").Pool(WORKERS) as pool:
+        pool.map(_create_and_cancel, range(WORKERS))
+
+    rows = _rows_by_appointment(USERS)
+    assert rows                   # Some appointments survived the cancels
+    for appointment_id, pair in rows.items():
+        assert len(pair) == 2, pair                       # Both rows or neither
+        (a, ea), (b, eb) = pair
+        assert appointments.other_party(ea) == b and appointments.other_party(eb) == a
+        assert (ea["start_time"], ea["end_time"]) == (eb["start_time"], eb["end_time"])
+    for user in USERS:            # Conflict checks ran with both timetables locked
+        day = EventStore(user).events(DATE)
+        for prev, nxt in zip(day, day[1:]):
+            assert to_minutes(prev["end_time"]) <= to_minutes(nxt["start_time"])
+    assert not os.path.exists(appointments.TX_JOURNAL)
+
+
+def test_recover_redoes_crashed_create_without_clobbering(data_dir, monkeypatch):
+    worker = mp.get_context("spawn").Process(target=_crash_mid_create, args=("dan", "eve"))
+    worker.start()
+    worker.join()
+    assert worker.exitcode == 1
+    assert os.path.exists(appointments.TX_JOURNAL)
+
+    # An ordinary add after the crash takes the ID the journal picked for dan
+    monkeypatch.setattr(storage, "LOCK_STALE_AFTER", 0.05)
+    lecture = get_event_store("dan").add(DATE, "12:00", "13:00", "Lecture", category="class")
+    pending = appointments._pending()
+    journaled = {user: e["id"] for record in pending.values() for user, e in record["puts"]}
+    assert lecture["id"] == journaled["dan"]
+
+    assert appointments.recover() == 1
+    assert get_event_store("dan").get(lecture["id"])["title"] == "Lecture"
+    rows = _rows_by_appointment(["dan", "eve"])
+    assert len(rows) == 1
+    (pair,) = rows.values()
+    assert sorted(user for user, _ in pair) == ["dan", "eve"]
+    assert all(e["id"] != lecture["id"] for user, e in pair if user == "dan")
+    assert not os.path.exists(appointments.TX_JOURNAL)
+
+
+def test_link_appointments_pairs_only_registered_counterparts(data_dir):
+    with open("data/users.txt", "w") as f:
+        f.write("1000001,fay,x\n1000002,gus,x\n")
+    fay, gus = get_event_store("fay"), get_event_store("gus")
+    paired = fay.add(DATE, "09:00", "10:00", "Appointment with gus", category="appointment")
+    theirs = gus.add(DATE, "09:00", "10:00", "Appointment with fay", category="appointment")
+    lonely = fay.add(DATE, "11:00", "12:00", "Appointment with gus", category="appointment")
+    stranger = fay.add(DATE, "13:00", "14:00", "Appointment with nobody", category="appointment")
+    titled = fay.add(DATE, "15:00", "16:00", "Appointment with gus", category="class")
+
+    linked, unpaired = appointments.link_appointments("fay")
+    assert linked == 2
+    assert sorted(e["id"] for e in unpaired) == [lonely["id"], stranger["id"]]
+    appointment_id = fay.get(paired["id"])["appointment"]
+    assert appointment_id and gus.get(theirs["id"])["appointment"] == appointment_id
+    assert set(appointments.get_appointment("fay", appointment_id)["rows"]) == {"fay", "gus"}
+    assert not any(fay.get(e["id"])["appointment"] for e in (lonely, stranger, titled))
+    assert not os.path.exists("data/nobody_events.csv.lock") and not os.path.exists("data/nobody_events.journal")
+    assert appointments.link_appointments("fay") == (0, unpaired)
@@ -0,0 +1,20 @@
+# File: tests/test_asset_cache.py
+import sys
+import asset_cache
+
+
+class _Root:
+    def _root(self):
+        return self
+
+
+def test_get_icon_without_pillow_gives_no_icon(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "Delete.png").write_bytes(b"not decoded without Pillow")
+    monkeypatch.setitem(sys.modules, "PIL", None)   # "from PIL import ..." raises ImportError
+
+    root = _Root()
+    assert asset_cache.get_icon(root, "delete.png", (16, 16)) is None
+    assert asset_cache.get_icon(root, "delete.png", (16, 16)) is None   # Cached: no retry
+    assert not (tmp_path / "assets" / ".cache").exists()
@@ -0,0 +1,20 @@
+# File: tests/test_recurrence.py
+from datetime import datetime
+from recurrence import advance, same_schedule
+
+
+def test_series_rule_still_matches_reminder_after_count_goes_down():
+    series = "FREQ=WEEKLY;BYDAY=MO;COUNT=4"
+    _, repeat = advance(series, "2030-01-07T09:00", now=datetime(2030, 1, 7, 9, 5))
+    assert repeat != series                       # The reminder's copy of the rule counts down
+    assert same_schedule(repeat, series)
+    assert not same_schedule("FREQ=WEEKLY;BYDAY=TU;COUNT=4", series)
+    assert not same_schedule("None", series)
+
+
+def test_late_dismissal_uses_up_the_missed_occurrences():
+    late = datetime(2030, 1, 2, 12, 0)            # The 01-01 and 01-02 occurrences are both past
+    assert advance("FREQ=DAILY;COUNT=4", "2030-01-01T09:00", now=late) == ("2030-01-03T09:00", "FREQ=DAILY;COUNT=2")
+    assert advance("FREQ=DAILY;COUNT=3", "2030-01-01T09:00", now=datetime(2030, 1, 10, 12, 0)) is None
+    assert advance("FREQ=DAILY;COUNT=1", "2030-01-01T09:00", now=datetime(2030, 1, 1, 9, 5)) is None
+    assert advance("FREQ=DAILY", "2030-01-01T09:00", now=datetime(2030, 1, 10, 12, 0)) == ("2030-01-11T09:00", "FREQ=DAILY")
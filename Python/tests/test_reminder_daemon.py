@@ -0,0 +1,77 @@
+# File: tests/test_reminder_daemon.py
+import json
+import os
+import socket
+import threading
+import time
+import tkinter
+import _tkinter
+import pytest
+import reminder_daemon
+from reminder_daemon import DaemonClient, ReminderDaemon, queue_notifications
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Tk can't watch a pipe on Windows (the app polls instead)")
+def test_client_wakes_tk_only_on_messages_and_disconnect():
+    gui_side, daemon_side = socket.socketpair()
+    client = DaemonClient(gui_side, "kim", "secret")
+    tcl = tkinter.Tcl()               # Tk's event loop without a window
+    woken = []
+    tcl.tk.createfilehandler(client.wake_fd, tkinter.READABLE, lambda fd, mask: woken.append(client.poll()))
+
+    def run_events(seconds):
+        end = time.time() + seconds
+        while time.time() < end and not woken:
+            tcl.tk.dooneevent(_tkinter.DONT_WAIT) or time.sleep(0.01)
+
+    run_events(0.3)
+    assert woken == []                              # Idle: no wake-ups at all
+
+    daemon_side.sendall(json.dumps({"event": "due", "id": 1}).encode() + b"\n")
+    run_events(5)
+    assert woken == [[{"event": "due", "id": 1}]]   # Handled on this (the Tk) thread
+
+    del woken[:]
+    daemon_side.close()
+    run_events(5)
+    assert woken == [[]] and not client.connected   # Disconnect wakes the GUI too
+    tcl.tk.deletefilehandler(client.wake_fd)
+    client.close()
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind((reminder_daemon.DAEMON_HOST, 0))
+        return s.getsockname()[1]
+
+
+def _say(port, msg):
+    sock = socket.create_connection((reminder_daemon.DAEMON_HOST, port), timeout=5)
+    sock.sendall(json.dumps(msg).encode() + b"\n")
+    return sock
+
+
+def test_daemon_serves_only_clients_with_the_token_and_stops_on_request(data_dir):
+    token = reminder_daemon.daemon_token()
+    assert oct(os.stat(reminder_daemon.TOKEN_FILE).st_mode & 0o777) == "0o600"
+    queue_notifications("kim", [{"id": 3, "task": "Essay", "due": "2030-01-01T09:00", "repeat": "None"}])
+    port = _free_port()
+    daemon = threading.Thread(target=ReminderDaemon(port=port).serve_forever, daemon=True)
+    daemon.start()
+    for _ in range(100):
+        try:
+            socket.create_connection((reminder_daemon.DAEMON_HOST, port), timeout=5).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+
+    for bad in ({"op": "hello", "user": "kim"}, {"op": "hello", "user": "kim", "token": "guess"},
+                {"op": "stop", "token": "guess"}):
+        with _say(port, bad) as sock:
+            assert sock.recv(4096) == b""           # Dropped without a word
+    assert daemon.is_alive()
+
+    with _say(port, {"op": "hello", "user": "kim", "token": token}) as sock:
+        assert json.loads(sock.recv(4096))["task"] == "Essay"
+    _say(port, {"op": "stop", "token": token}).close()
+    daemon.join(5)
+    assert not daemon.is_alive()
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+from reminder_repository import ReminderRepository, get_repository, to_due
+from simple_reminder import ReminderTicker
+
+
+def test_writes_per_tick_do_not_grow_with_due_reminders(data_dir, monkeypatch):
+    writes = []
+    save = ReminderRepository._save
+    monkeypatch.setattr(ReminderRepository, "_save", lambda self: (writes.append(self.user), save(self)))
+
+    due = to_due(datetime.now() - timedelta(minutes=1))
+    per_size = {}
+    for count in (1, 10, 100):
+        repo = get_repository(f"writes{count}")
+        with repo.batch():
+            for i in range(count):
+                repo.add(f"task {i}", due)
+        ticker = ReminderTicker(repo)
+        ticker.queue.rebuild(repo.all())
+
+        del writes[:]
+        fired = ticker.tick(to_due(datetime.now()))  # Every due reminder -> Ringing
+        tick = len(writes)
+        for r in fired:                              # The user dismisses every alert
+            ticker.dismissed(r["id"], r["task"], r["repeat"], r["due"])
+        ticker.flush()                               # Every reminder -> Rang
+        per_size[count] = (tick, len(writes) - tick)
+
+        assert len(fired) == count
+        assert {r["status"] for r in repo.all()} == {"Rang"}
+    assert per_size == {1: (1, 1), 10: (1, 1), 100: (1, 1)}
+
+
+def test_nothing_collected_means_no_write(data_dir, monkeypatch):
+    writes = []
+    monkeypatch.setattr(ReminderRepository, "_save", lambda self: writes.append(self.user))
+    ticker = ReminderTicker(get_repository("idle"))
+    assert ticker.tick(to_due(datetime.now())) == []
+    ticker.flush()
+    assert writes == []
@@ -0,0 +1,26 @@
+# File: tests/test_startup.py
+import json                       # Import json to read the child process's report
+import subprocess                 # Import subprocess for a clean interpreter (cold imports)
+import sys                        # Import sys for the current interpreter path
+from conftest import APP_DIR
+
+STARTUP_BUDGET_MS = 500           # Time the login window may spend importing before it paints
+DEFERRED = ["simple_reminder", "student_timetable", "make_appointment", "room_booking",
+            "notes_organizer_app", "PIL"]  # Loaded on first click in the homepage, never at login
+
+# Everything login.py imports before it creates its window
+CHILD = f"""
+import json, sys, time
+start = time.perf_counter()
+import tkinter, user_store, homepage
+ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": ms, "loaded": [m for m in {DEFERRED!r} if m in sys.modules]}}))
+"""
+
+
+def test_login_imports_stay_light_and_fast():
+    out = subprocess.run([sys.executable, "-c", CHILD], cwd=APP_DIR, capture_output=True,
+                         text=True, check=True, timeout=60)
+    report = json.loads(out.stdout.strip().splitlines()[-1])
+    assert report["loaded"] == []
+    assert report["ms"] < STARTUP_BUDGET_MS, f"login imports took {report['ms']:.0f} ms"
@@ -0,0 +1,55 @@
+# File: tests/test_storage.py
+import os
+import subprocess
+import sys
+import threading
+import time
+import storage
+from storage import file_lock
+
+
+def _old_lock(path, owner):
+    with open(path + ".lock", "w") as f:
+        f.write(owner)
+    past = time.time() - 3600
+    os.utime(path + ".lock", (past, past))   # Far older than LOCK_STALE_AFTER
+
+
+def _acquired_within(path, seconds):
+    done = threading.Event()
+
+    def take():
+        with file_lock(path):
+            done.set()
+    threading.Thread(target=take, daemon=True).start()
+    return done.wait(seconds)
+
+
+def test_lock_of_live_owner_is_never_broken(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "LOCK_STALE_AFTER", 0.01)
+    path = str(tmp_path / "data.csv")
+    owner = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        _old_lock(path, str(owner.pid))           # A slow holder, not a crashed one
+        assert not _acquired_within(path, 0.5)
+    finally:
+        owner.kill()
+        owner.wait()
+    assert _acquired_within(path, 5)              # Owner gone: lock is stale now
+
+
+def test_lock_of_dead_owner_is_broken_at_once(tmp_path):
+    path = str(tmp_path / "data.csv")
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    _old_lock(path, str(dead.pid))
+    os.utime(path + ".lock")                      # Even a fresh lock: its owner is dead
+    assert _acquired_within(path, 2)
+
+
+def test_ownerless_lock_waits_for_timeout(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.csv")
+    open(path + ".lock", "w").close()             # Created, PID not written yet
+    assert not _acquired_within(path, 0.3)
+    monkeypatch.setattr(storage, "LOCK_STALE_AFTER", 0.0)
+    assert _acquired_within(path, 2)
@@ -0,0 +1,43 @@
+# File: tests/test_timetable_ics.py
+from event_store import get_event_store, sessions
+from timetable_ics import import_ics
+
+ICS = """BEGIN:VCALENDAR
+BEGIN:VEVENT
+DTSTART:20300107T090000
+DTEND:20300107T100000
+RRULE:FREQ=WEEKLY;COUNT=4
+SUMMARY:Tutorial
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+def test_sessions_follow_count_until_and_horizon():
+    assert [s["date"] for s in sessions({"date": "2030-01-07", "repeat": "FREQ=WEEKLY;COUNT=3"})] == \
+        ["2030-01-07", "2030-01-14", "2030-01-21"]
+    assert len(sessions({"date": "2030-01-07", "repeat": "FREQ=DAILY;UNTIL=20300110"})) == 4
+    assert len(sessions({"date": "2030-01-07", "repeat": "FREQ=WEEKLY"}, horizon_days=28)) == 5
+    assert sessions({"date": "2030-01-07", "repeat": ""}) == [{"date": "2030-01-07", "repeat": ""}]
+
+
+def test_import_checks_every_session_of_a_series(data_dir):
+    path = data_dir / "tutorial.ics"
+    path.write_text(ICS)
+    for user in ("ivy", "jon"):
+        get_event_store(user).add("2030-01-21", "09:30", "10:30", "Lab")  # Clashes with the third session only
+
+    report = import_ics("ivy", str(path))
+    assert [(a["date"], b["date"]) for a, b in report["conflicts"]] == [("2030-01-21", "2030-01-21")]
+
+    report = import_ics("jon", str(path), skip_conflicts=True)
+    assert report["skipped"] == 1 and report["added"] == []
+    assert [e["title"] for e in get_event_store("jon").events()] == ["Lab"]
+
+
+def test_rule_with_unsupported_parts_imports_the_first_session(data_dir):
+    path = data_dir / "monthly.ics"
+    for i, rrule in enumerate(("FREQ=MONTHLY;BYDAY=2MO", "FREQ=MONTHLY;BYMONTHDAY=-1", "FREQ=DAILY;BYHOUR=9,15")):
+        path.write_text(ICS.replace("FREQ=WEEKLY;COUNT=4", rrule))
+        report = import_ics(f"kay{i}", str(path))
+        assert [(e["date"], e["repeat"]) for e in report["added"]] == [("2030-01-07", "")], rrule
@@ -0,0 +1,21 @@
+from datetime import datetime
+from event_store import get_event_store
+from recurrence import advance
+from reminder_repository import get_repository
+from student_timetable import event_reminders, toggle_reminder
+
+
+def test_series_reminder_covers_the_rest_of_the_series_and_skips_its_exdates(data_dir):
+    store = get_event_store("lee")
+    series = store.add("2030-01-07", "09:00", "10:00", "Tutorial", repeat="FREQ=WEEKLY;COUNT=4")
+    store.update(series["id"], exdates="2030-01-21")  # Sessions: 01-07, 01-14, (01-21), 01-28
+    clicked = store.events("2030-01-14")[0]
+
+    toggle_reminder("lee", clicked, [clicked])
+    [reminder] = get_repository("lee").all()
+    assert (reminder["due"], reminder["repeat"]) == ("2030-01-14T09:00", "FREQ=WEEKLY;COUNT=3;EXDATE=20300121")
+    assert event_reminders("lee", clicked) == [reminder]
+
+    nxt = advance(reminder["repeat"], reminder["due"], now=datetime(2030, 1, 14, 9, 5))
+    assert nxt == ("2030-01-28T09:00", "FREQ=WEEKLY;COUNT=1")  # 01-21 was skipped but still counted
+    assert advance(nxt[1], nxt[0], now=datetime(2030, 1, 28, 9, 5)) is None
@@ -0,0 +1,16 @@
+# File: tests/test_user_store.py
+from user_store import UserStore
+
+
+def test_login_rewrites_plaintext_password_off_disk(tmp_path):
+    users = tmp_path / "users.txt"
+    users.write_text("1000001,alice,secret123\n1000002,bob,hunter2\n")
+    store = UserStore(str(users), str(tmp_path / "users.seq"))
+
+    assert store.authenticate("alice", "secret123") == "1000001"
+    lines = users.read_text().splitlines()
+    assert len(lines) == 2                        # Rewritten, not appended
+    assert "secret123" not in users.read_text()
+    assert "1000002,bob,hunter2" in lines         # Other users are left as they were
+    assert store.authenticate("alice", "secret123") == "1000001"
+    assert UserStore(str(users), str(tmp_path / "users.seq")).authenticate("alice", "secret123") == "1000001"
@@ -0,0 +1,129 @@
+# File: tick_scheduler.py
+import heapq                      # Import heapq to find the earliest deadline
+import math                       # Import math to round wake-up delays up
+import sys                        # Import sys to report callback errors like Tk does
+import time                       # Import time for wall-clock deadlines
+
+GRANULARITY_MS = 10               # Deadlines this close together share one wake-up
+
+
+class Timer:
+    """Handle returned by the scheduler; call cancel() to stop it"""
+
+    def __init__(self, scheduler, callback, period, owner):
+        self.scheduler = scheduler
+        self.callback = callback
+        self.period = period      # Seconds between runs, or None for a one-shot timer
+        self.owner = owner        # Widget whose destruction cancels the timer (or None)
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        self.scheduler._drop_cancelled()
+        self.scheduler._arm()     # Disarm if this was the only thing left to wait for
+
+
+class TickScheduler:
+    """One after() timer shared by every window of the app
+
+    Features register one-shot deadlines or periodic callbacks. Timers are
+    grouped by deadline (to GRANULARITY_MS), so e.g. every clock label that
+    ticks on the second runs from the same wake-up. Only the earliest
+    deadline is armed, and nothing is armed while no timers are registered.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._buckets = {}        # {deadline bucket: [Timer]}
+        self._heap = []           # [deadline bucket] with an entry in _buckets
+        self._after_id = None     # The single pending root.after()
+        self._armed_for = None    # Bucket that after() will fire for
+
+    # ---------------- Registering ----------------
+    def call_at(self, when, callback, owner=None):
+        """Run callback once at wall-clock time `when` (seconds since the epoch)"""
+        timer = Timer(self, callback, None, owner)
+        self._add(when, timer)
+        return timer
+
+    def call_later(self, delay_ms, callback, owner=None):
+        """Run callback once after delay_ms milliseconds"""
+        return self.call_at(time.time() + delay_ms / 1000, callback, owner)
+
+    def every(self, period_ms, callback, owner=None):
+        """Run callback every period_ms, aligned to the wall clock
+
+        Aligning means all 1-second tickers fire together at the start of each second.
+        """
+        timer = Timer(self, callback, period_ms / 1000, owner)
+        self._add(self._next_aligned(timer.period), timer)
+        return timer
+
+    @staticmethod
+    def _next_aligned(period):
+        now = time.time()
+        return (now // period + 1) * period
+
+    def _add(self, when, timer):
+        bucket = int(-(-when * 1000 // GRANULARITY_MS))  # Round up so we never run early
+        if bucket not in self._buckets:
+            self._buckets[bucket] = []
+            heapq.heappush(self._heap, bucket)
+        self._buckets[bucket].append(timer)
+        self._arm()
+
+    # ---------------- Running ----------------
+    def _arm(self):
+        """Point the single after() at the earliest deadline (or at nothing)"""
+        if not self._heap:
+            self._cancel_after()
+            return
+        first = self._heap[0]
+        if self._after_id is not None and self._armed_for == first:
+            return
+        self._cancel_after()
+        delay = max(0, math.ceil(first * GRANULARITY_MS - time.time() * 1000))  # Never wake early
+        self._armed_for = first
+        self._after_id = self.root.after(delay, self._run)
+
+    def _cancel_after(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+            self._armed_for = None
+
+    def _run(self):
+        self._after_id = None
+        self._armed_for = None
+        now_bucket = int(time.time() * 1000 // GRANULARITY_MS)
+        due = []
+        while self._heap and self._heap[0] <= now_bucket:
+            due.extend(self._buckets.pop(heapq.heappop(self._heap)))
+        for timer in due:
+            if timer.cancelled:
+                continue
+            if timer.owner is not None and not timer.owner.winfo_exists():
+                timer.cancelled = True            # Window closed: forget its timers
+                continue
+            if timer.period is not None:
+                self._add(self._next_aligned(timer.period), timer)  # Re-arm before running
+            try:
+                timer.callback()
+            except Exception:
+                self.root.report_callback_exception(*sys.exc_info())
+        self._drop_cancelled()
+        self._arm()
+
+    def _drop_cancelled(self):
+        """Forget deadlines whose timers were all cancelled (so idle means no after())"""
+        while self._heap and all(t.cancelled for t in self._buckets[self._heap[0]]):
+            del self._buckets[heapq.heappop(self._heap)]
+
+
+def get_scheduler(widget):
+    """Return the scheduler shared by every window of this Tk app"""
+    root = widget._root()         # The Tk instance all Toplevels belong to
+    scheduler = getattr(root, "_tick_scheduler", None)
+    if scheduler is None:
+        scheduler = root._tick_scheduler = TickScheduler(root)
+    return scheduler
@@ -0,0 +1,237 @@
+# File: timetable_ics.py
+import re                         # Import re to read iCalendar durations
+from datetime import datetime, timedelta, timezone  # Import datetime for DTSTART/DTEND conversion
+from event_store import get_event_store, get_shared_calendar, sessions  # Import cached per-date event indexes
+from recurrence import parse_rule # Import the shared rules (an RRULE subset) for recurring events
+from conflicts import find_conflicts  # Import sweep-line overlap finder
+from storage import atomic_write  # Import safe rewrite for the export file
+
+CATEGORIES = ("event", "class", "meeting")  # Categories an imported event may keep
+PRODID = "-//TAR UMT Student Assistant//Timetable//EN"
+DURATION_RE = re.compile(r"^P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+FOLD_AT = 75                      # Maximum octets per line (RFC 5545)
+
+
+# =========================================================
+# Reading
+# =========================================================
+def _unfolded(lines):
+    """Join RFC 5545 folded lines (continuations start with a space or tab)"""
+    current = None
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def _split(line):
+    """"DTSTART;TZID=X:20250918T090000" -> ("DTSTART", {"TZID": "X"}, "20250918T090000")"""
+    head, _, value = line.partition(":")
+    name, *params = head.split(";")
+    return name.upper(), dict(p.split("=", 1) for p in params if "=" in p), value
+
+
+def _unescape(text):
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), text)
+
+
+def _parse_datetime(value, params):
+    """Return (local datetime, all_day)"""
+    day = datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]))  # Sliced: strptime is slow on big files
+    if params.get("VALUE", "").upper() == "DATE" or len(value) == 8:
+        return day, True
+    if value[8:9] != "T":
+        raise ValueError(value)
+    dt = day.replace(hour=int(value[9:11]), minute=int(value[11:13]), second=int(value[13:15] or 0))
+    if value.endswith("Z"):       # UTC -> local time; TZID times are taken as local already
+        dt = dt.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    return dt, False
+
+
+def _parse_duration(value):
+    m = DURATION_RE.match(value.lstrip("+"))
+    if not m:
+        raise ValueError(value)
+    w, d, h, mi, s = (int(x or 0) for x in m.groups())
+    return timedelta(weeks=w, days=d, hours=h, minutes=mi, seconds=s)
+
+
+def read_ics(lines):
+    """Yield timetable events from iCalendar lines (a file object is read line by line)
+
+    Only timed VEVENTs are yielded; all-day or unreadable ones are yielded as
+    None so callers can count them. An event running past midnight is cut
+    off at 23:59. An RRULE the timetable understands is kept as the event's
+    rule (with EXDATEs as skipped dates); other RRULEs import the first session.
+    """
+    props = None
+    for line in _unfolded(lines):
+        name, params, value = _split(line)
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            props = {}
+        elif name == "END" and value.upper() == "VEVENT" and props is not None:
+            yield _to_event(props)
+            props = None
+        elif props is not None and name == "EXDATE":
+            props.setdefault("EXDATE", []).extend(value.split(","))  # May appear several times
+        elif props is not None and name not in props:  # First value wins (ignore VALARM etc.)
+            props[name] = (params, value)
+
+
+def _to_event(props):
+    try:
+        start, all_day = _parse_datetime(props["DTSTART"][1], props["DTSTART"][0])
+        if all_day:
+            return None
+        if "DTEND" in props:
+            end = _parse_datetime(props["DTEND"][1], props["DTEND"][0])[0]
+        elif "DURATION" in props:
+            end = start + _parse_duration(props["DURATION"][1])
+        else:
+            end = start
+    except (KeyError, ValueError):
+        return None
+    if end.date() != start.date():
+        end = start.replace(hour=23, minute=59)  # The timetable has no multi-day events
+    if end <= start:
+        return None
+    category = _unescape(props.get("CATEGORIES", ({}, ""))[1]).split(",")[0].strip().lower()
+    rule = parse_rule(props["RRULE"][1]) if "RRULE" in props else None
+    exdates = sorted({f"{d[0:4]}-{d[4:6]}-{d[6:8]}" for d in props.get("EXDATE", []) if len(d) >= 8})
+    return {
+        "date": start.strftime("%Y-%m-%d"),
+        "start_time": start.strftime("%H:%M"),
+        "end_time": end.strftime("%H:%M"),
+        "title": _unescape(props.get("SUMMARY", ({}, ""))[1]).strip() or "(No title)",
+        "category": category if category in CATEGORIES else "event",
+        "description": _unescape(props.get("DESCRIPTION", ({}, ""))[1]).strip(),
+        "reminder": "0",
+        "repeat": str(rule) if rule else "",
+        "exdates": ";".join(exdates) if rule else "",
+    }
+
+
+def import_ics(user, path, skip_conflicts=False, calendar=None):
+    """Add the events of an .ics file to a user's timetable (or a shared calendar) in one write
+
+    Events already in the timetable (same date, times and title) are skipped.
+    Overlaps are found in one sorted sweep over every session of the imported
+    events (series are expanded, see event_store.sessions) plus the existing
+    events of the days they touch; with skip_conflicts, imported events (a
+    whole series if any session clashes) that overlap an existing event are left out.
+    Returns {"added", "duplicates", "unsupported", "skipped", "conflicts"}.
+    """
+    store = get_shared_calendar(calendar) if calendar else get_event_store(user)
+    new, unsupported, duplicates = [], 0, 0
+    existing = {}                 # {date: [event]} for days the file touches
+    seen = set()                  # (date, start, end, title) already present or imported
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for event in read_ics(f):
+            if event is None:
+                unsupported += 1
+                continue
+            date = event["date"]
+            if date not in existing:
+                existing[date] = store.events(date)  # One day from the index, sorted by start
+                seen.update((e["date"], e["start_time"], e["end_time"], e["title"]) for e in existing[date])
+            key = (date, event["start_time"], event["end_time"], event["title"])
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            event["id"] = -len(new) - 1   # Temporary ID so the sweep can tell imports apart
+            new.append(event)
+
+    expanded = [session for e in new for session in sessions(e)]  # A series clashes on any of its dates
+    for session in expanded:
+        if session["date"] not in existing:
+            existing[session["date"]] = store.events(session["date"])
+    pairs = find_conflicts([e for day in existing.values() for e in day] + expanded)
+    skipped = set()
+    if skip_conflicts:
+        skipped = {e["id"] for pair in pairs for e in pair if e["id"] < 0
+                   and any(other["id"] >= 0 for other in pair)}
+    added = store.add_many([e for e in new if e["id"] not in skipped])
+    conflicts = [(a, b) for a, b in pairs if a["id"] not in skipped and b["id"] not in skipped]
+    return {
+        "added": added,
+        "duplicates": duplicates,
+        "unsupported": unsupported,
+        "skipped": len(skipped),
+        "conflicts": conflicts,
+    }
+
+
+# =========================================================
+# Writing
+# =========================================================
+def _escape(text):
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _fold(line):
+    """Split a content line into RFC 5545 lines of at most FOLD_AT octets"""
+    data = line.encode("utf-8")
+    if len(data) <= FOLD_AT:
+        return line + "\r\n"
+    parts, limit = [], FOLD_AT
+    while data:
+        cut = min(limit, len(data))
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:
+            cut -= 1              # Don't split a UTF-8 character
+        parts.append(data[:cut].decode("utf-8"))
+        data, limit = data[cut:], FOLD_AT - 1  # Continuation lines lose one octet to the space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _vevent(user, e, stamp):
+    day = e["date"].replace("-", "")
+    yield "BEGIN:VEVENT\r\n"
+    yield f"UID:{user}-{e['id']}@student-assistant\r\n"
+    yield f"DTSTAMP:{stamp}\r\n"
+    yield f"DTSTART:{day}T{e['start_time'].replace(':', '')}00\r\n"
+    yield f"DTEND:{day}T{e['end_time'].replace(':', '')}00\r\n"
+    if e.get("repeat"):
+        yield f"RRULE:{e['repeat']}\r\n"  # Stored rules are already RRULE syntax
+        for d in filter(None, e.get("exdates", "").split(";")):
+            yield f"EXDATE:{d.replace('-', '')}T{e['start_time'].replace(':', '')}00\r\n"
+    yield _fold(f"SUMMARY:{_escape(e['title'])}")
+    yield f"CATEGORIES:{_escape(e['category'].upper())}\r\n"
+    if e.get("description"):
+        yield _fold(f"DESCRIPTION:{_escape(e['description'])}")
+    yield "END:VEVENT\r\n"
+
+
+def iter_ics(user):
+    """Yield the lines of a user's timetable as iCalendar, one day at a time
+
+    Recurring events are written once, as their rule, after the one-off events.
+    """
+    store = get_event_store(user)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield "BEGIN:VCALENDAR\r\n"
+    yield "VERSION:2.0\r\n"
+    yield f"PRODID:{PRODID}\r\n"
+    for date in sorted(store.dates()):
+        for e in store.events(date):
+            if not e.get("repeat"):       # Sessions of a series are exported with the rule
+                yield from _vevent(user, e, stamp)
+    for e in store.series():
+        yield from _vevent(user, e, stamp)
+    yield "END:VCALENDAR\r\n"
+
+
+def export_ics(user, path):
+    """Write a user's timetable to an .ics file; returns the number of events"""
+    count = 0
+    with atomic_write(path, newline="") as f:
+        for line in iter_ics(user):
+            f.write(line)
+            count += line == "BEGIN:VEVENT\r\n"
+    return count
@@ -0,0 +1,171 @@
+# File: user_store.py
+import os                         # Import os for file and path handling
+import threading                  # Import threading to guard the shared index
+from storage import file_lock, atomic_write  # Import cross-process lock / safe rewrite for users.txt
+import passwords                  # Import salted password hashing
+
+USER_FILE = os.path.join("data", "users.txt")  # Path to user data file (id,username,password)
+SEQ_FILE = os.path.join("data", "users.seq")   # Path to last assigned student ID
+FIRST_STUDENT_ID = 1000001                     # First ID handed out on an empty system
+
+
+class UserStore:
+    """Indexed view of users.txt: {username: (student_id, password_hash)}
+
+    users.txt is append-only, so the index only reads lines added since the last
+    lookup. Student IDs come from a persisted counter instead of max() over all rows.
+    A rehashed password rewrites the file at once (atomically), so the old
+    plaintext or weaker hash doesn't stay on disk.
+    """
+
+    def __init__(self, path=USER_FILE, seq_path=SEQ_FILE):
+        self.path = path
+        self.seq_path = seq_path
+        self._lock = threading.RLock()
+        self._index = {}          # {username: (student_id, password_hash)}
+        self._max_id = 0          # Highest numeric ID seen (seeds the counter once)
+        self._offset = 0          # Bytes of users.txt already indexed
+        self._inode = None        # Detects the file being replaced instead of appended
+
+    # ---------------- Index maintenance ----------------
+    def _reset(self):
+        self._index.clear()
+        self._max_id = 0
+        self._offset = 0
+        self._inode = None
+
+    def _add_line(self, line):
+        parts = line.strip().split(",")
+        if len(parts) == 3:                      # New format: id, username, password
+            sid, username, password = parts
+        elif len(parts) == 2:                    # Old format fallback: username, password
+            sid, (username, password) = "0000000", parts
+        else:
+            return
+        self._index[username] = (sid, password)  # Later lines supersede earlier ones
+        if sid.isdigit():
+            self._max_id = max(self._max_id, int(sid))
+
+    def _refresh(self):
+        """Index any lines appended since the last call (one stat when nothing changed)"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset()
+            return
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            self._reset()                        # File was rewritten: index it from scratch
+            self._inode = st.st_ino
+        if st.st_size == self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1              # Leave a half-written last line for next time
+        for line in data[:end].decode("utf-8").splitlines():
+            self._add_line(line)
+        self._offset += end
+
+    # ---------------- Student ID sequence ----------------
+    def _next_student_id(self):
+        """Advance the persisted counter (caller holds the users.txt lock)"""
+        last = None
+        if os.path.exists(self.seq_path):
+            with open(self.seq_path, "r", encoding="utf-8") as f:
+                text = f.read().strip()
+            if text.isdigit():
+                last = int(text)
+        if last is None:                         # First run: seed from the existing users
+            last = max(self._max_id, FIRST_STUDENT_ID - 1)
+        new_id = max(last, self._max_id) + 1     # Never reuse an ID written by hand
+        with atomic_write(self.seq_path) as f:   # Atomic swap so a crash can't lose the counter
+            f.write(str(new_id))
+        return str(new_id).zfill(7)
+
+    def _append(self, line):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        self._refresh()
+
+    def _compact(self):
+        """Rewrite users.txt with one line per user (caller holds the lock)"""
+        with atomic_write(self.path) as f:
+            for username, (sid, password) in self._index.items():
+                f.write(f"{sid},{username},{password}\n")
+        self._reset()
+        self._refresh()
+
+    # ---------------- Public API ----------------
+    def find(self, username):
+        """Return (student_id, password_hash) for a username, or None"""
+        with self._lock:
+            self._refresh()
+            return self._index.get(username)
+
+    def usernames(self):
+        """Return all registered usernames"""
+        with self._lock:
+            self._refresh()
+            return list(self._index)
+
+    def register(self, username, password):
+        """Append a new user and return the assigned ID (None if the name is taken)
+
+        Slow (runs the password KDF), so call it off the Tk main thread.
+        """
+        if self.find(username) is not None:      # Cheap early exit before hashing
+            return None
+        password_hash = passwords.hash_password(password)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock, file_lock(self.path):
+            self._refresh()                      # See registrations from other processes
+            if username in self._index:
+                return None
+            student_id = self._next_student_id()
+            self._append(f"{student_id},{username},{password_hash}")
+            return student_id
+
+    def authenticate(self, username, password):
+        """Return the student ID if the password matches, else None
+
+        Legacy plaintext / weaker entries are upgraded to the current hash on success.
+        Slow (runs the password KDF), so call it off the Tk main thread.
+        """
+        saved = self.find(username)
+        if saved is None:
+            passwords.dummy_verify(password)     # Same cost as a real check
+            return None
+        student_id, stored = saved
+        if not passwords.verify_password(password, stored):
+            return None
+        if passwords.needs_rehash(stored):
+            new_hash = passwords.hash_password(password)
+            with self._lock, file_lock(self.path):
+                self._refresh()
+                if self._index.get(username) == saved:   # Nobody changed it meanwhile
+                    self._index[username] = (student_id, new_hash)
+                    self._compact()  # One line per user: the old entry is gone from disk
+        return student_id
+
+
+_store = UserStore()               # Shared store used by login, homepage and appointments
+
+
+def find_user(username):
+    """Return (student_id, password_hash) for a username, or None"""
+    return _store.find(username)
+
+
+def authenticate(username, password):
+    """Return the student ID for valid credentials, else None (slow: use a worker thread)"""
+    return _store.authenticate(username, password)
+
+
+def list_usernames():
+    """Return all registered usernames"""
+    return _store.usernames()
+
+
+def register_user(username, password):
+    """Register a user; returns the new student ID, or None if the name exists (slow: use a worker thread)"""
+    return _store.register(username, password)